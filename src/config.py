@@ -3,26 +3,32 @@
 from __future__ import annotations
 
 import os
+import re
+from collections.abc import Mapping
 from pathlib import Path
 
+from pydantic import BaseModel, ConfigDict
 
-def _get_env_list(key: str, default: str) -> list[str]:
+_LIST_SEPARATOR = re.compile(r"\s*,\s*")
+
+
+def _get_env_list(key: str, default: str, env: Mapping[str, str] | None = None) -> list[str]:
     """Get a comma-separated list from an environment variable."""
-    raw = os.environ.get(key, default)
-    return [item.strip().lower() for item in raw.split(",") if item.strip()]
+    raw = (os.environ if env is None else env).get(key, default)
+    return [item for item in _LIST_SEPARATOR.split(raw.strip().lower()) if item]
 
 
-def _get_env_bool(key: str, default: bool) -> bool:
+def _get_env_bool(key: str, default: bool, env: Mapping[str, str] | None = None) -> bool:
     """Get a boolean from an environment variable."""
-    raw = os.environ.get(key, "")
+    raw = (os.environ if env is None else env).get(key, "")
     if not raw:
         return default
     return raw.lower() in ("true", "1", "yes")
 
 
-def _get_env_int(key: str, default: int) -> int:
+def _get_env_int(key: str, default: int, env: Mapping[str, str] | None = None) -> int:
     """Get an integer from an environment variable."""
-    raw = os.environ.get(key, "")
+    raw = (os.environ if env is None else env).get(key, "")
     if not raw:
         return default
     try:
@@ -31,38 +37,80 @@ def _get_env_int(key: str, default: int) -> int:
         return default
 
 
+# OCR redaction patterns — regex patterns to redact from OCR output
+# Default patterns: SSN and credit card numbers
+_DEFAULT_PII_PATTERNS = r"\b\d{3}-\d{2}-\d{4}\b,\b\d{4}[\s-]?\d{4}[\s-]?\d{4}[\s-]?\d{4}\b"
+
+
+class EnvConfig(BaseModel):
+    """The environment-derived settings; see the module constants below."""
+
+    model_config = ConfigDict(frozen=True)
+
+    restricted_processes: list[str]
+    dry_run: bool
+    default_max_width: int
+    max_text_length: int
+    rate_limit: int
+    audit_log_path: Path
+    ocr_redaction_patterns: list[str]
+
+
+def load_config(env: Mapping[str, str] | None = None) -> EnvConfig:
+    """Parse the CV_* settings from env (default: os.environ).
+
+    Pure with respect to its argument, so tests can check overrides without
+    reloading this module.
+    """
+    if env is None:
+        env = os.environ
+    return EnvConfig(
+        restricted_processes=_get_env_list(
+            "CV_RESTRICTED_PROCESSES",
+            "credential manager,keepass,1password,bitwarden,windows security",
+            env,
+        ),
+        dry_run=_get_env_bool("CV_DRY_RUN", False, env),
+        default_max_width=_get_env_int("CV_DEFAULT_MAX_WIDTH", 1280, env),
+        max_text_length=_get_env_int("CV_MAX_TEXT_LENGTH", 1000, env),
+        rate_limit=_get_env_int("CV_RATE_LIMIT", 20, env),
+        audit_log_path=Path(
+            env.get(
+                "CV_AUDIT_LOG_PATH",
+                os.path.join(env.get("LOCALAPPDATA", "."), "claude-cv-plugin", "audit.jsonl"),
+            )
+        ),
+        ocr_redaction_patterns=_get_env_list(
+            "CV_OCR_REDACTION_PATTERNS", _DEFAULT_PII_PATTERNS, env
+        ),
+    )
+
+
+_env_config = load_config()
+
 # Restricted processes — blocked from input injection by default
-RESTRICTED_PROCESSES: list[str] = _get_env_list(
-    "CV_RESTRICTED_PROCESSES",
-    "credential manager,keepass,1password,bitwarden,windows security",
-)
+RESTRICTED_PROCESSES: list[str] = _env_config.restricted_processes
+
+# Lowercased set view of RESTRICTED_PROCESSES for the per-action membership check
+RESTRICTED_PROCESS_SET: frozenset[str] = frozenset(name.lower() for name in RESTRICTED_PROCESSES)
 
 # Dry-run mode — returns planned actions without executing
-DRY_RUN: bool = _get_env_bool("CV_DRY_RUN", False)
+DRY_RUN: bool = _env_config.dry_run
 
 # Default max width for screenshot downscaling
-DEFAULT_MAX_WIDTH: int = _get_env_int("CV_DEFAULT_MAX_WIDTH", 1280)
+DEFAULT_MAX_WIDTH: int = _env_config.default_max_width
 
 # Max text length for type_text
-MAX_TEXT_LENGTH: int = _get_env_int("CV_MAX_TEXT_LENGTH", 1000)
+MAX_TEXT_LENGTH: int = _env_config.max_text_length
 
 # Rate limit — max input actions per second
-RATE_LIMIT: int = _get_env_int("CV_RATE_LIMIT", 20)
+RATE_LIMIT: int = _env_config.rate_limit
 
 # Audit log path
-AUDIT_LOG_PATH: Path = Path(
-    os.environ.get(
-        "CV_AUDIT_LOG_PATH",
-        os.path.join(os.environ.get("LOCALAPPDATA", "."), "claude-cv-plugin", "audit.jsonl"),
-    )
-)
+AUDIT_LOG_PATH: Path = _env_config.audit_log_path
 
-# OCR redaction patterns — regex patterns to redact from OCR output
-# Default patterns: SSN and credit card numbers
-_DEFAULT_PII_PATTERNS = r"\b\d{3}-\d{2}-\d{4}\b,\b\d{4}[\s-]?\d{4}[\s-]?\d{4}[\s-]?\d{4}\b"
-OCR_REDACTION_PATTERNS: list[str] = _get_env_list(
-    "CV_OCR_REDACTION_PATTERNS", _DEFAULT_PII_PATTERNS
-)
+# OCR redaction patterns (CV_OCR_REDACTION_PATTERNS, comma-separated)
+OCR_REDACTION_PATTERNS: list[str] = _env_config.ocr_redaction_patterns
 
 # Max wait timeout for synchronization tools
 MAX_WAIT_TIMEOUT: float = 60.0
@@ -75,3 +123,9 @@ DEFAULT_UIA_DEPTH: int = 5
 
 # UI Automation timeout in seconds
 UIA_TIMEOUT: float = 5.0
+
+# Max UI Automation elements read per tree walk; larger trees are truncated
+UIA_MAX_NODES: int = 2000
+
+# Seconds a walked UI Automation tree is reused for the same window (0 disables)
+UIA_TREE_TTL: float = 0.5
@@ -72,7 +72,11 @@ def cv_read_ui(hwnd: int, depth: int = 5, filter: str = "all") -> dict:
         elements = get_ui_tree(hwnd, depth=depth, filter=filter)
         serialized = [elem.model_dump() for elem in elements]
         log_action("cv_read_ui", {"hwnd": hwnd, "depth": depth, "filter": filter}, "OK")
-        return make_success(elements=serialized, count=len(serialized))
+        return make_success(
+            elements=serialized,
+            count=len(serialized),
+            truncated=getattr(elements, "truncated", False),
+        )
     except TimeoutError as exc:
         log_action("cv_read_ui", {"hwnd": hwnd}, "TIMEOUT")
         return make_error(UIA_ERROR, str(exc))
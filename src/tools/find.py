@@ -95,17 +95,19 @@ def _fuzzy_score(query: str, text: str) -> float:
     return SequenceMatcher(None, q, t).ratio()
 
 
-def _match_uia(query: str, hwnd: int) -> list[FindMatch]:
+def _match_uia(query: str, hwnd: int) -> tuple[list[FindMatch], bool]:
     """Search UIA tree for elements matching query.
 
-    Returns list of FindMatch sorted by confidence descending.
+    Returns (matches, truncated): FindMatch sorted by confidence descending, and
+    whether the tree walk hit its node budget so later elements were not searched.
     """
     try:
         tree = get_ui_tree(hwnd, depth=8, filter="all")
     except Exception as exc:
         logger.debug("UIA tree walk failed for HWND %d: %s", hwnd, exc)
-        return []
+        return [], False
 
+    truncated = getattr(tree, "truncated", False)
     flat = _flatten_uia_tree(tree)
     q_lower = query.lower()
     matches: list[FindMatch] = []
@@ -146,7 +148,7 @@ def _match_uia(query: str, hwnd: int) -> list[FindMatch]:
             )
 
     matches.sort(key=lambda m: m.confidence, reverse=True)
-    return matches
+    return matches, truncated
 
 
 def _match_ocr(query: str, hwnd: int) -> list[FindMatch]:
@@ -308,20 +310,23 @@ def cv_find(
     # --- Search ---
     matches: list[FindMatch] = []
     method_used = method
+    truncated = False
 
     if method == "uia":
-        matches = _match_uia(query, hwnd)
+        matches, truncated = _match_uia(query, hwnd)
         method_used = "uia"
     elif method == "ocr":
         matches = _match_ocr(query, hwnd)
         method_used = "ocr"
     else:
         # Auto mode: UIA first, OCR fallback (sequential, no threads)
-        matches = _match_uia(query, hwnd)
+        matches, truncated = _match_uia(query, hwnd)
         method_used = "uia"
         if not matches:
             matches = _match_ocr(query, hwnd)
             method_used = "ocr"
+            # Keep reporting the UIA truncation only if OCR couldn't make up for it
+            truncated = truncated and not matches
 
     # --- Bbox validation ---
     matches = _filter_bbox_in_window(matches, hwnd)
@@ -338,6 +343,9 @@ def cv_find(
             FIND_NO_MATCH,
             f"No elements matching '{query}' found in window {hwnd} using {method_used}.",
         )
+        if truncated:
+            # The UIA walk stopped at its node budget; the element may be past it
+            error["truncated"] = True
         # Vision fallback: attach a screenshot so Claude can visually inspect the window
         if _can_screenshot(hwnd):
             try:
@@ -364,6 +372,7 @@ def cv_find(
         matches=[m.model_dump() for m in matches[:max_results]],
         match_count=len(matches),
         method_used=method_used,
+        truncated=truncated,
     )
 
     # Always capture screenshot on success (no cooldown for success path)
@@ -20,6 +20,7 @@ from src.utils.security import (
 from src.utils.win32_input import type_unicode_string, send_key_combo
 from src.utils.win32_window import focus_window
 from src.utils.action_helpers import _get_hwnd_process_name, _capture_post_action, _build_window_state
+from src.utils.uia import invalidate_ui_tree_cache
 
 logger = logging.getLogger(__name__)
 
@@ -86,6 +87,8 @@ def cv_type_text(
                     break
 
             log_action("cv_type_text", params, "ok" if ok else "fail")
+            # Input may have changed the window's UI; don't serve a pre-action tree
+            invalidate_ui_tree_cache(hwnd)
 
             if not ok:
                 return make_error(INPUT_FAILED, "SendInput failed for text typing.")
@@ -113,6 +116,8 @@ def cv_type_text(
 
             ok = type_unicode_string(text)
             log_action("cv_type_text", params, "ok" if ok else "fail")
+            # Input may have changed the window's UI; don't serve a pre-action tree
+            invalidate_ui_tree_cache()
 
             if not ok:
                 return make_error(INPUT_FAILED, "SendInput failed for text typing.")
@@ -180,6 +185,8 @@ def cv_send_keys(
                     break
 
             log_action("cv_send_keys", params, "ok" if ok else "fail")
+            # Input may have changed the window's UI; don't serve a pre-action tree
+            invalidate_ui_tree_cache(hwnd)
 
             if not ok:
                 return make_error(INPUT_FAILED, f"SendInput failed for key combo: {keys!r}")
@@ -207,6 +214,8 @@ def cv_send_keys(
 
             ok = send_key_combo(keys)
             log_action("cv_send_keys", params, "ok" if ok else "fail")
+            # Input may have changed the window's UI; don't serve a pre-action tree
+            invalidate_ui_tree_cache()
 
             if not ok:
                 return make_error(INPUT_FAILED, f"SendInput failed for key combo: {keys!r}")
@@ -18,6 +18,7 @@ from src.utils.security import (
 from src.utils.win32_input import send_mouse_click, send_mouse_drag
 from src.utils.win32_window import focus_window
 from src.utils.action_helpers import _capture_post_action, _build_window_state
+from src.utils.uia import invalidate_ui_tree_cache
 
 logger = logging.getLogger(__name__)
 
@@ -106,6 +107,8 @@ def cv_mouse_click(
             norm_ex, norm_ey = normalize_for_sendinput(x, y)
             ok = send_mouse_drag(norm_sx, norm_sy, norm_ex, norm_ey, button)
             log_action("cv_mouse_click", params, "ok" if ok else "fail")
+            # Input may have changed the window's UI; don't serve a pre-action tree
+            invalidate_ui_tree_cache(hwnd or None)
             if not ok:
                 return make_error(INPUT_FAILED, "SendInput failed for mouse drag.")
             result = make_success(
@@ -131,6 +134,8 @@ def cv_mouse_click(
             norm_x, norm_y = normalize_for_sendinput(x, y)
             ok = send_mouse_click(norm_x, norm_y, button, click_type)
             log_action("cv_mouse_click", params, "ok" if ok else "fail")
+            # Input may have changed the window's UI; don't serve a pre-action tree
+            invalidate_ui_tree_cache(hwnd or None)
             if not ok:
                 return make_error(INPUT_FAILED, "SendInput failed for mouse click.")
             result = make_success(
@@ -21,6 +21,7 @@ from src.utils.security import (
 from src.utils.win32_input import send_mouse_scroll
 from src.utils.win32_window import focus_window
 from src.utils.action_helpers import _get_hwnd_process_name, _capture_post_action, _build_window_state
+from src.utils.uia import invalidate_ui_tree_cache
 
 logger = logging.getLogger(__name__)
 
@@ -101,6 +102,8 @@ def cv_scroll(
         # Send scroll
         ok = send_mouse_scroll(norm_x, norm_y, direction, amount)
         log_action("cv_scroll", params, "ok" if ok else "fail")
+        # Input may have changed the window's UI; don't serve a pre-action tree
+        invalidate_ui_tree_cache(hwnd)
 
         if not ok:
             return make_error(INPUT_FAILED, "SendInput failed for scroll")
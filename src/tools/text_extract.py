@@ -51,12 +51,15 @@ def _flatten_uia_tree(elements: list[UiaElement]) -> list[UiaElement]:
     return flat
 
 
-def _extract_uia_text(hwnd: int) -> tuple[str, float]:
+def _extract_uia_text(hwnd: int) -> tuple[str, float, bool]:
     """Extract text from a window using UI Automation.
 
-    Returns (text, confidence) where confidence is 1.0 for UIA.
+    Returns (text, confidence, truncated) where confidence is 1.0 for UIA and
+    truncated is True when the tree walk hit its node budget, so the text
+    covers only part of the window.
     """
     tree = get_ui_tree(hwnd, depth=10, filter="all")
+    truncated = getattr(tree, "truncated", False)
     flat = _flatten_uia_tree(tree)
 
     # Collect text-bearing elements
@@ -79,7 +82,7 @@ def _extract_uia_text(hwnd: int) -> tuple[str, float]:
         text_elements.append((el.rect.y, el.rect.x, content))
 
     if not text_elements:
-        return ("", 1.0)
+        return ("", 1.0, truncated)
 
     # Spatial sorting: group by row (y // _ROW_HEIGHT), then left-to-right
     text_elements.sort(key=lambda t: (t[0] // _ROW_HEIGHT, t[1]))
@@ -94,7 +97,7 @@ def _extract_uia_text(hwnd: int) -> tuple[str, float]:
         prev_y = y
 
     text = "\n".join(parts)
-    return (text, 1.0)
+    return (text, 1.0, truncated)
 
 
 def _extract_ocr_text(hwnd: int) -> tuple[str, float]:
@@ -189,22 +192,26 @@ def cv_get_text(
         text = ""
         source = ""
         confidence = 0.0
+        truncated = False
 
         if method == "uia":
-            text, confidence = _extract_uia_text(hwnd)
+            text, confidence, truncated = _extract_uia_text(hwnd)
             source = "uia"
         elif method == "ocr":
             text, confidence = _extract_ocr_text(hwnd)
             source = "ocr"
         else:
-            # Auto mode: try UIA first, fall back to OCR if insufficient
-            text, confidence = _extract_uia_text(hwnd)
+            # Auto mode: try UIA first, fall back to OCR if insufficient or partial
+            text, confidence, truncated = _extract_uia_text(hwnd)
             source = "uia"
-            if len(text) < 20:
+            if len(text) < 20 or truncated:
                 ocr_text, ocr_confidence = _extract_ocr_text(hwnd)
-                text = ocr_text
-                confidence = ocr_confidence
-                source = "ocr"
+                # A partial UIA read still beats an OCR pass that found less
+                if not truncated or len(ocr_text) >= len(text):
+                    text = ocr_text
+                    confidence = ocr_confidence
+                    source = "ocr"
+                    truncated = False
 
         # Apply PII redaction to all output
         text = _apply_redaction_patterns(text, config.OCR_REDACTION_PATTERNS)
@@ -216,6 +223,7 @@ def cv_get_text(
             source=source,
             line_count=text.count("\n") + 1,
             confidence=confidence,
+            truncated=truncated,
         )
 
     except TimeoutError as e:
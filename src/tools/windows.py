@@ -160,7 +160,8 @@ def cv_move_window(
         new_width = width if width is not None else current_rect.width
         new_height = height if height is not None else current_rect.height
 
-        new_rect = move_window(hwnd, new_x, new_y, new_width, new_height)
+        # Report where the window actually landed, which can differ from the request
+        new_rect = move_window(hwnd, new_x, new_y, new_width, new_height, verify=True)
         log_action("cv_move_window", params, "ok")
 
         return make_success(hwnd=hwnd, rect=new_rect.model_dump())
@@ -0,0 +1,194 @@
+"""Shared ctypes prototypes for the Win32 entry points the plugin calls.
+
+Each DLL is loaded once through a private WinDLL handle, so the argtypes and
+restype set here never leak onto ctypes.windll for other callers. Modules import
+the bound functions from here instead of loading the DLLs themselves.
+
+Off Windows there is nothing to load: every function is bound to a stub that
+raises OSError when called, which keeps the importing modules importable (and
+their tests collectable) on other platforms.
+"""
+
+from __future__ import annotations
+
+import ctypes
+import ctypes.wintypes
+import sys
+from typing import Any
+
+_WINDOWS = sys.platform == "win32"
+
+
+class _UnavailableFunction:
+    """Stand-in for a Win32 export on a platform that has none."""
+
+    def __init__(self, name: str) -> None:
+        self.__name__ = name
+
+    def __call__(self, *args: Any) -> Any:
+        raise OSError(f"{self.__name__} is only available on Windows")
+
+
+def _load(name: str) -> Any:
+    return ctypes.WinDLL(name, use_last_error=True) if _WINDOWS else None
+
+
+def _bind(dll: Any, name: str, argtypes: list[Any], restype: Any) -> Any:
+    """Return dll.<name> with its prototype set, or a raising stub off Windows."""
+    if dll is None:
+        return _UnavailableFunction(name)
+    func = getattr(dll, name)
+    func.argtypes = argtypes
+    func.restype = restype
+    return func
+
+
+if sys.platform == "win32":
+    WNDENUMPROC = ctypes.WINFUNCTYPE(ctypes.wintypes.BOOL, ctypes.wintypes.HWND, ctypes.wintypes.LPARAM)
+else:
+    WNDENUMPROC = ctypes.CFUNCTYPE(ctypes.wintypes.BOOL, ctypes.wintypes.HWND, ctypes.wintypes.LPARAM)
+
+
+class BITMAPINFOHEADER(ctypes.Structure):
+    _fields_ = [
+        ("biSize", ctypes.wintypes.DWORD),
+        ("biWidth", ctypes.wintypes.LONG),
+        ("biHeight", ctypes.wintypes.LONG),
+        ("biPlanes", ctypes.wintypes.WORD),
+        ("biBitCount", ctypes.wintypes.WORD),
+        ("biCompression", ctypes.wintypes.DWORD),
+        ("biSizeImage", ctypes.wintypes.DWORD),
+        ("biXPelsPerMeter", ctypes.wintypes.LONG),
+        ("biYPelsPerMeter", ctypes.wintypes.LONG),
+        ("biClrUsed", ctypes.wintypes.DWORD),
+        ("biClrImportant", ctypes.wintypes.DWORD),
+    ]
+
+
+# --- user32 ---
+
+_user32 = _load("user32")
+IsWindow = _bind(_user32, "IsWindow", [ctypes.wintypes.HWND], ctypes.wintypes.BOOL)
+IsIconic = _bind(_user32, "IsIconic", [ctypes.wintypes.HWND], ctypes.wintypes.BOOL)
+IsWindowVisible = _bind(_user32, "IsWindowVisible", [ctypes.wintypes.HWND], ctypes.wintypes.BOOL)
+GetForegroundWindow = _bind(_user32, "GetForegroundWindow", [], ctypes.wintypes.HWND)
+MonitorFromWindow = _bind(
+    _user32,
+    "MonitorFromWindow",
+    [ctypes.wintypes.HWND, ctypes.wintypes.DWORD],
+    ctypes.wintypes.HMONITOR,
+)
+AttachThreadInput = _bind(
+    _user32,
+    "AttachThreadInput",
+    [ctypes.wintypes.DWORD, ctypes.wintypes.DWORD, ctypes.wintypes.BOOL],
+    ctypes.wintypes.BOOL,
+)
+SystemParametersInfoW = _bind(
+    _user32,
+    "SystemParametersInfoW",
+    [ctypes.wintypes.UINT, ctypes.wintypes.UINT, ctypes.c_void_p, ctypes.wintypes.UINT],
+    ctypes.wintypes.BOOL,
+)
+SendInput = _bind(
+    _user32,
+    "SendInput",
+    [ctypes.wintypes.UINT, ctypes.c_void_p, ctypes.c_int],
+    ctypes.wintypes.UINT,
+)
+GetWindowTextLengthW = _bind(
+    _user32, "GetWindowTextLengthW", [ctypes.wintypes.HWND], ctypes.c_int
+)
+GetWindowTextW = _bind(
+    _user32,
+    "GetWindowTextW",
+    [ctypes.wintypes.HWND, ctypes.wintypes.LPWSTR, ctypes.c_int],
+    ctypes.c_int,
+)
+GetClassNameW = _bind(
+    _user32,
+    "GetClassNameW",
+    [ctypes.wintypes.HWND, ctypes.wintypes.LPWSTR, ctypes.c_int],
+    ctypes.c_int,
+)
+SetWindowPos = _bind(
+    _user32,
+    "SetWindowPos",
+    [
+        ctypes.wintypes.HWND,
+        ctypes.wintypes.HWND,
+        ctypes.c_int,
+        ctypes.c_int,
+        ctypes.c_int,
+        ctypes.c_int,
+        ctypes.wintypes.UINT,
+    ],
+    ctypes.wintypes.BOOL,
+)
+PostMessageW = _bind(
+    _user32,
+    "PostMessageW",
+    [ctypes.wintypes.HWND, ctypes.wintypes.UINT, ctypes.wintypes.WPARAM, ctypes.wintypes.LPARAM],
+    ctypes.wintypes.BOOL,
+)
+PrintWindow = _bind(
+    _user32,
+    "PrintWindow",
+    [ctypes.wintypes.HWND, ctypes.wintypes.HDC, ctypes.wintypes.UINT],
+    ctypes.wintypes.BOOL,
+)
+EnumWindows = _bind(
+    _user32, "EnumWindows", [WNDENUMPROC, ctypes.wintypes.LPARAM], ctypes.wintypes.BOOL
+)
+EnumChildWindows = _bind(
+    _user32,
+    "EnumChildWindows",
+    [ctypes.wintypes.HWND, WNDENUMPROC, ctypes.wintypes.LPARAM],
+    ctypes.wintypes.BOOL,
+)
+
+# --- kernel32 ---
+
+_kernel32 = _load("kernel32")
+OpenProcess = _bind(
+    _kernel32,
+    "OpenProcess",
+    [ctypes.wintypes.DWORD, ctypes.wintypes.BOOL, ctypes.wintypes.DWORD],
+    ctypes.wintypes.HANDLE,
+)
+QueryFullProcessImageNameW = _bind(
+    _kernel32,
+    "QueryFullProcessImageNameW",
+    [ctypes.wintypes.HANDLE, ctypes.wintypes.DWORD, ctypes.wintypes.LPWSTR, ctypes.wintypes.PDWORD],
+    ctypes.wintypes.BOOL,
+)
+CloseHandle = _bind(_kernel32, "CloseHandle", [ctypes.wintypes.HANDLE], ctypes.wintypes.BOOL)
+
+# --- gdi32 ---
+
+_gdi32 = _load("gdi32")
+CreateCompatibleDC = _bind(
+    _gdi32, "CreateCompatibleDC", [ctypes.wintypes.HDC], ctypes.wintypes.HDC
+)
+CreateDIBSection = _bind(
+    _gdi32,
+    "CreateDIBSection",
+    [
+        ctypes.wintypes.HDC,
+        ctypes.POINTER(BITMAPINFOHEADER),
+        ctypes.wintypes.UINT,
+        ctypes.POINTER(ctypes.c_void_p),
+        ctypes.wintypes.HANDLE,
+        ctypes.wintypes.DWORD,
+    ],
+    ctypes.wintypes.HBITMAP,
+)
+SelectObject = _bind(
+    _gdi32,
+    "SelectObject",
+    [ctypes.wintypes.HDC, ctypes.wintypes.HGDIOBJ],
+    ctypes.wintypes.HGDIOBJ,
+)
+DeleteObject = _bind(_gdi32, "DeleteObject", [ctypes.wintypes.HGDIOBJ], ctypes.wintypes.BOOL)
+DeleteDC = _bind(_gdi32, "DeleteDC", [ctypes.wintypes.HDC], ctypes.wintypes.BOOL)
+GdiFlush = _bind(_gdi32, "GdiFlush", [], ctypes.wintypes.BOOL)
@@ -2,22 +2,33 @@
 
 from __future__ import annotations
 
+import atexit
 import ctypes
 import logging
 import os
 import tempfile
+import threading
 import time
 from typing import Any
 
 import mss
 import win32gui
-import win32ui
 import win32con
 from PIL import Image
 
 from src.dpi import get_window_dpi, get_scale_factor
 from src.errors import WindowNotFoundError, CVPluginError, CAPTURE_FAILED
 from src.models import Rect, ScreenshotResult
+from src.utils._win32api import BITMAPINFOHEADER
+from src.utils._win32api import CreateCompatibleDC as _CreateCompatibleDC
+from src.utils._win32api import CreateDIBSection as _CreateDIBSection
+from src.utils._win32api import DeleteDC as _DeleteDC
+from src.utils._win32api import DeleteObject as _DeleteObject
+from src.utils._win32api import GdiFlush as _GdiFlush
+from src.utils._win32api import GetClassNameW as _GetClassNameW
+from src.utils._win32api import IsIconic as _IsIconic
+from src.utils._win32api import PrintWindow as _PrintWindow
+from src.utils._win32api import SelectObject as _SelectObject
 from src.utils.win32_window import is_window_valid
 
 # Temp directory for saved screenshots — cleaned up automatically
@@ -30,39 +41,146 @@ _MAX_AGE_SECONDS = 300
 logger = logging.getLogger(__name__)
 
 
+_BI_RGB = 0
+_DIB_RGB_COLORS = 0
+
+
+# One mss instance per thread for region grabs: an instance is not safe to share
+# across threads but is reusable within one, which saves re-acquiring its DC
+_mss_local = threading.local()
+_mss_instances: list[Any] = []
+_mss_instances_lock = threading.Lock()
+
+
+def _get_mss() -> Any:
+    """Return this thread's cached mss instance, creating it on first use."""
+    sct = getattr(_mss_local, "sct", None)
+    if sct is None:
+        sct = mss.mss()
+        _mss_local.sct = sct
+        with _mss_instances_lock:
+            _mss_instances.append(sct)
+    return sct
+
+
+def _discard_mss() -> None:
+    """Close and forget this thread's mss instance so the next grab starts fresh."""
+    sct = getattr(_mss_local, "sct", None)
+    if sct is None:
+        return
+    _mss_local.sct = None
+    with _mss_instances_lock:
+        if sct in _mss_instances:
+            _mss_instances.remove(sct)
+    try:
+        sct.close()
+    except Exception:
+        logger.debug("Closing a stale mss instance failed", exc_info=True)
+
+
+@atexit.register
+def _close_mss_instances() -> None:
+    """Close every cached mss instance at interpreter exit."""
+    with _mss_instances_lock:
+        instances = _mss_instances[:]
+        _mss_instances.clear()
+    for sct in instances:
+        try:
+            sct.close()
+        except Exception:
+            logger.debug("Closing an mss instance at exit failed", exc_info=True)
+
+
+def _grab_region(region: dict[str, int]) -> Any:
+    """Grab a region with the thread's mss instance, retrying once on a fresh one.
+
+    A failure usually means the instance's DC went stale (e.g. after a display
+    change), so the instance is dropped and the grab retried once.
+    """
+    try:
+        return _get_mss().grab(region)
+    except Exception:
+        logger.debug("mss grab failed; retrying on a fresh instance", exc_info=True)
+        _discard_mss()
+    return _get_mss().grab(region)
+
+
+def _scaled_size(width: int, height: int, max_width: int) -> tuple[int, int]:
+    """Return (width, height) downscaled proportionally to fit max_width."""
+    if width <= max_width:
+        return width, height
+    return max_width, int(height * (max_width / width))
+
+
+def _mss_to_image(screenshot: Any, max_width: int | None = None) -> Image.Image:
+    """Build an RGB PIL Image from an mss grab.
+
+    Feeds the raw BGRA buffer to PIL's C-level "BGRX" unpacker instead of
+    going through ``screenshot.rgb``, which builds an intermediate RGB copy
+    with three strided slice passes in Python.
+
+    When max_width is given and the grab is wider, the buffer is wrapped
+    zero-copy and resized straight to the target size, so the full-size RGB
+    intermediate is never built; the channel swap then runs on the small
+    image only.
+    """
+    size = screenshot.size
+    if max_width is None or size[0] <= max_width:
+        return Image.frombytes("RGB", size, screenshot.raw, "raw", "BGRX")
+
+    # Channels are really B, G, R, X here; resampling is per-channel so order doesn't matter
+    bgrx = Image.frombuffer("RGBX", size, screenshot.raw, "raw", "RGBX", 0, 1)
+    small = bgrx.resize(_scaled_size(size[0], size[1], max_width), Image.Resampling.BILINEAR)
+    b, g, r, _ = small.split()
+    return Image.merge("RGB", (r, g, b))
+
+
 def _is_all_black(img: Image.Image) -> bool:
-    """Check if an image is entirely black (all channels min==max==0)."""
+    """Check if an image is entirely black (every channel of every pixel is 0).
+
+    getbbox() scans the packed pixels once in C and returns None when none is
+    non-zero; unlike getextrema() it does not split out a copy of each band,
+    and it stops early on the common non-black capture.
+    """
     try:
-        extrema = img.getextrema()
-        # For RGB images, extrema is ((min_r, max_r), (min_g, max_g), (min_b, max_b))
-        if isinstance(extrema[0], tuple):
-            return all(mn == 0 and mx == 0 for mn, mx in extrema)
-        # For single-channel images
-        return extrema[0] == 0 and extrema[1] == 0
+        return img.getbbox() is None
     except Exception:
+        logger.debug("Black-image check failed", exc_info=True)
         return False
 
 
 def _capture_window_impl(hwnd: int) -> Image.Image:
     """Shared capture logic for window capture with PrintWindow-first 3-tier fallback.
 
+    See _capture_window_with_rect for the tier details.
+    """
+    img, _rect = _capture_window_with_rect(hwnd)
+    return img
+
+
+def _capture_window_with_rect(hwnd: int) -> tuple[Image.Image, tuple[int, int, int, int]]:
+    """Capture a window and return it with the window rect used for the capture.
+
     Handles minimized windows by temporarily showing them without activation.
 
     Tier 1: PrintWindow with PW_RENDERFULLCONTENT (flag=2) - validate not all-black
     Tier 2: PrintWindow with flag=0 - validate not all-black
     Tier 3: mss region capture as last resort
 
+    Tiers 1 and 2 share a single GDI context (see _capture_with_printwindow).
+    Tier 2 is skipped for Chromium windows, where flag=0 always comes back black.
+
     Args:
         hwnd: Window handle to capture.
 
     Returns:
-        PIL Image of the captured window.
+        (PIL Image, (left, top, right, bottom)) so callers don't re-query GetWindowRect.
 
     Raises:
         CVPluginError: If all capture methods fail.
     """
     # Handle minimized windows
-    was_minimized = bool(ctypes.windll.user32.IsIconic(hwnd))
+    was_minimized = bool(_IsIconic(hwnd))
     if was_minimized:
         SW_SHOWNOACTIVATE = 4
         win32gui.ShowWindow(hwnd, SW_SHOWNOACTIVATE)
@@ -76,20 +194,15 @@ def _capture_window_impl(hwnd: int) -> Image.Image:
         if width <= 0 or height <= 0:
             raise CVPluginError(CAPTURE_FAILED, f"Window HWND {hwnd} has zero size")
 
-        # Tier 1: PrintWindow with PW_RENDERFULLCONTENT
-        img = _capture_with_printwindow(hwnd, width, height, flag=2)
-        if img is not None and not _is_all_black(img):
-            return img
-
-        # Tier 2: PrintWindow with flag=0
-        img = _capture_with_printwindow(hwnd, width, height, flag=0)
-        if img is not None and not _is_all_black(img):
-            return img
+        # Tiers 1 and 2: PrintWindow with PW_RENDERFULLCONTENT, then flag=0
+        img = _capture_with_printwindow(hwnd, width, height, _printwindow_flags(hwnd))
+        if img is not None:
+            return img, rect_tuple
 
         # Tier 3: mss region capture (last resort)
         img = _capture_region_mss(left, top, width, height)
         if img is not None:
-            return img
+            return img, rect_tuple
 
         raise CVPluginError(CAPTURE_FAILED, f"Failed to capture window HWND {hwnd}")
     finally:
@@ -117,9 +230,7 @@ def capture_window(hwnd: int, max_width: int = 1280) -> ScreenshotResult:
     if not is_window_valid(hwnd):
         raise WindowNotFoundError(hwnd)
 
-    img = _capture_window_impl(hwnd)
-
-    rect_tuple = win32gui.GetWindowRect(hwnd)
+    img, rect_tuple = _capture_window_with_rect(hwnd)
     left, top, right, bottom = rect_tuple
     width = right - left
     height = bottom - top
@@ -151,12 +262,14 @@ def capture_desktop(max_width: int = 1920) -> ScreenshotResult:
     Returns:
         ScreenshotResult with base64-encoded image and metadata.
     """
+    # A fresh instance, not _get_mss(): mss caches the monitor layout per instance
     with mss.mss() as sct:
         # monitors[0] is the entire virtual desktop
         monitor = sct.monitors[0]
         screenshot = sct.grab(monitor)
-        img = Image.frombytes("RGB", screenshot.size, screenshot.rgb)
+        img = _mss_to_image(screenshot, max_width=max_width)
 
+    phys_width, phys_height = screenshot.size
     filepath = save_image(img, max_width=max_width)
 
     return ScreenshotResult(
@@ -167,8 +280,8 @@ def capture_desktop(max_width: int = 1920) -> ScreenshotResult:
             width=monitor["width"],
             height=monitor["height"],
         ),
-        physical_resolution={"width": img.width, "height": img.height},
-        logical_resolution={"width": img.width, "height": img.height},
+        physical_resolution={"width": phys_width, "height": phys_height},
+        logical_resolution={"width": phys_width, "height": phys_height},
         dpi_scale=1.0,
         format="png",
     )
@@ -198,17 +311,17 @@ def capture_region(x0: int, y0: int, x1: int, y1: int, max_width: int = 1280) ->
 
     region = {"left": x0, "top": y0, "width": width, "height": height}
 
-    with mss.mss() as sct:
-        screenshot = sct.grab(region)
-        img = Image.frombytes("RGB", screenshot.size, screenshot.rgb)
+    screenshot = _grab_region(region)
+    img = _mss_to_image(screenshot, max_width=max_width)
 
+    phys_width, phys_height = screenshot.size
     filepath = save_image(img, max_width=max_width)
 
     return ScreenshotResult(
         image_path=filepath,
         rect=Rect(x=x0, y=y0, width=width, height=height),
-        physical_resolution={"width": img.width, "height": img.height},
-        logical_resolution={"width": img.width, "height": img.height},
+        physical_resolution={"width": phys_width, "height": phys_height},
+        logical_resolution={"width": phys_width, "height": phys_height},
         dpi_scale=1.0,
         format="png",
     )
@@ -251,80 +364,153 @@ def _capture_region_mss(left: int, top: int, width: int, height: int) -> Image.I
     """Capture a screen region using mss. Returns PIL Image or None on failure."""
     try:
         region = {"left": left, "top": top, "width": width, "height": height}
-        with mss.mss() as sct:
-            screenshot = sct.grab(region)
-            return Image.frombytes("RGB", screenshot.size, screenshot.rgb)
+        return _mss_to_image(_grab_region(region))
     except Exception as exc:
         logger.debug("mss capture failed for region (%s,%s,%s,%s): %s", left, top, width, height, exc)
         return None
 
 
-def _capture_with_printwindow(hwnd: int, width: int, height: int, flag: int = 2) -> Image.Image | None:
+# PrintWindow flags tried in order: PW_RENDERFULLCONTENT (2), then default (0)
+_PRINTWINDOW_FLAGS = (2, 0)
+# Chromium/Electron top-level windows are DirectComposition-rendered and come back
+# black without PW_RENDERFULLCONTENT, so the flag=0 retry is skipped for them
+_CHROMIUM_PRINTWINDOW_FLAGS = (2,)
+_CHROMIUM_WINDOW_CLASS_PREFIX = "Chrome_WidgetWin_"
+
+
+def _printwindow_flags(hwnd: int) -> tuple[int, ...]:
+    """Return the PrintWindow flags worth trying for a window, based on its class."""
+    class_name = ctypes.create_unicode_buffer(64)
+    _GetClassNameW(hwnd, class_name, len(class_name))
+    if class_name.value.startswith(_CHROMIUM_WINDOW_CLASS_PREFIX):
+        return _CHROMIUM_PRINTWINDOW_FLAGS
+    return _PRINTWINDOW_FLAGS
+
+
+def _capture_with_printwindow(
+    hwnd: int, width: int, height: int, flags: tuple[int, ...] = _PRINTWINDOW_FLAGS
+) -> Image.Image | None:
     """Capture a window using PrintWindow (works for occluded windows).
 
+    Tries each flag in order on a single GDI context and returns the first
+    image that is not all-black. The DCs and DIB section are allocated once
+    and released after the last attempt rather than per flag.
+
     Args:
         hwnd: Window handle.
         width: Capture width in pixels.
         height: Capture height in pixels.
-        flag: PrintWindow flag. 2 = PW_RENDERFULLCONTENT, 0 = default.
+        flags: PrintWindow flags to try. 2 = PW_RENDERFULLCONTENT, 0 = default.
 
-    Returns PIL Image or None on failure.
+    Returns PIL Image or None if every attempt failed or came back black.
     """
-    hdc_window = None
-    hdc_mem = None
-    hdc_compat = None
-    bitmap = None
     try:
-        hdc_window = win32gui.GetWindowDC(hwnd)
-        hdc_mem = win32ui.CreateDCFromHandle(hdc_window)
-        hdc_compat = hdc_mem.CreateCompatibleDC()
-
-        bitmap = win32ui.CreateBitmap()
-        bitmap.CreateCompatibleBitmap(hdc_mem, width, height)
-        hdc_compat.SelectObject(bitmap)
-
-        result = ctypes.windll.user32.PrintWindow(hwnd, hdc_compat.GetSafeHdc(), flag)
-
-        if not result:
-            return None
-
-        bmp_info = bitmap.GetInfo()
-        bmp_bits = bitmap.GetBitmapBits(True)
-
-        img = Image.frombuffer(
-            "RGB",
-            (bmp_info["bmWidth"], bmp_info["bmHeight"]),
-            bmp_bits,
-            "raw",
-            "BGRX",
-            0,
-            1,
-        )
-        return img
+        context = _alloc_print_context(hwnd, width, height)
     except Exception as exc:
-        logger.debug("PrintWindow(flag=%d) failed for HWND %s: %s", flag, hwnd, exc)
+        logger.debug("PrintWindow context allocation failed for HWND %s: %s", hwnd, exc)
         return None
-    finally:
-        if bitmap is not None:
-            try:
-                win32gui.DeleteObject(bitmap.GetHandle())
-            except Exception:
-                pass
-        if hdc_compat is not None:
-            try:
-                hdc_compat.DeleteDC()
-            except Exception:
-                pass
-        if hdc_mem is not None:
-            try:
-                hdc_mem.DeleteDC()
-            except Exception:
-                pass
-        if hdc_window is not None:
+
+    try:
+        for flag in flags:
             try:
-                win32gui.ReleaseDC(hwnd, hdc_window)
-            except Exception:
-                pass
+                img = _do_printwindow(hwnd, context, flag, width, height)
+            except Exception as exc:
+                logger.debug("PrintWindow(flag=%d) failed for HWND %s: %s", flag, hwnd, exc)
+                continue
+            if img is not None and not _is_all_black(img):
+                return img
+        return None
+    finally:
+        _release_print_context(hwnd, context)
+
+
+def _alloc_print_context(hwnd: int, width: int, height: int) -> list[Any]:
+    """Allocate the window DC, memory DC and a 32bpp DIB section for PrintWindow.
+
+    The DIB is top-down (negative biHeight) so its memory is already in the
+    row order PIL expects and can be read in place, without GetBitmapBits.
+
+    Returns [hdc_window, hdc_mem, hbitmap, bits_ptr, old_bitmap]. Anything
+    allocated before a failure is released before the exception propagates.
+    """
+    context: list[Any] = [None, None, None, None, None]
+    try:
+        context[0] = win32gui.GetWindowDC(hwnd)
+        context[1] = _CreateCompatibleDC(context[0])
+        if not context[1]:
+            raise ctypes.WinError(ctypes.get_last_error())
+
+        header = BITMAPINFOHEADER()
+        header.biSize = ctypes.sizeof(BITMAPINFOHEADER)
+        header.biWidth = width
+        header.biHeight = -height  # negative = top-down rows
+        header.biPlanes = 1
+        header.biBitCount = 32
+        header.biCompression = _BI_RGB
+
+        bits = ctypes.c_void_p()
+        context[2] = _CreateDIBSection(
+            context[1], ctypes.byref(header), _DIB_RGB_COLORS, ctypes.byref(bits), None, 0
+        )
+        if not context[2] or not bits.value:
+            raise ctypes.WinError(ctypes.get_last_error())
+        context[3] = bits.value
+        context[4] = _SelectObject(context[1], context[2])
+        return context
+    except Exception:
+        _release_print_context(hwnd, context)
+        raise
+
+
+def _dib_to_image(bits: int, width: int, height: int) -> Image.Image:
+    """Decode a top-down 32bpp BGRX DIB at address bits into an RGB Image.
+
+    PIL unpacks BGRX straight out of the DIB memory, so the result owns its
+    pixels and stays valid after the DIB section is deleted. GDI batches
+    drawing calls per thread, so the batch is flushed before the bits are read.
+    """
+    _GdiFlush()
+    buffer = (ctypes.c_char * (width * height * 4)).from_address(bits)
+    # ctypes arrays export the buffer protocol; PIL's stubs only admit bytes
+    return Image.frombuffer(
+        "RGB", (width, height), buffer, "raw", "BGRX", 0, 1  # type: ignore[arg-type]
+    )
+
+
+def _do_printwindow(hwnd: int, context: list[Any], flag: int, width: int, height: int) -> Image.Image | None:
+    """Run PrintWindow into an allocated context and read back the DIB."""
+    _hdc_window, hdc_mem, _hbitmap, bits, _old_bitmap = context
+    result = _PrintWindow(hwnd, hdc_mem, flag)
+
+    if not result:
+        return None
+
+    return _dib_to_image(bits, width, height)
+
+
+def _release_print_context(hwnd: int, context: list[Any]) -> None:
+    """Release GDI objects from _alloc_print_context. Each step is best-effort."""
+    hdc_window, hdc_mem, hbitmap, _bits, old_bitmap = context
+    if old_bitmap:
+        try:
+            _SelectObject(hdc_mem, old_bitmap)
+        except Exception:
+            pass
+    if hbitmap:
+        try:
+            _DeleteObject(hbitmap)
+        except Exception:
+            pass
+    if hdc_mem:
+        try:
+            _DeleteDC(hdc_mem)
+        except Exception:
+            pass
+    if hdc_window is not None:
+        try:
+            win32gui.ReleaseDC(hwnd, hdc_window)
+        except Exception:
+            pass
 
 
 def _cleanup_old_screenshots() -> None:
@@ -359,16 +545,17 @@ def save_image(img: Image.Image, max_width: int = 1280, fmt: str = "png") -> str
         _cleanup_old_screenshots()
 
     if img.width > max_width:
-        ratio = max_width / img.width
-        new_height = int(img.height * ratio)
-        img = img.resize((max_width, new_height), Image.Resampling.LANCZOS)
+        # BILINEAR: LANCZOS' wider kernel costs several times more for no visible
+        # gain on UI screenshots.
+        img = img.resize(_scaled_size(img.width, img.height, max_width), Image.Resampling.BILINEAR)
 
     timestamp = int(time.time() * 1000)
     filename = f"cv_{timestamp}.{fmt}"
     filepath = os.path.join(_SCREENSHOT_DIR, filename)
 
     if fmt.lower() == "jpeg":
-        img = img.convert("RGB")
+        if img.mode != "RGB":
+            img = img.convert("RGB")
         img.save(filepath, format="JPEG", quality=95)
     else:
         img.save(filepath, format="PNG")
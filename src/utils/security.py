@@ -2,23 +2,46 @@
 
 from __future__ import annotations
 
+import atexit
+import functools
 import json
 import logging
+import queue
 import re
+import threading
 import time
+from collections import OrderedDict
 from pathlib import Path
 from typing import Any
 
-import ctypes
-
 from src import config
 from src.errors import AccessDeniedError, RateLimitedError, make_error
+from src.utils._win32api import IsWindow as _IsWindow
 
 logger = logging.getLogger(__name__)
 
 # Rate limiter state
 _action_timestamps: list[float] = []
 
+# PID -> (process name, expiry) cache for get_process_name_by_pid. The TTL is kept
+# short because a cached name outlives its process: once Windows recycles the PID,
+# check_restricted would see the old name until the entry expires. Bounded LRU so a
+# long-running server doesn't keep one entry per PID it has ever seen.
+_PID_NAME_TTL = 1.0  # seconds
+_PID_NAME_FAILURE_TTL = 0.25  # seconds; short so a dead PID isn't retried in a tight loop
+_PID_NAME_CACHE_MAX_ENTRIES = 256
+_pid_name_cache: OrderedDict[int, tuple[str, float]] = OrderedDict()
+_pid_name_lock = threading.Lock()
+
+# Audit log writer state — log_action enqueues lines, a daemon thread appends them in batches
+_AUDIT_BATCH_SIZE = 64
+_AUDIT_FLUSH_INTERVAL = 0.1  # seconds to wait for a batch to fill
+_AUDIT_QUEUE_MAX_ENTRIES = 1024  # backlog cap; past this log_action writes inline
+# Entries carry the log path in effect when they were logged, not when they are written
+_audit_queue: queue.Queue[tuple[Path, str]] = queue.Queue(maxsize=_AUDIT_QUEUE_MAX_ENTRIES)
+_audit_writer: threading.Thread | None = None
+_audit_writer_lock = threading.Lock()
+
 
 def validate_hwnd_range(hwnd: int) -> None:
     """Validate that an HWND is within the valid Win32 range.
@@ -31,24 +54,48 @@ def validate_hwnd_range(hwnd: int) -> None:
 
 def check_restricted(process_name: str) -> None:
     """Check if a process is in the restricted list. Raises AccessDeniedError if restricted."""
-    if process_name.lower() in config.RESTRICTED_PROCESSES:
+    restricted = config.RESTRICTED_PROCESS_SET
+    if process_name in restricted:
+        raise AccessDeniedError(process_name)
+    # Names from get_process_name_by_pid are already lowercase; only fold the others
+    if not process_name.islower() and process_name.lower() in restricted:
         raise AccessDeniedError(process_name)
 
 
 def get_process_name_by_pid(pid: int) -> str:
-    """Get process name from PID. Returns empty string on failure."""
+    """Get process name from PID. Returns empty string on failure.
+
+    Results are cached for _PID_NAME_TTL seconds per PID so back-to-back
+    security gates don't reopen the process each time. Failures are cached
+    for a shorter window, and expired entries are dropped when looked up.
+    """
+    now = time.monotonic()
+    with _pid_name_lock:
+        cached = _pid_name_cache.get(pid)
+        if cached is not None:
+            if cached[1] > now:
+                _pid_name_cache.move_to_end(pid)
+                return cached[0]
+            del _pid_name_cache[pid]
+
+    name = _lookup_process_name(pid)
+    ttl = _PID_NAME_TTL if name else _PID_NAME_FAILURE_TTL
+    with _pid_name_lock:
+        _pid_name_cache[pid] = (name, now + ttl)
+        _pid_name_cache.move_to_end(pid)
+        if len(_pid_name_cache) > _PID_NAME_CACHE_MAX_ENTRIES:
+            _pid_name_cache.popitem(last=False)
+    return name
+
+
+def _lookup_process_name(pid: int) -> str:
+    """Resolve a PID to its lowercase executable stem via the Win32 API."""
     try:
-        import win32api
-        import win32process
-        import win32con
+        from src.utils.win32_window import _get_process_name
 
-        handle = win32api.OpenProcess(win32con.PROCESS_QUERY_INFORMATION | win32con.PROCESS_VM_READ, False, pid)
-        try:
-            exe = win32process.GetModuleFileNameEx(handle, 0)
-            return Path(exe).stem.lower()
-        finally:
-            win32api.CloseHandle(handle)
+        return _get_process_name(pid)
     except Exception:
+        logger.debug("Process name lookup failed for PID %d", pid, exc_info=True)
         return ""
 
 
@@ -57,7 +104,7 @@ def validate_hwnd_fresh(hwnd: int) -> bool:
 
     Returns True if the window is valid.
     """
-    return bool(ctypes.windll.user32.IsWindow(hwnd))
+    return bool(_IsWindow(hwnd))
 
 
 def check_rate_limit() -> None:
@@ -88,35 +135,126 @@ def guard_dry_run(tool_name: str, params: dict[str, Any]) -> dict[str, Any] | No
     )
 
 
+def _write_audit_lines(path: Path, lines: list[str]) -> None:
+    """Append pre-serialized audit lines to the log file at path in one open/write."""
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(path, "a", encoding="utf-8") as f:
+            f.writelines(lines)
+    except Exception as e:
+        logger.warning("Failed to write audit log: %s", e)
+
+
+def _audit_writer_loop() -> None:
+    """Drain the audit queue forever, writing up to _AUDIT_BATCH_SIZE lines at a time."""
+    while True:
+        batch = [_audit_queue.get()]
+        deadline = time.monotonic() + _AUDIT_FLUSH_INTERVAL
+        while len(batch) < _AUDIT_BATCH_SIZE:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(_audit_queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        by_path: dict[Path, list[str]] = {}
+        for path, line in batch:
+            by_path.setdefault(path, []).append(line)
+        for path, lines in by_path.items():
+            _write_audit_lines(path, lines)
+        for _ in batch:
+            _audit_queue.task_done()
+
+
+def _ensure_audit_writer() -> None:
+    """Start the background audit writer on first use."""
+    global _audit_writer
+    if _audit_writer is not None:
+        return
+    with _audit_writer_lock:
+        if _audit_writer is None:
+            _audit_writer = threading.Thread(
+                target=_audit_writer_loop, name="cv-audit-writer", daemon=True
+            )
+            _audit_writer.start()
+
+
+def flush_audit_log() -> None:
+    """Block until every queued audit entry has been written to disk."""
+    if _audit_writer is not None:
+        _audit_queue.join()
+
+
+atexit.register(flush_audit_log)
+
+
 def log_action(tool_name: str, params: dict[str, Any], result_status: str) -> None:
-    """Log an action to the structured audit log."""
+    """Log an action to the structured audit log.
+
+    The entry is serialized here and queued; the file append happens on a
+    background thread, so the entry is NOT on disk when this returns. Call
+    flush_audit_log() when the write must be durable. If the writer falls
+    _AUDIT_QUEUE_MAX_ENTRIES lines behind, the entry is written synchronously
+    instead of growing the queue further.
+    """
     try:
-        config.AUDIT_LOG_PATH.parent.mkdir(parents=True, exist_ok=True)
         entry = {
             "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
             "tool": tool_name,
             "params": _sanitize_params(params),
             "result": result_status,
         }
-        with open(config.AUDIT_LOG_PATH, "a", encoding="utf-8") as f:
-            f.write(json.dumps(entry) + "\n")
+        path = config.AUDIT_LOG_PATH
+        line = json.dumps(entry) + "\n"
+        _ensure_audit_writer()
+        try:
+            _audit_queue.put_nowait((path, line))
+        except queue.Full:
+            logger.warning("Audit queue full; writing entry synchronously")
+            _write_audit_lines(path, [line])
     except Exception as e:
         logger.warning("Failed to write audit log: %s", e)
 
 
-def _apply_redaction_patterns(text: str, patterns: list[str]) -> str:
-    """Apply regex redaction patterns to a string."""
+@functools.lru_cache(maxsize=8)
+def _compile_redaction_patterns(patterns: tuple[str, ...]) -> tuple[re.Pattern[str], ...]:
+    """Compile redaction patterns once per distinct pattern set.
+
+    Invalid and empty patterns are dropped here rather than on every call.
+    When no pattern uses numbered groups, the set is folded into a single
+    alternation so redaction is one pass over the text instead of N.
+    """
+    compiled: list[re.Pattern[str]] = []
     for pattern in patterns:
         if not pattern:
             continue
         try:
-            regex = re.compile(pattern, re.IGNORECASE)
-            text = regex.sub("[REDACTED]", text)
+            compiled.append(re.compile(pattern, re.IGNORECASE))
         except re.error:
-            continue
+            logger.warning("Skipping invalid redaction pattern: %r", pattern)
+
+    if len(compiled) > 1 and all(regex.groups == 0 for regex in compiled):
+        try:
+            combined = "|".join(f"(?:{regex.pattern})" for regex in compiled)
+            return (re.compile(combined, re.IGNORECASE),)
+        except re.error:
+            pass
+    return tuple(compiled)
+
+
+def _redact(text: str, compiled: tuple[re.Pattern[str], ...]) -> str:
+    """Apply precompiled redaction regexes to a string."""
+    for regex in compiled:
+        text = regex.sub("[REDACTED]", text)
     return text
 
 
+def _apply_redaction_patterns(text: str, patterns: list[str]) -> str:
+    """Apply regex redaction patterns to a string."""
+    return _redact(text, _compile_redaction_patterns(tuple(patterns)))
+
+
 def redact_ocr_output(text: str, regions: list[Any]) -> tuple[str, list[Any]]:
     """Apply redaction patterns to OCR output.
 
@@ -127,7 +265,8 @@ def redact_ocr_output(text: str, regions: list[Any]) -> tuple[str, list[Any]]:
     if not patterns:
         return text, regions
 
-    redacted_text = _apply_redaction_patterns(text, patterns)
+    compiled = _compile_redaction_patterns(tuple(patterns))
+    redacted_text = _redact(text, compiled)
 
     redacted_regions = []
     for region in regions:
@@ -135,27 +274,28 @@ def redact_ocr_output(text: str, regions: list[Any]) -> tuple[str, list[Any]]:
         if hasattr(region, "model_copy"):
             # Pydantic v2 model
             r = region.model_copy(deep=True)
-            r.text = _apply_redaction_patterns(r.text, patterns)
+            r.text = _redact(r.text, compiled)
             # Also redact word-level text if present
             if hasattr(r, "words") and r.words:
                 for word in r.words:
-                    word.text = _apply_redaction_patterns(word.text, patterns)
+                    word.text = _redact(word.text, compiled)
             redacted_regions.append(r)
         else:
             # Plain dict
             r = dict(region)
-            r["text"] = _apply_redaction_patterns(r.get("text", ""), patterns)
+            r["text"] = _redact(r.get("text", ""), compiled)
             redacted_regions.append(r)
 
     return redacted_text, redacted_regions
 
 
 def _sanitize_params(params: dict[str, Any]) -> dict[str, Any]:
-    """Sanitize parameters for logging — replace text content with length."""
-    sanitized = {}
-    for key, value in params.items():
-        if key in ("text",) and isinstance(value, str):
-            sanitized[key] = f"[TEXT len={len(value)}]"
-        else:
-            sanitized[key] = value
-    return sanitized
+    """Sanitize parameters for logging — replace text content with length.
+
+    Returns params itself when there is no string "text" to hide, so callers
+    must not mutate the result.
+    """
+    text = params.get("text")
+    if not isinstance(text, str):
+        return params
+    return {**params, "text": f"[TEXT len={len(text)}]"}
@@ -4,8 +4,14 @@ from __future__ import annotations
 
 import ctypes
 import logging
+import queue
+import sys
 import threading
 import time
+from collections import OrderedDict
+from collections.abc import Callable
+from concurrent.futures import Future
+from concurrent.futures import TimeoutError as FutureTimeoutError
 from typing import Any
 
 import comtypes
@@ -15,6 +21,11 @@ import win32process
 
 from src import config
 from src.models import Rect, UiaElement
+from src.utils._win32api import WNDENUMPROC
+from src.utils._win32api import EnumChildWindows as _EnumChildWindows
+from src.utils._win32api import GetClassNameW as _GetClassNameW
+from src.utils._win32api import IsWindow as _IsWindow
+from src.utils._win32api import PostMessageW as _PostMessageW
 
 logger = logging.getLogger(__name__)
 
@@ -23,14 +34,33 @@ CLSID_CUIAutomation = comtypes.GUID("{FF48DBA4-60EF-4201-AA87-54103EEF594E}")
 IID_IUIAutomation = comtypes.GUID("{30CBE57D-D9D0-452A-AB13-7AC5AC4825EE}")
 
 # Chromium/Electron accessibility activation constants
+# Lowercase executable stems, matching what _get_process_name returns
 _CHROMIUM_PROCESSES = frozenset({
-    'chrome', 'msedge', 'electron', 'code', 'slack', 'discord',
+    'chrome', 'msedge', 'msedgewebview2', 'electron', 'code', 'slack', 'discord',
     'teams', 'spotify', 'notion', 'figma', 'postman', 'brave', 'vivaldi', 'opera'
 })
 WM_GETOBJECT = 0x003D
 OBJID_CLIENT = 0xFFFFFFFC  # -4 as unsigned 32-bit
-SMTO_ABORTIFHUNG = 0x0002
-_activated_hwnds: set[int] = set()
+_RENDERER_CLASS_NAME = "Chrome_RenderWidgetHostHWND"
+_CLASS_NAME_BUFFER_LEN = 64  # longer than _RENDERER_CLASS_NAME, so truncation can't fake a match
+# After activation, poll for the renderer's Document element instead of a fixed sleep
+_RENDERER_SETTLE_TIMEOUT = 0.2
+_RENDERER_SETTLE_POLL_INTERVAL = 0.02
+UIA_DOCUMENT_CONTROL_TYPE_ID = 50030
+# (pid, process name) -> activation time for Chromium processes already switched
+# into accessibility mode; the name guards against a recycled pid. Bounded LRU with
+# a TTL so a long-running server neither grows without limit nor trusts stale entries.
+_activated_pids: OrderedDict[tuple[int, str], float] = OrderedDict()
+_activated_pids_lock = threading.Lock()
+_ACTIVATED_PIDS_MAX_ENTRIES = 512
+_ACTIVATED_PID_TTL = 300.0
+# hwnd -> (pid, process name, class name). A window's class and owning process
+# never change, so only the pid is re-read to notice a recycled hwnd.
+_window_identity: dict[int, tuple[int, str, str]] = {}
+_WINDOW_IDENTITY_MAX_ENTRIES = 256
+# top-level hwnd -> its Chrome_RenderWidgetHostHWND children from the last activation,
+# so re-activating after the TTL only re-validates them instead of re-enumerating
+_renderer_children: dict[int, list[int]] = {}
 
 # Control type IDs for interactive elements
 INTERACTIVE_CONTROL_TYPES: set[int] = {
@@ -51,10 +81,51 @@ VALUE_CONTROL_TYPES: set[int] = {
 }
 
 # UIA property IDs
+UIA_BOUNDING_RECTANGLE_PROPERTY_ID = 30001
+UIA_CONTROL_TYPE_PROPERTY_ID = 30003
+UIA_NAME_PROPERTY_ID = 30005
+UIA_IS_ENABLED_PROPERTY_ID = 30010
+UIA_IS_OFFSCREEN_PROPERTY_ID = 30022
 UIA_IS_PASSWORD_PROPERTY_ID = 30019
+UIA_VALUE_VALUE_PROPERTY_ID = 30045
+
+# Properties prefetched for every element in one cross-process call
+_CACHED_PROPERTY_IDS: tuple[int, ...] = (
+    UIA_CONTROL_TYPE_PROPERTY_ID,
+    UIA_NAME_PROPERTY_ID,
+    UIA_IS_ENABLED_PROPERTY_ID,
+    UIA_BOUNDING_RECTANGLE_PROPERTY_ID,
+    UIA_IS_PASSWORD_PROPERTY_ID,
+    UIA_VALUE_VALUE_PROPERTY_ID,
+    UIA_IS_OFFSCREEN_PROPERTY_ID,
+)
+
+# Layout-only control types whose zero-area subtrees are skipped in interactive mode
+_LAYOUT_CONTROL_TYPES: frozenset[int] = frozenset({
+    50027,  # Thumb
+    50033,  # Pane
+    50037,  # TitleBar
+    50038,  # Separator
+})
+
+# TreeScope / AutomationElementMode enum values
+TREE_SCOPE_ELEMENT = 1
+TREE_SCOPE_CHILDREN = 2
+TREE_SCOPE_DESCENDANTS = 4
+AUTOMATION_ELEMENT_MODE_NONE = 0
+
+
+class _ControlTypeNames(dict[int, str]):
+    """Control type ID -> name map that names unknown IDs once and remembers them."""
+
+    def __missing__(self, key: int) -> str:
+        name = sys.intern(f"Unknown({key})")
+        self[key] = name
+        return name
+
 
 # Human-readable control type names
-CONTROL_TYPE_NAMES: dict[int, str] = {
+CONTROL_TYPE_NAMES: dict[int, str] = _ControlTypeNames({
     50000: "Button",
     50001: "Calendar",
     50002: "CheckBox",
@@ -94,38 +165,58 @@ CONTROL_TYPE_NAMES: dict[int, str] = {
     50036: "Table",
     50037: "TitleBar",
     50038: "Separator",
-}
+})
 
-# Cached CUIAutomation instance
-_uia_instance: Any = None
+# CUIAutomation instance per thread: a COM object belongs to the apartment that
+# created it, so each UIA worker thread creates and keeps its own
+_uia_local = threading.local()
+
+# Worker thread that runs tree walks (see _UiaWorker)
+_worker: _UiaWorker | None = None
+_worker_lock = threading.Lock()
+
+# (hwnd, depth, filter, max_nodes) -> (walk start time, window fingerprint, elements)
+_tree_cache: dict[tuple[int, int, str, int], tuple[float, Any, UiaTree]] = {}
+_tree_cache_lock = threading.Lock()
+_TREE_CACHE_MAX_ENTRIES = 32
+
+# "ref_<n>" ids shared across walks so numbering the same trees again
+# doesn't allocate fresh strings; grown on demand up to the pool size
+_REF_ID_POOL_SIZE = 4096
+_ref_ids: list[str] = ["ref_0"]
+_ref_ids_lock = threading.Lock()
+
+# Walks in progress, by tree cache key; concurrent callers share one walk
+_pending_walks: dict[tuple[int, int, str, int], Future[UiaTree]] = {}
+_pending_walks_lock = threading.Lock()
 
 
 def init_uia() -> Any:
-    """Initialize and cache the CUIAutomation COM object.
+    """Initialize and cache the CUIAutomation COM object for the calling thread.
 
     Returns the IUIAutomation interface.
     """
-    global _uia_instance
-    if _uia_instance is not None:
-        return _uia_instance
+    uia = getattr(_uia_local, "instance", None)
+    if uia is not None:
+        return uia
 
-    _uia_instance = comtypes.CoCreateInstance(
+    uia = _uia_local.instance = comtypes.CoCreateInstance(
         CLSID_CUIAutomation,
         interface=comtypes.gen.UIAutomationClient.IUIAutomation,
         clsctx=comtypes.CLSCTX_INPROC_SERVER,
     )
     logger.info("CUIAutomation COM object initialized")
-    return _uia_instance
+    return uia
 
 
 def _init_uia_raw() -> Any:
     """Initialize UIA using raw COM creation (fallback if type library not available)."""
-    global _uia_instance
-    if _uia_instance is not None:
-        return _uia_instance
+    uia = getattr(_uia_local, "instance", None)
+    if uia is not None:
+        return uia
 
     try:
-        _uia_instance = comtypes.CoCreateInstance(
+        uia = comtypes.CoCreateInstance(
             CLSID_CUIAutomation,
             interface=comtypes.gen.UIAutomationClient.IUIAutomation,
             clsctx=comtypes.CLSCTX_INPROC_SERVER,
@@ -135,21 +226,22 @@ def _init_uia_raw() -> Any:
         comtypes.client.GetModule("UIAutomationCore.dll")
         from comtypes.gen.UIAutomationClient import IUIAutomation
 
-        _uia_instance = comtypes.CoCreateInstance(
+        uia = comtypes.CoCreateInstance(
             CLSID_CUIAutomation,
             interface=IUIAutomation,
             clsctx=comtypes.CLSCTX_INPROC_SERVER,
         )
 
+    _uia_local.instance = uia
     logger.info("CUIAutomation COM object initialized")
-    return _uia_instance
+    return uia
 
 
 def _safe_init_uia() -> Any:
     """Try multiple initialization strategies."""
-    global _uia_instance
-    if _uia_instance is not None:
-        return _uia_instance
+    uia = getattr(_uia_local, "instance", None)
+    if uia is not None:
+        return uia
 
     try:
         return init_uia()
@@ -157,76 +249,158 @@ def _safe_init_uia() -> Any:
         return _init_uia_raw()
 
 
-def _ensure_chromium_accessibility(hwnd: int) -> None:
+def _ensure_chromium_accessibility(hwnd: int) -> bool:
     """Send WM_GETOBJECT to Chrome/Electron renderer widgets to activate their UIA tree.
 
     Chromium-based apps (Chrome, Edge, VS Code, Slack, Discord, etc.) do not expose
     their accessibility tree by default. Sending WM_GETOBJECT with OBJID_CLIENT to
     their Chrome_RenderWidgetHostHWND children forces the accessibility tree to populate.
 
+    Activation is cached per process: once Chromium enables accessibility it stays
+    on for the process lifetime, so new tabs and popups of an activated process are
+    not re-enumerated. Entries expire after _ACTIVATED_PID_TTL seconds and the
+    cache keeps at most _ACTIVATED_PIDS_MAX_ENTRIES processes.
+
     This is a no-op for non-Chromium windows. Activation failures are silently caught
     so they never break the existing UIA tree walk.
+
+    Returns:
+        True if renderers were just activated, in which case the walk should
+        wait for their tree to appear (see _wait_for_renderer_tree).
     """
     try:
-        # Check cache -- skip if already activated
-        if hwnd in _activated_hwnds:
-            return
+        pid, process_name, class_name = _get_window_identity(hwnd)
+
+        # Check cache -- skip if this process was activated recently
+        cache_key = (pid, process_name)
+        now = time.monotonic()
+        with _activated_pids_lock:
+            activated_at = _activated_pids.get(cache_key)
+            if activated_at is not None:
+                if now - activated_at < _ACTIVATED_PID_TTL:
+                    _activated_pids.move_to_end(cache_key)
+                    return False
+                _activated_pids.pop(cache_key, None)
 
-        # Get process name from hwnd
-        from src.utils.win32_window import _get_process_name
-        _, pid = win32process.GetWindowThreadProcessId(hwnd)
-        process_name = _get_process_name(pid)
+        # Check if this is a Chromium-based window
+        if process_name not in _CHROMIUM_PROCESSES and class_name != "Chrome_WidgetWin_1":
+            return False
+
+        # Send WM_GETOBJECT to each Chrome_RenderWidgetHostHWND child
+        activated = _activate_renderer_children(hwnd)
+
+        # Cache the process so we don't re-activate. A window with no renderer
+        # yet (a menu, a starting browser) leaves the process uncached.
+        if activated:
+            with _activated_pids_lock:
+                _activated_pids[cache_key] = now
+                if len(_activated_pids) > _ACTIVATED_PIDS_MAX_ENTRIES:
+                    _activated_pids.popitem(last=False)
+            return True
 
-        # Get window class
-        class_name = win32gui.GetClassName(hwnd)
+    except Exception:
+        logger.debug("Chromium accessibility activation failed for HWND %d", hwnd, exc_info=True)
+    return False
 
-        # Check if this is a Chromium-based window
-        if process_name.lower() not in _CHROMIUM_PROCESSES and class_name != "Chrome_WidgetWin_1":
-            return
 
-        # Find Chrome_RenderWidgetHostHWND children
-        renderer_children: list[int] = []
+def _wait_for_renderer_tree(uia: Any, hwnd: int) -> None:
+    """Wait until a just-activated window exposes a Document element.
 
-        def _enum_callback(child_hwnd: int, results: list[int]) -> bool:
-            try:
-                child_class = win32gui.GetClassName(child_hwnd)
-                if child_class == "Chrome_RenderWidgetHostHWND":
-                    results.append(child_hwnd)
-            except Exception:
-                pass
-            return True
+    Polls every _RENDERER_SETTLE_POLL_INTERVAL seconds and gives up after
+    _RENDERER_SETTLE_TIMEOUT, the fixed delay this replaces, so the worst
+    case is unchanged. Runs on the UIA worker thread.
+    """
+    deadline = time.monotonic() + _RENDERER_SETTLE_TIMEOUT
+    try:
+        root = uia.ElementFromHandle(hwnd)
+        condition = uia.CreatePropertyCondition(
+            UIA_CONTROL_TYPE_PROPERTY_ID, UIA_DOCUMENT_CONTROL_TYPE_ID
+        )
+        while root.FindFirst(TREE_SCOPE_DESCENDANTS, condition) is None:
+            if time.monotonic() >= deadline:
+                return
+            time.sleep(_RENDERER_SETTLE_POLL_INTERVAL)
+    except Exception:
+        logger.debug("Waiting for renderer tree failed for HWND %d", hwnd, exc_info=True)
+
+
+def _get_window_identity(hwnd: int) -> tuple[int, str, str]:
+    """Return (pid, process name, class name) for hwnd, cached per window.
+
+    Repeat calls for the same window cost one GetWindowThreadProcessId
+    instead of opening the process and reading the class name again.
+    """
+    _, pid = win32process.GetWindowThreadProcessId(hwnd)
+    cached = _window_identity.get(hwnd)
+    if cached is not None and cached[0] == pid:
+        return cached
+
+    from src.utils.win32_window import _get_process_name
+    identity = (pid, _get_process_name(pid), win32gui.GetClassName(hwnd))
+    if len(_window_identity) >= _WINDOW_IDENTITY_MAX_ENTRIES:
+        _window_identity.clear()
+        _renderer_children.clear()
+    _window_identity[hwnd] = identity
+    # A different window now owns this handle; its renderers are not ours
+    _renderer_children.pop(hwnd, None)
+    return identity
+
+
+def _activate_renderer_children(hwnd: int) -> int:
+    """Send WM_GETOBJECT to every Chrome_RenderWidgetHostHWND child of hwnd.
+
+    Renderers found on a previous activation are reused if they still exist;
+    otherwise the children are enumerated, reading class names with
+    GetClassNameW into one reused buffer.
+
+    Returns the number of renderer children activated.
+    """
+    renderers = [child for child in _renderer_children.get(hwnd, ()) if _IsWindow(child)]
+    if not renderers:
+        renderers = _find_renderer_children(hwnd)
+
+    # Posted, not sent: the reply is unused and delivery alone switches the
+    # renderer on, so a hung renderer can't stall the walk. The caller's
+    # _wait_for_renderer_tree covers the time the renderer needs to respond.
+    activated = 0
+    for child_hwnd in renderers:
+        try:
+            if _PostMessageW(child_hwnd, WM_GETOBJECT, 0, OBJID_CLIENT):
+                activated += 1
+        except Exception:
+            pass
 
-        win32gui.EnumChildWindows(hwnd, _enum_callback, renderer_children)
+    if renderers:
+        _renderer_children[hwnd] = renderers
+    else:
+        _renderer_children.pop(hwnd, None)
+    return activated
 
-        # Send WM_GETOBJECT to each renderer child
-        for child_hwnd in renderer_children:
-            result = ctypes.c_long(0)
-            ctypes.windll.user32.SendMessageTimeoutW(
-                child_hwnd,
-                WM_GETOBJECT,
-                0,
-                OBJID_CLIENT,
-                SMTO_ABORTIFHUNG,
-                2000,
-                ctypes.byref(result),
-            )
 
-        # Wait for Chrome to populate the accessibility tree
-        if renderer_children:
-            time.sleep(0.2)
+def _find_renderer_children(hwnd: int) -> list[int]:
+    """Enumerate the Chrome_RenderWidgetHostHWND children of hwnd."""
+    class_name = ctypes.create_unicode_buffer(_CLASS_NAME_BUFFER_LEN)
+    renderers: list[int] = []
 
-        # Cache this hwnd so we don't re-activate
-        _activated_hwnds.add(hwnd)
+    def _enum_callback(child_hwnd: int, _lparam: int) -> bool:
+        try:
+            length = _GetClassNameW(child_hwnd, class_name, _CLASS_NAME_BUFFER_LEN)
+            if length == len(_RENDERER_CLASS_NAME) and class_name.value == _RENDERER_CLASS_NAME:
+                renderers.append(child_hwnd)
+        except Exception:
+            pass
+        return True
 
-    except Exception:
-        logger.debug("Chromium accessibility activation failed for HWND %d", hwnd, exc_info=True)
+    _EnumChildWindows(hwnd, WNDENUMPROC(_enum_callback), 0)
+    return renderers
 
 
 def get_ui_tree(
     hwnd: int,
     depth: int = 5,
     filter: str = "all",
-) -> list[UiaElement]:
+    max_nodes: int | None = None,
+) -> UiaTree:
     """Walk the UI Automation tree for a window.
 
     Args:
@@ -234,157 +408,472 @@ def get_ui_tree(
         depth: Maximum tree depth to traverse. Default 5.
         filter: "all" for all elements, "interactive" for only
                 Button/Edit/ComboBox/CheckBox/MenuItem/Link/Slider/Tab.
+        max_nodes: Element budget for the walk. Defaults to config.UIA_MAX_NODES.
+            Huge trees come back partial with truncated=True instead of
+            timing out.
 
     Returns:
-        List of UiaElement trees.
+        UiaTree (a list) of UiaElement trees. A walk of the same window with the same
+        arguments within config.UIA_TREE_TTL seconds is reused as long as the
+        window's rect and title are unchanged, and callers arriving while such
+        a walk is still running wait for it; treat the result as read-only.
     """
-    uia = _safe_init_uia()
+    if max_nodes is None:
+        max_nodes = config.UIA_MAX_NODES
+    cache_key = (hwnd, depth, filter, max_nodes)
+    fingerprint = _window_fingerprint(hwnd)
+    with _tree_cache_lock:
+        cached = _tree_cache.get(cache_key)
+    if (
+        cached is not None
+        and fingerprint is not None
+        and cached[1] == fingerprint
+        and time.monotonic() - cached[0] < config.UIA_TREE_TTL
+    ):
+        return cached[2]
+
+    with _pending_walks_lock:
+        pending = _pending_walks.get(cache_key)
+        if pending is None:
+            shared: Future[UiaTree] = Future()
+            _pending_walks[cache_key] = shared
+    if pending is not None:
+        try:
+            return pending.result(timeout=config.UIA_TIMEOUT)
+        except FutureTimeoutError:
+            raise TimeoutError(
+                f"UI Automation tree walk timed out after {config.UIA_TIMEOUT}s for HWND {hwnd}"
+            ) from None
 
-    _ensure_chromium_accessibility(hwnd)
+    walk_started = time.monotonic()
+    try:
+        elements = _run_walk(hwnd, depth, filter == "interactive", max_nodes)
+    except BaseException as exc:
+        shared.set_exception(exc)
+        raise
+    else:
+        shared.set_result(elements)
+    finally:
+        with _pending_walks_lock:
+            _pending_walks.pop(cache_key, None)
+
+    if fingerprint is not None and config.UIA_TREE_TTL > 0:
+        with _tree_cache_lock:
+            _tree_cache.pop(cache_key, None)
+            if len(_tree_cache) >= _TREE_CACHE_MAX_ENTRIES:
+                _tree_cache.pop(next(iter(_tree_cache)), None)
+            _tree_cache[cache_key] = (walk_started, fingerprint, elements)
+    return elements
 
-    # Counter for generating ref_ids (mutable container for closure)
-    counter = [0]
-    interactive_only = filter == "interactive"
 
-    # Use a thread with timeout to prevent hangs on unresponsive apps
-    result_container: list[list[UiaElement]] = []
-    error_container: list[Exception] = []
+def _run_walk(hwnd: int, depth: int, interactive_only: bool, max_nodes: int) -> UiaTree:
+    """Activate Chromium if needed and walk the tree on the worker with a timeout."""
+    settle = _ensure_chromium_accessibility(hwnd)
+
+    # Walk on the UIA worker thread with a timeout to prevent hangs on unresponsive apps
+    cancel = threading.Event()
+    worker = _get_worker()
+    future = worker.submit(_walk_tree, hwnd, depth, interactive_only, cancel, max_nodes, settle)
+    try:
+        elements: UiaTree = future.result(timeout=config.UIA_TIMEOUT)
+    except FutureTimeoutError:
+        if future.done():
+            # Failed by a worker retired for an earlier hung walk, not our timeout
+            raise
+        cancel.set()
+        future.cancel()
+        _retire_worker(worker)
+        logger.warning("UIA tree walk timed out after %.1fs for HWND %d", config.UIA_TIMEOUT, hwnd)
+        raise TimeoutError(
+            f"UI Automation tree walk timed out after {config.UIA_TIMEOUT}s for HWND {hwnd}"
+        ) from None
 
-    def _walk_tree() -> None:
+    if elements.truncated:
+        logger.info("UIA tree walk for HWND %d stopped at the %d node budget", hwnd, max_nodes)
+    return elements
+
+
+def _walk_tree(
+    hwnd: int,
+    depth: int,
+    interactive_only: bool,
+    cancel: threading.Event,
+    max_nodes: int,
+    settle: bool = False,
+) -> UiaTree:
+    """Fetch and walk a window's UIA tree. Runs on the UIA worker thread."""
+    uia = _safe_init_uia()
+    if settle:
+        _wait_for_renderer_tree(uia, hwnd)
+    # Fetch the root and its children with their properties in one call, then
+    # read Cached* values locally instead of one RPC per property. Deeper
+    # levels are fetched as the walk descends into them.
+    cache_request = _build_cache_request(uia, interactive_only)
+    root_element = uia.ElementFromHandleBuildCache(hwnd, cache_request)
+    return _walk_children(root_element, depth, interactive_only, cancel, max_nodes, cache_request)
+
+
+class _UiaWorker:
+    """Long-lived thread that runs UIA jobs in its own single-threaded apartment.
+
+    COM is initialized once for the thread instead of each walk spawning a
+    fresh, uninitialized thread, and the thread creates its own IUIAutomation
+    instance on its first job. A retired worker accepts no new jobs and fails
+    those still queued, since its thread stops reading once the hung call returns.
+    Retiring also queues a None sentinel so an idle thread wakes up and exits.
+    """
+
+    def __init__(self) -> None:
+        self._jobs: queue.Queue[tuple[Callable[..., Any], tuple[Any, ...], Future[Any]] | None] = (
+            queue.Queue()
+        )
+        self._lock = threading.Lock()
+        self.retired = False
+        self._thread = threading.Thread(target=self._run, name="uia-worker", daemon=True)
+        self._thread.start()
+
+    def submit(self, fn: Callable[..., Any], *args: Any) -> Future[Any]:
+        """Queue fn(*args) on the worker and return a Future for its result."""
+        future: Future[Any] = Future()
+        with self._lock:
+            if not self.retired:
+                self._jobs.put((fn, args, future))
+                return future
+        future.set_exception(_worker_retired_error())
+        return future
+
+    def retire(self) -> None:
+        """Stop accepting jobs and fail every job that hasn't started yet."""
+        with self._lock:
+            self.retired = True
+        self._fail_queued()
+        self._jobs.put(None)
+
+    def _fail_queued(self) -> None:
+        while True:
+            try:
+                job = self._jobs.get_nowait()
+            except queue.Empty:
+                return
+            if job is None:
+                continue
+            future = job[2]
+            if future.set_running_or_notify_cancel():
+                future.set_exception(_worker_retired_error())
+
+    def _run(self) -> None:
         try:
-            root_element = uia.ElementFromHandle(hwnd)
-            condition = uia.CreateTrueCondition()
-            walker = uia.CreateTreeWalker(condition)
+            comtypes.CoInitializeEx(comtypes.COINIT_APARTMENTTHREADED)
+        except Exception:
+            logger.debug("CoInitializeEx failed on UIA worker thread", exc_info=True)
 
-            elements = _walk_children(walker, root_element, depth, counter, interactive_only)
-            result_container.append(elements)
-        except Exception as exc:
-            error_container.append(exc)
+        while not self.retired:
+            job = self._jobs.get()
+            if job is None:
+                break
+            fn, args, future = job
+            if not future.set_running_or_notify_cancel():
+                continue
+            try:
+                future.set_result(fn(*args))
+            except BaseException as exc:  # noqa: BLE001 - re-raised by future.result()
+                future.set_exception(exc)
+        self._fail_queued()
 
-    thread = threading.Thread(target=_walk_tree, daemon=True)
-    thread.start()
-    thread.join(timeout=config.UIA_TIMEOUT)
 
-    if thread.is_alive():
-        logger.warning("UIA tree walk timed out after %.1fs for HWND %d", config.UIA_TIMEOUT, hwnd)
-        raise TimeoutError(
-            f"UI Automation tree walk timed out after {config.UIA_TIMEOUT}s for HWND {hwnd}"
+def _worker_retired_error() -> TimeoutError:
+    return TimeoutError("UI Automation worker was retired after a hung tree walk; retry the request")
+
+
+def _get_worker() -> _UiaWorker:
+    """Return the current UIA worker, starting it on first use."""
+    global _worker
+    with _worker_lock:
+        if _worker is None:
+            _worker = _UiaWorker()
+        return _worker
+
+
+def _retire_worker(worker: _UiaWorker) -> None:
+    """Replace a worker stuck in a hung COM call.
+
+    The stuck thread exits once its current call returns. Jobs still queued
+    on it fail with TimeoutError rather than waiting behind the hung call.
+    """
+    global _worker
+    with _worker_lock:
+        if _worker is not worker:
+            return
+        _worker = _UiaWorker()
+    worker.retire()
+
+
+def _window_fingerprint(hwnd: int) -> tuple[Any, str] | None:
+    """Return (rect, title) for a window, or None if it can't be read."""
+    try:
+        return win32gui.GetWindowRect(hwnd), win32gui.GetWindowText(hwnd)
+    except Exception:
+        return None
+
+
+def invalidate_ui_tree_cache(hwnd: int | None = None) -> None:
+    """Drop cached UIA trees for one window, or for all windows if hwnd is None."""
+    with _tree_cache_lock:
+        if hwnd is None:
+            _tree_cache.clear()
+            return
+        for key in [key for key in _tree_cache if key[0] == hwnd]:
+            _tree_cache.pop(key, None)
+
+
+def _build_cache_request(uia: Any, interactive_only: bool = False) -> Any:
+    """Create a cache request that prefetches an element, its children and their properties.
+
+    The request covers one level, so each fetch copies at most one node's
+    children across the process boundary however large the window's tree is.
+
+    The control view drops raw-only implementation nodes (scrollbar parts,
+    anonymous panes) inside UIA, before they cross the process boundary.
+    Interactive walks use the narrower content view.
+    """
+    cache_request = uia.CreateCacheRequest()
+    for property_id in _CACHED_PROPERTY_IDS:
+        cache_request.AddProperty(property_id)
+    if interactive_only:
+        cache_request.TreeFilter = uia.ContentViewCondition
+    else:
+        cache_request.TreeFilter = uia.ControlViewCondition
+    cache_request.TreeScope = TREE_SCOPE_ELEMENT | TREE_SCOPE_CHILDREN
+    cache_request.AutomationElementMode = AUTOMATION_ELEMENT_MODE_NONE
+    return cache_request
+
+
+def _get_cached_children(element: Any) -> tuple[Any, int]:
+    """Return (IUIAutomationElementArray, length) of cached children, or (None, 0)."""
+    try:
+        children = element.GetCachedChildren()
+    except Exception:
+        return None, 0
+    if children is None:
+        return None, 0
+    return children, children.Length
+
+
+def _fetch_children(element: Any, cache_request: Any) -> tuple[Any, int]:
+    """Fetch an element's children and their properties in one call.
+
+    Returns (IUIAutomationElementArray, length), or (None, 0). Without a
+    cache request only the children already cached on the element are used.
+    """
+    if cache_request is None:
+        return _get_cached_children(element)
+    try:
+        element = element.BuildUpdatedCache(cache_request)
+    except Exception:
+        return None, 0
+    return _get_cached_children(element)
+
+
+def _cached_rect(element: Any) -> Rect | None:
+    """Return an element's cached bounding rectangle, or None if unavailable."""
+    try:
+        rect_val = element.CachedBoundingRectangle
+        return Rect(
+            x=int(rect_val.left),
+            y=int(rect_val.top),
+            width=int(rect_val.right - rect_val.left),
+            height=int(rect_val.bottom - rect_val.top),
         )
+    except Exception:
+        return None
 
-    if error_container:
-        raise error_container[0]
 
-    if result_container:
-        return result_container[0]
+def _can_prune(element: Any, rect: Rect, bounds: Rect | None) -> bool:
+    """Whether a non-interactive element's subtree can be skipped in interactive mode.
 
-    return []
+    True for zero-area layout containers, and for offscreen elements lying
+    entirely outside the window bounds.
+    """
+    if (rect.width <= 0 or rect.height <= 0) and element.CachedControlType in _LAYOUT_CONTROL_TYPES:
+        return True
+    if bounds is None or not element.CachedIsOffscreen:
+        return False
+    return (
+        rect.x >= bounds.x + bounds.width
+        or rect.y >= bounds.y + bounds.height
+        or rect.x + rect.width <= bounds.x
+        or rect.y + rect.height <= bounds.y
+    )
+
+
+def _read_element(child: Any) -> tuple[str, str, Rect, str | None, bool, bool, bool]:
+    """Read one element's cached properties.
+
+    Cached reads are local, so there is no per-property guard; anything
+    that does raise propagates to the single per-node guard in the walk.
+
+    Returns (name, control_type_name, rect, value, is_enabled, is_interactive, is_password).
+    """
+    control_type_id = child.CachedControlType
+    name = child.CachedName or ""
+    is_enabled = bool(child.CachedIsEnabled)
+    is_password = bool(child.CachedIsPassword)
+
+    rect_val = child.CachedBoundingRectangle
+    rect = Rect(
+        x=int(rect_val.left),
+        y=int(rect_val.top),
+        width=int(rect_val.right - rect_val.left),
+        height=int(rect_val.bottom - rect_val.top),
+    )
+
+    is_interactive = control_type_id in INTERACTIVE_CONTROL_TYPES
+    control_type_name = CONTROL_TYPE_NAMES[control_type_id]
+
+    # Value pattern's Value property for Edit/Document controls
+    value = None
+    if control_type_id in VALUE_CONTROL_TYPES:
+        if is_password:
+            value = "[PASSWORD]"
+        else:
+            raw_value = child.GetCachedPropertyValue(UIA_VALUE_VALUE_PROPERTY_ID)
+            if raw_value:
+                value = str(raw_value)
+
+    return name, control_type_name, rect, value, is_enabled, is_interactive, is_password
+
+
+def _ref_id(index: int) -> str:
+    """Return the ref_id string for a 1-based element index."""
+    if index < len(_ref_ids):
+        return _ref_ids[index]
+    if index >= _REF_ID_POOL_SIZE:
+        return f"ref_{index}"
+    with _ref_ids_lock:
+        _ref_ids.extend(f"ref_{i}" for i in range(len(_ref_ids), index + 1))
+    return _ref_ids[index]
+
+
+class UiaTree(list[UiaElement]):
+    """List of top-level UiaElements returned by get_ui_tree.
+
+    truncated is True when the walk used up its node budget, in which case
+    the tree holds the elements visited before the budget ran out.
+    """
+
+    truncated: bool = False
 
 
 def _walk_children(
-    walker: Any,
     parent: Any,
     remaining_depth: int,
-    counter: list[int],
     interactive_only: bool,
-) -> list[UiaElement]:
-    """Recursively walk child elements of a UIA parent node.
+    cancel: threading.Event | None = None,
+    max_nodes: int | None = None,
+    cache_request: Any = None,
+) -> UiaTree:
+    """Walk the descendants of a UIA parent node depth-first.
+
+    Uses an explicit stack instead of recursion. Elements are emitted in
+    post-order (children before their parent), so ref_ids are numbered the
+    same way the recursive walk numbered them.
 
     Args:
-        walker: IUIAutomationTreeWalker instance.
-        parent: Parent IUIAutomationElement.
+        parent: IUIAutomationElement built with _build_cache_request.
         remaining_depth: How many more levels to descend.
-        counter: Mutable counter list for ref_id generation.
         interactive_only: If True, only include interactive control types.
+        cancel: Stops the walk early when set (the caller has timed out).
+        max_nodes: Stop after reading this many elements. No children are
+            fetched once the budget is spent. Ancestors of the elements read
+            so far are still emitted, and the result is marked truncated.
+        cache_request: Request the parent was built with. Each node the walk
+            descends into has its children fetched with it, one level per
+            call, so nothing below the depth limit is fetched.
 
     Returns:
-        List of UiaElement for the children.
+        UiaTree of UiaElement for the children.
     """
+    result = UiaTree()
     if remaining_depth <= 0:
-        return []
-
-    elements: list[UiaElement] = []
+        return result
+
+    counter = 0
+    visited = 0
+    bounds = _cached_rect(parent) if interactive_only else None
+
+    def _emit(
+        out: list[UiaElement],
+        props: tuple[str, str, Rect, str | None, bool, bool, bool],
+        children: list[UiaElement],
+    ) -> None:
+        nonlocal counter
+        name, control_type_name, rect, value, is_enabled, is_interactive, is_password = props
+        # Include this element if filter allows, or if it has interactive descendants
+        if not interactive_only or is_interactive or children:
+            counter += 1
+            out.append(UiaElement(
+                ref_id=_ref_id(counter),
+                name=name,
+                control_type=control_type_name,
+                rect=rect,
+                value=value,
+                is_enabled=is_enabled,
+                is_interactive=is_interactive,
+                children=children,
+                is_password=is_password,
+            ))
+
+    # Frame: [children array, length, next index, remaining depth, output list,
+    #         properties of the child whose subtree is being walked]
+    array, length = _get_cached_children(parent)
+    stack: list[list[Any]] = [[array, length, 0, remaining_depth, result, None]]
+
+    while stack:
+        if cancel is not None and cancel.is_set():
+            return result
+        frame = stack[-1]
+        index = frame[2]
+        if index >= frame[1]:
+            stack.pop()
+            if stack:
+                outer = stack[-1]
+                _emit(outer[4], outer[5], frame[4])
+                outer[5] = None
+            continue
+        if max_nodes is not None and visited >= max_nodes:
+            # Out of budget: close the open ancestors with what they have so far
+            result.truncated = True
+            while len(stack) > 1:
+                frame = stack.pop()
+                outer = stack[-1]
+                _emit(outer[4], outer[5], frame[4])
+                outer[5] = None
+            break
+        frame[2] = index + 1
+        visited += 1
 
-    try:
-        child = walker.GetFirstChildElement(parent)
-    except Exception:
-        return elements
-
-    while child is not None:
         try:
-            control_type_id = child.CurrentControlType
-            name = child.CurrentName or ""
-            is_enabled = bool(child.CurrentIsEnabled)
-
-            # Get bounding rectangle
-            try:
-                rect_val = child.CurrentBoundingRectangle
-                rect = Rect(
-                    x=int(rect_val.left),
-                    y=int(rect_val.top),
-                    width=int(rect_val.right - rect_val.left),
-                    height=int(rect_val.bottom - rect_val.top),
-                )
-            except Exception:
-                rect = Rect(x=0, y=0, width=0, height=0)
-
-            is_interactive = control_type_id in INTERACTIVE_CONTROL_TYPES
-            control_type_name = CONTROL_TYPE_NAMES.get(control_type_id, f"Unknown({control_type_id})")
-
-            # Check IsPassword property
-            is_password = False
-            try:
-                is_password = bool(
-                    child.GetCurrentPropertyValue(UIA_IS_PASSWORD_PROPERTY_ID)
-                )
-            except Exception:
-                pass
-
-            # Try to get Value from Value pattern for Edit/Document controls
-            value = None
-            if control_type_id in VALUE_CONTROL_TYPES:
-                try:
-                    # IUIAutomationValuePattern interface ID = 10002
-                    value_pattern = child.GetCurrentPattern(10002)
-                    if value_pattern is not None:
-                        raw_value = value_pattern.CurrentValue
-                        if is_password:
-                            value = "[PASSWORD]"
-                        elif raw_value:
-                            value = str(raw_value)
-                except Exception:
-                    pass
-
-            # Recurse into children regardless of filter
-            children = _walk_children(
-                walker, child, remaining_depth - 1, counter, interactive_only
-            )
-
-            # Include this element if filter allows, or if it has interactive descendants
-            if not interactive_only or is_interactive or children:
-                counter[0] += 1
-                ref_id = f"ref_{counter[0]}"
-
-                element = UiaElement(
-                    ref_id=ref_id,
-                    name=name,
-                    control_type=control_type_name,
-                    rect=rect,
-                    value=value,
-                    is_enabled=is_enabled,
-                    is_interactive=is_interactive,
-                    children=children,
-                    is_password=is_password,
-                )
-                elements.append(element)
-
-            # Move to next sibling
-            child = walker.GetNextSiblingElement(child)
-
+            child = frame[0].GetElement(index)
+            props = _read_element(child)
+            # Interactive mode: skip subtrees that can't hold visible controls
+            if interactive_only and not props[5] and _can_prune(child, props[2], bounds):
+                continue
         except Exception as exc:
             logger.debug("Error walking UIA element: %s", exc)
-            try:
-                child = walker.GetNextSiblingElement(child)
-            except Exception:
-                break
-
-    return elements
+            continue
+
+        # Descend into children regardless of filter
+        depth = frame[3]
+        if depth > 1:
+            if max_nodes is not None and visited >= max_nodes:
+                # Budget spent: don't fetch a level the walk won't read
+                result.truncated = True
+            else:
+                child_array, child_length = _fetch_children(child, cache_request)
+                if child_length:
+                    frame[5] = props
+                    stack.append([child_array, child_length, 0, depth - 1, [], None])
+                    continue
+        _emit(frame[4], props, [])
+
+    return result
@@ -3,10 +3,13 @@
 from __future__ import annotations
 
 import ctypes
-import ctypes.wintypes
+import functools
 import logging
+import struct
 from typing import Any
 
+from src.utils._win32api import SendInput as _SendInput
+
 logger = logging.getLogger(__name__)
 
 # --- ctypes struct definitions for SendInput ---
@@ -106,15 +109,20 @@ VK_MAP: dict[str, int] = {
 MODIFIER_VKS = {VK_SHIFT, VK_CONTROL, VK_MENU, VK_LWIN, VK_RWIN}
 
 
+# Flags shared by every absolute-positioned mouse event
+_ABSOLUTE_MOVE = MOUSEEVENTF_ABSOLUTE | MOUSEEVENTF_VIRTUALDESK | MOUSEEVENTF_MOVE
+
+# (down, up) flags per button with the absolute move already folded in
+_BUTTON_FLAGS: dict[str, tuple[int, int]] = {
+    "left": (_ABSOLUTE_MOVE | MOUSEEVENTF_LEFTDOWN, _ABSOLUTE_MOVE | MOUSEEVENTF_LEFTUP),
+    "right": (_ABSOLUTE_MOVE | MOUSEEVENTF_RIGHTDOWN, _ABSOLUTE_MOVE | MOUSEEVENTF_RIGHTUP),
+    "middle": (_ABSOLUTE_MOVE | MOUSEEVENTF_MIDDLEDOWN, _ABSOLUTE_MOVE | MOUSEEVENTF_MIDDLEUP),
+}
+
+
 def _get_button_flags(button: str) -> tuple[int, int]:
-    """Return (down_flag, up_flag) for the given mouse button name."""
-    button = button.lower()
-    if button == "right":
-        return (MOUSEEVENTF_RIGHTDOWN, MOUSEEVENTF_RIGHTUP)
-    if button == "middle":
-        return (MOUSEEVENTF_MIDDLEDOWN, MOUSEEVENTF_MIDDLEUP)
-    # Default to left
-    return (MOUSEEVENTF_LEFTDOWN, MOUSEEVENTF_LEFTUP)
+    """Return (down_flags, up_flags) for the given mouse button name, defaulting to left."""
+    return _BUTTON_FLAGS.get(button.lower(), _BUTTON_FLAGS["left"])
 
 
 class MOUSEINPUT(ctypes.Structure):
@@ -146,6 +154,23 @@ class INPUT(ctypes.Structure):
     _fields_ = [("type", ctypes.c_ulong), ("union", _INPUTunion)]
 
 
+_INPUT_SIZE = ctypes.sizeof(INPUT)
+
+# Leading fields of a keyboard / mouse INPUT, packed with native alignment so
+# the bytes match the ctypes layout above; the rest of each INPUT stays zero
+_UNION_PAD = INPUT.union.offset - ctypes.sizeof(ctypes.c_ulong)
+_KEYBD_EVENT = struct.Struct(f"@L{_UNION_PAD}xHHL")  # type, wVk, wScan, dwFlags
+_MOUSE_EVENT = struct.Struct(f"@L{_UNION_PAD}xlllL")  # type, dx, dy, mouseData, dwFlags
+
+# Unicode key-down/key-up pair with wScan left zero; type_unicode_string tiles
+# it per UTF-16 code unit and fills wScan (a 16-bit slot) with strided writes
+_UNICODE_PAIR = b"".join(
+    _KEYBD_EVENT.pack(INPUT_KEYBOARD, 0, 0, flags).ljust(_INPUT_SIZE, b"\0")
+    for flags in (KEYEVENTF_UNICODE, KEYEVENTF_UNICODE | KEYEVENTF_KEYUP)
+)
+_WSCAN_SLOT = (INPUT.union.offset + KEYBDINPUT.wScan.offset) // 2
+
+
 def send_mouse_click(x: int, y: int, button: str = "left", click_type: str = "single") -> bool:
     """Send a mouse click at normalized coordinates (0-65535 range).
 
@@ -159,29 +184,17 @@ def send_mouse_click(x: int, y: int, button: str = "left", click_type: str = "si
         True if SendInput succeeded.
     """
     button_down, button_up = _get_button_flags(button)
-    base_flags = MOUSEEVENTF_ABSOLUTE | MOUSEEVENTF_VIRTUALDESK
 
     clicks = 2 if click_type == "double" else 1
-    inputs: list[INPUT] = []
-
-    for _ in range(clicks):
-        # Move + button down
-        inp_down = INPUT(type=INPUT_MOUSE)
-        inp_down.union.mi.dx = x
-        inp_down.union.mi.dy = y
-        inp_down.union.mi.dwFlags = base_flags | MOUSEEVENTF_MOVE | button_down
-        inputs.append(inp_down)
+    # Move + button down, then button up at the same position
+    events = [
+        (x, y, 0, button_down),
+        (x, y, 0, button_up),
+    ] * clicks
 
-        # Button up (same position)
-        inp_up = INPUT(type=INPUT_MOUSE)
-        inp_up.union.mi.dx = x
-        inp_up.union.mi.dy = y
-        inp_up.union.mi.dwFlags = base_flags | MOUSEEVENTF_MOVE | button_up
-        inputs.append(inp_up)
-
-    sent = _send_inputs(inputs)
-    logger.debug("send_mouse_click: sent %d/%d events at (%d, %d)", sent, len(inputs), x, y)
-    return sent == len(inputs)
+    sent = _send_inputs(_pack_mouse_events(events), len(events))
+    logger.debug("send_mouse_click: sent %d/%d events at (%d, %d)", sent, len(events), x, y)
+    return sent == len(events)
 
 
 def send_mouse_drag(
@@ -192,48 +205,26 @@ def send_mouse_drag(
     Returns True if SendInput succeeded.
     """
     button_down, button_up = _get_button_flags(button)
-    base_flags = MOUSEEVENTF_ABSOLUTE | MOUSEEVENTF_VIRTUALDESK
-
-    inputs: list[INPUT] = []
-
-    # Move to start position
-    inp_move = INPUT(type=INPUT_MOUSE)
-    inp_move.union.mi.dx = start_x
-    inp_move.union.mi.dy = start_y
-    inp_move.union.mi.dwFlags = base_flags | MOUSEEVENTF_MOVE
-    inputs.append(inp_move)
-
-    # Button down at start
-    inp_down = INPUT(type=INPUT_MOUSE)
-    inp_down.union.mi.dx = start_x
-    inp_down.union.mi.dy = start_y
-    inp_down.union.mi.dwFlags = base_flags | MOUSEEVENTF_MOVE | button_down
-    inputs.append(inp_down)
-
-    # Move to end position
-    inp_drag = INPUT(type=INPUT_MOUSE)
-    inp_drag.union.mi.dx = end_x
-    inp_drag.union.mi.dy = end_y
-    inp_drag.union.mi.dwFlags = base_flags | MOUSEEVENTF_MOVE
-    inputs.append(inp_drag)
-
-    # Button up at end
-    inp_up = INPUT(type=INPUT_MOUSE)
-    inp_up.union.mi.dx = end_x
-    inp_up.union.mi.dy = end_y
-    inp_up.union.mi.dwFlags = base_flags | MOUSEEVENTF_MOVE | button_up
-    inputs.append(inp_up)
-
-    sent = _send_inputs(inputs)
-    logger.debug("send_mouse_drag: sent %d/%d events", sent, len(inputs))
-    return sent == len(inputs)
+
+    # Move to start, button down at start, move to end, button up at end
+    events = [
+        (start_x, start_y, 0, _ABSOLUTE_MOVE),
+        (start_x, start_y, 0, button_down),
+        (end_x, end_y, 0, _ABSOLUTE_MOVE),
+        (end_x, end_y, 0, button_up),
+    ]
+
+    sent = _send_inputs(_pack_mouse_events(events), len(events))
+    logger.debug("send_mouse_drag: sent %d/%d events", sent, len(events))
+    return sent == len(events)
 
 
 def type_unicode_string(text: str) -> bool:
     """Type a string using KEYEVENTF_UNICODE, batched into a single SendInput call.
 
     Args:
-        text: The text to type. Each character is sent as a Unicode keystroke.
+        text: The text to type. Each UTF-16 code unit is sent as a Unicode
+            keystroke, so characters outside the BMP go out as surrogate pairs.
 
     Returns:
         True if SendInput succeeded.
@@ -241,28 +232,17 @@ def type_unicode_string(text: str) -> bool:
     if not text:
         return True
 
-    inputs: list[INPUT] = []
-
-    for char in text:
-        code = ord(char)
+    code_units = memoryview(text.encode("utf-16-le")).cast("H")
+    count = 2 * len(code_units)
+    buffer = bytearray(_UNICODE_PAIR * len(code_units))
+    # A pair spans _INPUT_SIZE 16-bit slots; write every down, then every up, wScan
+    with memoryview(buffer).cast("H") as slots:
+        slots[_WSCAN_SLOT::_INPUT_SIZE] = code_units
+        slots[_WSCAN_SLOT + _INPUT_SIZE // 2::_INPUT_SIZE] = code_units
 
-        # Key down
-        inp_down = INPUT(type=INPUT_KEYBOARD)
-        inp_down.union.ki.wVk = 0
-        inp_down.union.ki.wScan = code
-        inp_down.union.ki.dwFlags = KEYEVENTF_UNICODE
-        inputs.append(inp_down)
-
-        # Key up
-        inp_up = INPUT(type=INPUT_KEYBOARD)
-        inp_up.union.ki.wVk = 0
-        inp_up.union.ki.wScan = code
-        inp_up.union.ki.dwFlags = KEYEVENTF_UNICODE | KEYEVENTF_KEYUP
-        inputs.append(inp_up)
-
-    sent = _send_inputs(inputs)
-    logger.debug("type_unicode_string: sent %d/%d events for %d chars", sent, len(inputs), len(text))
-    return sent == len(inputs)
+    sent = _send_inputs(buffer, count)
+    logger.debug("type_unicode_string: sent %d/%d events for %d chars", sent, count, len(text))
+    return sent == count
 
 
 def send_key_combo(keys: str) -> bool:
@@ -277,56 +257,55 @@ def send_key_combo(keys: str) -> bool:
     Returns:
         True if SendInput succeeded.
     """
-    parts = [p.strip().lower() for p in keys.split("+")]
+    try:
+        packed = _pack_key_combo(keys)
+    except KeyError as exc:
+        logger.warning("Unknown key name: %s", exc.args[0])
+        return False
+
+    count = len(packed) // _INPUT_SIZE
+    sent = _send_inputs(bytearray(packed), count)
+    logger.debug("send_key_combo: sent %d/%d events for '%s'", sent, count, keys)
+    return sent == count
+
+
+@functools.lru_cache(maxsize=256)
+def _pack_key_combo(keys: str) -> bytes:
+    """Parse a key combination and pack its INPUT events, cached per string.
+
+    Raises:
+        KeyError: With the offending part if a key name is unknown.
+    """
+    vk_get = VK_MAP.get
     modifiers: list[int] = []
     regular_keys: list[int] = []
 
-    for part in parts:
-        vk = VK_MAP.get(part)
+    for part in keys.split("+"):
+        part = part.strip().lower()
+        vk = vk_get(part)
         if vk is None:
             # Single character: use its virtual key code (uppercase ASCII)
             if len(part) == 1 and part.isascii():
                 vk = ord(part.upper())
             else:
-                logger.warning("Unknown key name: %s", part)
-                return False
+                raise KeyError(part)
 
         if vk in MODIFIER_VKS:
             modifiers.append(vk)
         else:
             regular_keys.append(vk)
 
-    inputs: list[INPUT] = []
-
-    # Modifiers down
-    for vk in modifiers:
-        inp = INPUT(type=INPUT_KEYBOARD)
-        inp.union.ki.wVk = vk
-        inp.union.ki.dwFlags = 0
-        inputs.append(inp)
-
-    # Regular keys down then up
+    # Modifiers down, regular keys down then up, modifiers up (reverse order)
+    events = [(vk, 0) for vk in modifiers]
     for vk in regular_keys:
-        inp_down = INPUT(type=INPUT_KEYBOARD)
-        inp_down.union.ki.wVk = vk
-        inp_down.union.ki.dwFlags = 0
-        inputs.append(inp_down)
-
-        inp_up = INPUT(type=INPUT_KEYBOARD)
-        inp_up.union.ki.wVk = vk
-        inp_up.union.ki.dwFlags = KEYEVENTF_KEYUP
-        inputs.append(inp_up)
+        events.append((vk, 0))
+        events.append((vk, KEYEVENTF_KEYUP))
+    events.extend((vk, KEYEVENTF_KEYUP) for vk in reversed(modifiers))
 
-    # Modifiers up (reverse order)
-    for vk in reversed(modifiers):
-        inp = INPUT(type=INPUT_KEYBOARD)
-        inp.union.ki.wVk = vk
-        inp.union.ki.dwFlags = KEYEVENTF_KEYUP
-        inputs.append(inp)
-
-    sent = _send_inputs(inputs)
-    logger.debug("send_key_combo: sent %d/%d events for '%s'", sent, len(inputs), keys)
-    return sent == len(inputs)
+    buffer = bytearray(_INPUT_SIZE * len(events))
+    for i, (vk, flags) in enumerate(events):
+        _KEYBD_EVENT.pack_into(buffer, i * _INPUT_SIZE, INPUT_KEYBOARD, vk, 0, flags)
+    return bytes(buffer)
 
 
 def send_mouse_scroll(x: int, y: int, direction: str, amount: int = 3) -> bool:
@@ -341,8 +320,6 @@ def send_mouse_scroll(x: int, y: int, direction: str, amount: int = 3) -> bool:
     Returns:
         True if SendInput succeeded.
     """
-    base_flags = MOUSEEVENTF_ABSOLUTE | MOUSEEVENTF_VIRTUALDESK | MOUSEEVENTF_MOVE
-
     if direction in ("up", "down"):
         wheel_flag = MOUSEEVENTF_WHEEL
         # Positive = scroll up, negative = scroll down
@@ -352,18 +329,19 @@ def send_mouse_scroll(x: int, y: int, direction: str, amount: int = 3) -> bool:
         # Positive = scroll right, negative = scroll left
         delta = amount * WHEEL_DELTA if direction == "right" else -(amount * WHEEL_DELTA)
 
-    inp = INPUT(type=INPUT_MOUSE)
-    inp.union.mi.dx = x
-    inp.union.mi.dy = y
-    inp.union.mi.mouseData = delta
-    inp.union.mi.dwFlags = base_flags | wheel_flag
-
-    sent = _send_inputs([inp])
+    sent = _send_inputs(_pack_mouse_events([(x, y, delta, _ABSOLUTE_MOVE | wheel_flag)]), 1)
     logger.debug("send_mouse_scroll: sent %d/1 events at (%d, %d) direction=%s amount=%d", sent, x, y, direction, amount)
     return sent == 1
 
 
-def _send_inputs(inputs: list[INPUT]) -> int:
-    """Send a batch of INPUT structures via SendInput."""
-    arr = (INPUT * len(inputs))(*inputs)
-    return ctypes.windll.user32.SendInput(len(inputs), arr, ctypes.sizeof(INPUT))
+def _pack_mouse_events(events: list[tuple[int, int, int, int]]) -> bytearray:
+    """Pack (dx, dy, mouseData, dwFlags) tuples into a buffer of mouse INPUTs."""
+    buffer = bytearray(_INPUT_SIZE * len(events))
+    for i, (dx, dy, data, flags) in enumerate(events):
+        _MOUSE_EVENT.pack_into(buffer, i * _INPUT_SIZE, INPUT_MOUSE, dx, dy, data, flags)
+    return buffer
+
+
+def _send_inputs(buffer: bytearray, count: int) -> int:
+    """Send count INPUTs packed in buffer via SendInput in one call."""
+    return _SendInput(count, (INPUT * count).from_buffer(buffer), _INPUT_SIZE)
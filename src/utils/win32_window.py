@@ -5,9 +5,8 @@ from __future__ import annotations
 import ctypes
 import ctypes.wintypes
 import logging
+import threading
 import time
-from pathlib import Path
-from typing import Any
 
 import win32api
 import win32con
@@ -16,58 +15,151 @@ import win32process
 
 from src.errors import WindowNotFoundError
 from src.models import Rect, WindowInfo
+from src.utils._win32api import WNDENUMPROC
+from src.utils._win32api import AttachThreadInput as _AttachThreadInput
+from src.utils._win32api import CloseHandle as _CloseHandle
+from src.utils._win32api import EnumChildWindows as _EnumChildWindows
+from src.utils._win32api import EnumWindows as _EnumWindows
+from src.utils._win32api import GetClassNameW as _GetClassNameW
+from src.utils._win32api import GetForegroundWindow as _GetForegroundWindow
+from src.utils._win32api import GetWindowTextLengthW as _GetWindowTextLengthW
+from src.utils._win32api import GetWindowTextW as _GetWindowTextW
+from src.utils._win32api import IsIconic as _IsIconic
+from src.utils._win32api import IsWindow as _IsWindow
+from src.utils._win32api import IsWindowVisible as _IsWindowVisible
+from src.utils._win32api import MonitorFromWindow as _MonitorFromWindow
+from src.utils._win32api import OpenProcess as _OpenProcess
+from src.utils._win32api import QueryFullProcessImageNameW as _QueryFullProcessImageNameW
+from src.utils._win32api import SendInput as _SendInput
+from src.utils._win32api import SetWindowPos as _SetWindowPos
+from src.utils._win32api import SystemParametersInfoW as _SystemParametersInfoW
+from src.utils.win32_input import INPUT, INPUT_KEYBOARD, KEYEVENTF_KEYUP, VK_MENU
 
 logger = logging.getLogger(__name__)
 
 MONITOR_DEFAULTTONEAREST = 2
+SPI_GETFOREGROUNDLOCKTIMEOUT = 0x2000
+SPI_SETFOREGROUNDLOCKTIMEOUT = 0x2001
+SPIF_SENDCHANGE = 0x0002
+SWP_NOZORDER = 0x0004
+SWP_NOACTIVATE = 0x0010
+PROCESS_QUERY_LIMITED_INFORMATION = 0x1000
+
+# Reused image-path buffer; enumeration can run on worker threads, hence the lock
+_image_name_buf = ctypes.create_unicode_buffer(1024)
+_image_name_size = ctypes.wintypes.DWORD()
+_image_name_lock = threading.Lock()
+
+
+# Reused title/class-name buffers; class names are capped at 256 characters
+_title_buf = ctypes.create_unicode_buffer(512)
+_class_buf = ctypes.create_unicode_buffer(257)
+_text_lock = threading.Lock()
+
+
+def _get_window_text(hwnd: int) -> str:
+    """Read a window's title, skipping the copy entirely for untitled windows."""
+    length = _GetWindowTextLengthW(hwnd)
+    if length <= 0:
+        return ""
+    if length >= len(_title_buf):
+        buf = ctypes.create_unicode_buffer(length + 1)
+        _GetWindowTextW(hwnd, buf, len(buf))
+        return buf.value
+    with _text_lock:
+        _GetWindowTextW(hwnd, _title_buf, len(_title_buf))
+        return _title_buf.value
+
+
+def _get_class_name(hwnd: int) -> str:
+    """Read a window's class name."""
+    with _text_lock:
+        if not _GetClassNameW(hwnd, _class_buf, len(_class_buf)):
+            return ""
+        return _class_buf.value
 
 
 def _get_process_name(pid: int) -> str:
-    """Get the executable name (without extension) for a given PID."""
-    try:
-        handle = win32api.OpenProcess(
-            win32con.PROCESS_QUERY_INFORMATION | win32con.PROCESS_VM_READ,
-            False,
-            pid,
-        )
-        try:
-            exe = win32process.GetModuleFileNameEx(handle, 0)
-            return Path(exe).stem.lower()
-        finally:
-            win32api.CloseHandle(handle)
-    except Exception:
+    """Get the executable name (without extension) for a given PID.
+
+    Uses QueryFullProcessImageNameW, which only needs
+    PROCESS_QUERY_LIMITED_INFORMATION and so also resolves elevated processes.
+    """
+    handle = _OpenProcess(PROCESS_QUERY_LIMITED_INFORMATION, False, pid)
+    if not handle:
         return ""
+    try:
+        with _image_name_lock:
+            _image_name_size.value = len(_image_name_buf)
+            if not _QueryFullProcessImageNameW(
+                handle, 0, _image_name_buf, ctypes.byref(_image_name_size)
+            ):
+                return ""
+            exe = _image_name_buf.value
+    finally:
+        _CloseHandle(handle)
+
+    # Slice the stem out of "...\name.exe" directly instead of building a Path
+    base = exe.rpartition("\\")[2]
+    dot = base.rfind(".")
+    return (base[:dot] if dot > 0 else base).lower()
 
 
-def _get_monitor_index(hwnd: int) -> int:
-    """Get the 1-based monitor index for the monitor containing a window."""
+def _get_monitor_lookup() -> dict[int, int]:
+    """Map each monitor handle to its index in EnumDisplayMonitors order."""
     try:
-        hmon = ctypes.windll.user32.MonitorFromWindow(hwnd, MONITOR_DEFAULTTONEAREST)
         monitors = win32api.EnumDisplayMonitors(None, None)
-        for i, (hm, _hdc, _rect) in enumerate(monitors):
-            if int(hm) == hmon:
-                return i
-        return 0
+    except Exception:
+        return {}
+    return {int(hm): i for i, (hm, _hdc, _rect) in enumerate(monitors)}
+
+
+def _get_monitor_index(hwnd: int, monitor_lookup: dict[int, int] | None = None) -> int:
+    """Get the 1-based monitor index for the monitor containing a window.
+
+    Pass a prebuilt ``monitor_lookup`` to avoid re-enumerating monitors per window.
+    """
+    try:
+        if monitor_lookup is None:
+            monitor_lookup = _get_monitor_lookup()
+        hmon = _MonitorFromWindow(hwnd, MONITOR_DEFAULTTONEAREST)
+        return monitor_lookup.get(hmon or 0, 0)
     except Exception:
         return 0
 
 
-def _build_window_info(hwnd: int) -> WindowInfo | None:
-    """Build a WindowInfo from a window handle. Returns None if info cannot be gathered."""
+def _build_window_info(
+    hwnd: int,
+    monitor_lookup: dict[int, int] | None = None,
+    pname_cache: dict[int, str] | None = None,
+    foreground_hwnd: int | None = None,
+) -> WindowInfo | None:
+    """Build a WindowInfo from a window handle. Returns None if info cannot be gathered.
+
+    ``monitor_lookup``, ``pname_cache`` and ``foreground_hwnd`` let enum_windows
+    share monitor, process-name and foreground lookups across a single pass.
+    """
     try:
-        title = win32gui.GetWindowText(hwnd)
+        title = _get_window_text(hwnd)
         rect_tuple = win32gui.GetWindowRect(hwnd)  # (left, top, right, bottom)
         _, pid = win32process.GetWindowThreadProcessId(hwnd)
-        class_name = win32gui.GetClassName(hwnd)
-        process_name = _get_process_name(pid)
-        monitor_index = _get_monitor_index(hwnd)
+        class_name = _get_class_name(hwnd)
+        if pname_cache is None:
+            process_name = _get_process_name(pid)
+        else:
+            cached_name = pname_cache.get(pid)
+            if cached_name is None:
+                cached_name = pname_cache[pid] = _get_process_name(pid)
+            process_name = cached_name
+        monitor_index = _get_monitor_index(hwnd, monitor_lookup)
 
         placement = win32gui.GetWindowPlacement(hwnd)
         show_cmd = placement[1]
         is_minimized = show_cmd == win32con.SW_SHOWMINIMIZED
         is_maximized = show_cmd == win32con.SW_SHOWMAXIMIZED
 
-        foreground_hwnd = win32gui.GetForegroundWindow()
+        if foreground_hwnd is None:
+            foreground_hwnd = win32gui.GetForegroundWindow()
 
         return WindowInfo(
             hwnd=hwnd,
@@ -91,6 +183,41 @@ def _build_window_info(hwnd: int) -> WindowInfo | None:
         return None
 
 
+# Per-thread scratch lists for the EnumWindows/EnumChildWindows callbacks, reused
+# across passes so the callbacks can be plain module functions, not closures
+_enum_scratch = threading.local()
+
+
+def _scratch_list(name: str) -> list[int]:
+    """Return this thread's scratch list called name, emptied for a new pass."""
+    buf = getattr(_enum_scratch, name, None)
+    if buf is None:
+        buf = []
+        setattr(_enum_scratch, name, buf)
+    else:
+        buf.clear()
+    return buf
+
+
+def _keep_top_level(hwnd: int, _lparam: int) -> bool:
+    """EnumWindows callback: keep visible windows that have a title."""
+    if _IsWindowVisible(hwnd) and _GetWindowTextLengthW(hwnd) > 0:
+        _enum_scratch.top_level.append(hwnd)
+    return True
+
+
+def _keep_child(hwnd: int, _lparam: int) -> bool:
+    """EnumChildWindows callback: keep visible child windows."""
+    if _IsWindowVisible(hwnd):
+        _enum_scratch.children.append(hwnd)
+    return True
+
+
+# Callback thunks created once rather than per enumeration
+_collect_top_level = WNDENUMPROC(_keep_top_level)
+_collect_child = WNDENUMPROC(_keep_child)
+
+
 def enum_windows(include_children: bool = False) -> list[WindowInfo]:
     """Enumerate all visible top-level windows.
 
@@ -100,43 +227,41 @@ def enum_windows(include_children: bool = False) -> list[WindowInfo]:
     Returns:
         List of WindowInfo for each visible window.
     """
-    results: list[WindowInfo] = []
-
-    def _callback(hwnd: int, _extra: Any) -> bool:
-        if not win32gui.IsWindowVisible(hwnd):
-            return True
-        title = win32gui.GetWindowText(hwnd)
-        if not title:
-            return True
+    # Collect handles first so the EnumWindows callback stays minimal
+    hwnds = _scratch_list("top_level")
+    _EnumWindows(_collect_top_level, 0)
 
-        info = _build_window_info(hwnd)
-        if info is not None:
-            results.append(info)
+    # Monitors, process names and the foreground window are stable for one pass
+    monitor_lookup = _get_monitor_lookup()
+    pname_cache: dict[int, str] = {}
+    foreground_hwnd = win32gui.GetForegroundWindow()
 
-            if include_children:
-                _enum_child_windows(hwnd, results)
-
-        return True
+    results: list[WindowInfo] = []
+    for hwnd in hwnds:
+        info = _build_window_info(hwnd, monitor_lookup, pname_cache, foreground_hwnd)
+        if info is None:
+            continue
+        results.append(info)
+
+        if include_children:
+            for child in _enum_child_windows(hwnd):
+                child_info = _build_window_info(child, monitor_lookup, pname_cache, foreground_hwnd)
+                if child_info is not None:
+                    results.append(child_info)
 
-    win32gui.EnumWindows(_callback, None)
     return results
 
 
-def _enum_child_windows(parent_hwnd: int, results: list[WindowInfo]) -> None:
-    """Enumerate visible child windows of a parent."""
-
-    def _child_callback(hwnd: int, _extra: Any) -> bool:
-        if not win32gui.IsWindowVisible(hwnd):
-            return True
-        info = _build_window_info(hwnd)
-        if info is not None:
-            results.append(info)
-        return True
+def _enum_child_windows(parent_hwnd: int) -> list[int]:
+    """Enumerate the handles of visible child windows of a parent.
 
-    try:
-        win32gui.EnumChildWindows(parent_hwnd, _child_callback, None)
-    except Exception as exc:
-        logger.debug("Failed to enumerate children of HWND %s: %s", parent_hwnd, exc)
+    The returned list is this thread's scratch buffer; it is only valid until
+    the next call.
+    """
+    hwnds = _scratch_list("children")
+    # The return value is unused by EnumChildWindows; an empty list means no children
+    _EnumChildWindows(parent_hwnd, _collect_child, 0)
+    return hwnds
 
 
 def get_window_info(hwnd: int) -> WindowInfo:
@@ -162,7 +287,7 @@ def get_window_info(hwnd: int) -> WindowInfo:
 
 def _is_focused(hwnd: int) -> bool:
     """Check if the given window is currently the foreground window."""
-    return ctypes.windll.user32.GetForegroundWindow() == hwnd
+    return _GetForegroundWindow() == hwnd
 
 
 def _strategy_direct(hwnd: int) -> bool:
@@ -175,48 +300,28 @@ def _strategy_direct(hwnd: int) -> bool:
         return False
 
 
+def _build_alt_tap() -> ctypes.Array[INPUT]:
+    """Build the paired ALT keydown + keyup inputs used by the ALT trick."""
+    inputs = (INPUT * 2)()
+    for inp, flags in zip(inputs, (0, KEYEVENTF_KEYUP)):
+        inp.type = INPUT_KEYBOARD
+        inp.union.ki.wVk = VK_MENU
+        inp.union.ki.dwFlags = flags
+    return inputs
+
+
+# Built once at import; SendInput only reads it
+_ALT_TAP = _build_alt_tap()
+_INPUT_SIZE = ctypes.sizeof(INPUT)
+
+
 def _strategy_alt_trick(hwnd: int) -> bool:
     """Strategy 2: Inject ALT key via SendInput to unlock foreground, then SetForegroundWindow.
 
     Uses paired keydown+keyup in a single SendInput call to prevent stuck keys.
     """
     try:
-        # Define INPUT structures for SendInput
-        INPUT_KEYBOARD = 1
-        KEYEVENTF_KEYUP = 0x0002
-        VK_MENU = 0x12
-
-        class KEYBDINPUT(ctypes.Structure):
-            _fields_ = [
-                ("wVk", ctypes.wintypes.WORD),
-                ("wScan", ctypes.wintypes.WORD),
-                ("dwFlags", ctypes.wintypes.DWORD),
-                ("time", ctypes.wintypes.DWORD),
-                ("dwExtraInfo", ctypes.POINTER(ctypes.c_ulong)),
-            ]
-
-        class INPUT(ctypes.Structure):
-            class _INPUT_UNION(ctypes.Union):
-                _fields_ = [("ki", KEYBDINPUT)]
-            _fields_ = [
-                ("type", ctypes.wintypes.DWORD),
-                ("union", _INPUT_UNION),
-            ]
-
-        # Build paired keydown + keyup inputs
-        inputs = (INPUT * 2)()
-
-        # ALT keydown
-        inputs[0].type = INPUT_KEYBOARD
-        inputs[0].union.ki.wVk = VK_MENU
-        inputs[0].union.ki.dwFlags = 0
-
-        # ALT keyup
-        inputs[1].type = INPUT_KEYBOARD
-        inputs[1].union.ki.wVk = VK_MENU
-        inputs[1].union.ki.dwFlags = KEYEVENTF_KEYUP
-
-        ctypes.windll.user32.SendInput(2, ctypes.pointer(inputs[0]), ctypes.sizeof(INPUT))
+        _SendInput(len(_ALT_TAP), _ALT_TAP, _INPUT_SIZE)
 
         win32gui.SetForegroundWindow(hwnd)
         return _is_focused(hwnd)
@@ -227,15 +332,15 @@ def _strategy_alt_trick(hwnd: int) -> bool:
 
 def _strategy_attach_thread(hwnd: int) -> bool:
     """Strategy 3: AttachThreadInput + BringWindowToTop + SetForegroundWindow."""
-    fg_hwnd = ctypes.windll.user32.GetForegroundWindow()
-    if fg_hwnd == 0:
+    fg_hwnd = _GetForegroundWindow()
+    if not fg_hwnd:
         fg_hwnd = hwnd
     fg_thread, _ = win32process.GetWindowThreadProcessId(fg_hwnd)
     target_thread, _ = win32process.GetWindowThreadProcessId(hwnd)
     attached = False
     try:
         if fg_thread != target_thread:
-            ctypes.windll.user32.AttachThreadInput(target_thread, fg_thread, True)
+            _AttachThreadInput(target_thread, fg_thread, True)
             attached = True
         win32gui.BringWindowToTop(hwnd)
         win32gui.SetForegroundWindow(hwnd)
@@ -246,24 +351,19 @@ def _strategy_attach_thread(hwnd: int) -> bool:
     finally:
         if attached:
             try:
-                ctypes.windll.user32.AttachThreadInput(target_thread, fg_thread, False)
+                _AttachThreadInput(target_thread, fg_thread, False)
             except Exception:
                 pass
 
 
 def _strategy_spi_bypass(hwnd: int) -> bool:
     """Strategy 4: Temporarily zero the foreground lock timeout via SystemParametersInfoW."""
-    SPI_GETFOREGROUNDLOCKTIMEOUT = 0x2000
-    SPI_SETFOREGROUNDLOCKTIMEOUT = 0x2001
-    SPIF_SENDCHANGE = 0x0002
-
     old_timeout = ctypes.wintypes.DWORD(0)
-    restored = False
     try:
-        ctypes.windll.user32.SystemParametersInfoW(
+        _SystemParametersInfoW(
             SPI_GETFOREGROUNDLOCKTIMEOUT, 0, ctypes.byref(old_timeout), 0
         )
-        ctypes.windll.user32.SystemParametersInfoW(
+        _SystemParametersInfoW(
             SPI_SETFOREGROUNDLOCKTIMEOUT, 0, None, SPIF_SENDCHANGE
         )
         win32gui.SetForegroundWindow(hwnd)
@@ -273,16 +373,11 @@ def _strategy_spi_bypass(hwnd: int) -> bool:
         logger.debug("SPI bypass focus failed for HWND %s: %s", hwnd, exc)
         return False
     finally:
-        try:
-            ctypes.windll.user32.SystemParametersInfoW(
-                SPI_SETFOREGROUNDLOCKTIMEOUT, 0,
-                ctypes.cast(ctypes.c_void_p(old_timeout.value), ctypes.c_void_p),
-                SPIF_SENDCHANGE,
-            )
-            restored = True
-        except Exception:
-            pass
-        if not restored:
+        # SPI_SET takes the timeout value itself in pvParam (uiParam is unused),
+        # so the saved DWORD is passed as a plain integer, not a pointer
+        if not _SystemParametersInfoW(
+            SPI_SETFOREGROUNDLOCKTIMEOUT, 0, old_timeout.value, SPIF_SENDCHANGE
+        ):
             logger.debug("Failed to restore SPI foreground lock timeout")
 
 
@@ -301,8 +396,11 @@ _FOCUS_RETRY_DELAY = 0.05  # 50ms
 def focus_window(hwnd: int) -> bool:
     """Bring a window to the foreground using a 4-strategy escalation.
 
-    Restores minimized windows before focusing. Tries up to 6 attempts
-    cycling through strategies: direct, ALT trick, AttachThreadInput, SPI bypass.
+    Restores minimized windows before focusing and returns at once if the
+    window is already in the foreground. Otherwise tries the strategies in
+    order (direct, ALT trick, AttachThreadInput, SPI bypass) without pausing,
+    then, after a short delay, retries the escalated ones, up to 6 attempts.
+    Gives up early if the window is destroyed mid-escalation.
 
     Args:
         hwnd: Window handle to focus.
@@ -315,32 +413,46 @@ def focus_window(hwnd: int) -> bool:
 
     try:
         # Restore if minimized
-        if ctypes.windll.user32.IsIconic(hwnd):
+        if _IsIconic(hwnd):
             win32gui.ShowWindow(hwnd, win32con.SW_RESTORE)
     except Exception as exc:
         logger.debug("Failed to restore minimized window HWND %s: %s", hwnd, exc)
 
-    for attempt in range(_FOCUS_MAX_ATTEMPTS):
-        strategy_index = attempt % len(_FOCUS_STRATEGIES)
-        strategy = _FOCUS_STRATEGIES[strategy_index]
-
-        try:
-            if strategy(hwnd):
-                return True
-        except Exception as exc:
-            logger.debug(
-                "Focus strategy %s attempt %d failed for HWND %s: %s",
-                strategy.__name__, attempt, hwnd, exc,
-            )
+    if _is_focused(hwnd):
+        return True
 
-        if attempt < _FOCUS_MAX_ATTEMPTS - 1:
+    # Retry passes skip the direct call; it needs no unlocking and just failed
+    retry_strategies = _FOCUS_STRATEGIES[1:] or _FOCUS_STRATEGIES
+    strategies = _FOCUS_STRATEGIES
+    attempt = 0
+    while attempt < _FOCUS_MAX_ATTEMPTS:
+        if attempt:
             time.sleep(_FOCUS_RETRY_DELAY)
+        for strategy in strategies[:_FOCUS_MAX_ATTEMPTS - attempt]:
+            try:
+                if strategy(hwnd):
+                    return True
+            except Exception as exc:
+                logger.debug(
+                    "Focus strategy %s attempt %d failed for HWND %s: %s",
+                    strategy.__name__, attempt, hwnd, exc,
+                )
+            attempt += 1
+            # Stop if the window closed, or something else focused it meanwhile
+            if not _IsWindow(hwnd):
+                logger.debug("HWND %s was destroyed while focusing", hwnd)
+                return False
+            if _is_focused(hwnd):
+                return True
+        strategies = retry_strategies
 
     logger.warning("All focus strategies exhausted for HWND %s after %d attempts", hwnd, _FOCUS_MAX_ATTEMPTS)
     return False
 
 
-def move_window(hwnd: int, x: int, y: int, width: int, height: int) -> Rect:
+def move_window(
+    hwnd: int, x: int, y: int, width: int, height: int, verify: bool = False
+) -> Rect:
     """Move and resize a window.
 
     Args:
@@ -349,16 +461,21 @@ def move_window(hwnd: int, x: int, y: int, width: int, height: int) -> Rect:
         y: New top position.
         width: New width.
         height: New height.
+        verify: If True, read the rect back from the window, which may differ
+            from the request (minimum sizes, snapping, DPI virtualization).
 
     Returns:
-        The new Rect after moving.
+        The requested Rect, or the actual one if verify is True.
     """
     if not is_window_valid(hwnd):
         raise WindowNotFoundError(hwnd)
 
-    win32gui.MoveWindow(hwnd, x, y, width, height, True)
+    if not _SetWindowPos(hwnd, None, x, y, width, height, SWP_NOZORDER | SWP_NOACTIVATE):
+        raise ctypes.WinError(ctypes.get_last_error())
+
+    if not verify:
+        return Rect(x=x, y=y, width=width, height=height)
 
-    # Read back the actual position
     rect_tuple = win32gui.GetWindowRect(hwnd)
     return Rect(
         x=rect_tuple[0],
@@ -370,4 +487,4 @@ def move_window(hwnd: int, x: int, y: int, width: int, height: int) -> Rect:
 
 def is_window_valid(hwnd: int) -> bool:
     """Check if a window handle is still valid."""
-    return bool(ctypes.windll.user32.IsWindow(hwnd))
+    return bool(_IsWindow(hwnd))
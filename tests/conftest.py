@@ -6,7 +6,7 @@ import pytest
 from unittest.mock import MagicMock, patch
 from PIL import Image
 
-from src.models import Rect, WindowInfo, MonitorInfo
+from src.models import Rect, UiaElement, WindowInfo, MonitorInfo
 
 
 @pytest.fixture
@@ -15,6 +15,37 @@ def mock_hwnd() -> int:
     return 12345
 
 
+@pytest.fixture(scope="session")
+def mock_window_rect() -> tuple[int, int, int, int]:
+    """The (left, top, right, bottom) rect GetWindowRect reports in cv_find tests."""
+    return (0, 0, 1920, 1080)
+
+
+@pytest.fixture(scope="session")
+def make_uia_element():
+    """Factory for UiaElement test doubles; elements share one default rect."""
+    default_rect = Rect(x=100, y=100, width=80, height=30)
+
+    def _make(
+        name: str = "",
+        control_type: str = "Button",
+        ref_id: str = "ref_1",
+        value: str | None = None,
+        rect: Rect | None = None,
+        children: list | None = None,
+    ) -> UiaElement:
+        return UiaElement(
+            ref_id=ref_id,
+            name=name,
+            control_type=control_type,
+            rect=rect if rect is not None else default_rect,
+            value=value,
+            children=children or [],
+        )
+
+    return _make
+
+
 @pytest.fixture
 def mock_window_info(mock_hwnd: int) -> WindowInfo:
     """A sample WindowInfo for testing."""
@@ -61,13 +92,16 @@ def mock_monitor_list(mock_monitor_info: MonitorInfo) -> list[MonitorInfo]:
     return [mock_monitor_info, secondary]
 
 
-@pytest.fixture
+# The images are built once per session; tests that draw on them must .copy() first.
+
+
+@pytest.fixture(scope="session")
 def sample_image() -> Image.Image:
     """A small test image for screenshot testing."""
     return Image.new("RGB", (200, 150), color=(128, 128, 128))
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def large_image() -> Image.Image:
-    """A large test image that needs downscaling."""
+    """A large (~24 MB) test image that needs downscaling."""
     return Image.new("RGB", (3840, 2160), color=(64, 64, 64))
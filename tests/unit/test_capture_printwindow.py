@@ -2,6 +2,7 @@
 
 from __future__ import annotations
 
+import ctypes
 from unittest.mock import patch, MagicMock, call
 
 import pytest
@@ -53,100 +54,233 @@ class TestIsAllBlack:
         img = Image.new("L", (10, 10), 128)
         assert _is_all_black(img) is False
 
+    def test_faint_single_channel_pixel_is_not_black(self):
+        from src.utils.screenshot import _is_all_black
+        img = _make_black_image(100, 100)
+        img.putpixel((99, 99), (0, 0, 1))
+        assert _is_all_black(img) is False
 
-class TestCaptureWithPrintwindow:
-    """Tests for _capture_with_printwindow with flag parameter."""
-
-    @patch("src.utils.screenshot.win32gui")
-    @patch("src.utils.screenshot.win32ui")
-    @patch("src.utils.screenshot.ctypes")
-    def test_flag_parameter_passed_to_printwindow(self, mock_ctypes, mock_win32ui, mock_win32gui):
-        mock_hdc_window = 1001
-        mock_win32gui.GetWindowDC.return_value = mock_hdc_window
-
-        mock_hdc_mem = MagicMock()
-        mock_win32ui.CreateDCFromHandle.return_value = mock_hdc_mem
-        mock_hdc_compat = MagicMock()
-        mock_hdc_mem.CreateCompatibleDC.return_value = mock_hdc_compat
-        mock_hdc_compat.GetSafeHdc.return_value = 2002
 
-        mock_bitmap = MagicMock()
-        mock_win32ui.CreateBitmap.return_value = mock_bitmap
-        mock_bitmap.GetInfo.return_value = {"bmWidth": 100, "bmHeight": 100}
-        mock_bitmap.GetBitmapBits.return_value = b"\x00" * (100 * 100 * 4)
+class TestMssToImage:
+    """Tests for _mss_to_image BGRA -> RGB conversion."""
+
+    def test_bgra_channels_swapped(self):
+        from src.utils.screenshot import _mss_to_image
+        grab = MagicMock(size=(2, 1), raw=bytearray([10, 20, 30, 255, 40, 50, 60, 255]))
+        img = _mss_to_image(grab)
+        assert img.mode == "RGB"
+        assert img.size == (2, 1)
+        assert img.getpixel((0, 0)) == (30, 20, 10)
+        assert img.getpixel((1, 0)) == (60, 50, 40)
+
+    def test_downscales_wide_grab_in_one_step(self):
+        from src.utils.screenshot import _mss_to_image
+        grab = MagicMock(size=(200, 100), raw=bytearray([10, 20, 30, 255] * 200 * 100))
+        img = _mss_to_image(grab, max_width=50)
+        assert img.mode == "RGB"
+        assert img.size == (50, 25)
+        assert img.getpixel((10, 10)) == (30, 20, 10)
+
+    def test_narrow_grab_not_resized(self):
+        from src.utils.screenshot import _mss_to_image
+        grab = MagicMock(size=(40, 20), raw=bytearray([0, 0, 255, 255] * 40 * 20))
+        img = _mss_to_image(grab, max_width=50)
+        assert img.size == (40, 20)
+        assert img.getpixel((0, 0)) == (255, 0, 0)
+
+
+class TestCaptureRegionMss:
+    """Tests for the per-thread mss instance behind _capture_region_mss."""
+
+    @pytest.fixture
+    def mock_mss(self):
+        from src.utils import screenshot
+        screenshot._discard_mss()
+        grab = MagicMock(size=(2, 1), raw=bytearray([0, 0, 255, 255] * 2))
+        with patch("src.utils.screenshot.mss") as mock_mss:
+            mock_mss.mss.return_value.grab.return_value = grab
+            yield mock_mss
+        screenshot._discard_mss()
+
+    def test_instance_reused_across_grabs(self, mock_mss):
+        from src.utils.screenshot import _capture_region_mss
+        assert _capture_region_mss(0, 0, 2, 1).getpixel((0, 0)) == (255, 0, 0)
+        assert _capture_region_mss(5, 5, 2, 1) is not None
+        mock_mss.mss.assert_called_once()
+        assert mock_mss.mss.return_value.grab.call_count == 2
+
+    def test_failed_grab_retried_on_fresh_instance(self, mock_mss):
+        stale, fresh = MagicMock(), MagicMock()
+        stale.grab.side_effect = OSError("stale DC")
+        fresh.grab.return_value = MagicMock(size=(1, 1), raw=bytearray(4))
+        mock_mss.mss.side_effect = [stale, fresh]
+
+        from src.utils.screenshot import _capture_region_mss
+        assert _capture_region_mss(0, 0, 1, 1) is not None
+        stale.close.assert_called_once()
+        assert mock_mss.mss.call_count == 2
+
+    def test_persistent_failure_returns_none(self, mock_mss):
+        mock_mss.mss.return_value.grab.side_effect = OSError("no display")
+        from src.utils.screenshot import _capture_region_mss
+        assert _capture_region_mss(0, 0, 1, 1) is None
+
+
+def _fake_dib_section(hdc, header, usage, bits_ref, section, offset):
+    """Stand-in for CreateDIBSection: fills in the bits pointer and returns an HBITMAP."""
+    bits_ref._obj.value = 0x1000
+    return 3003
+
+
+class TestDibToImage:
+    """Tests for _dib_to_image reading a top-down BGRX DIB."""
+
+    @patch("src.utils.screenshot._GdiFlush")
+    def test_reads_top_down_bgrx(self, mock_gdi_flush):
+        from src.utils.screenshot import _dib_to_image
+
+        # 2x2: top row blue, bottom row red (stored as BGRX)
+        buf = (ctypes.c_ubyte * 16)(*([255, 0, 0, 0] * 2 + [0, 0, 255, 0] * 2))
+        img = _dib_to_image(ctypes.addressof(buf), 2, 2)
+        del buf
+        mock_gdi_flush.assert_called_once_with()
+        assert img.mode == "RGB"
+        assert img.getpixel((0, 0)) == (0, 0, 255)
+        assert img.getpixel((1, 1)) == (255, 0, 0)
+
+
+@patch("src.utils.screenshot._DeleteDC")
+@patch("src.utils.screenshot._DeleteObject")
+@patch("src.utils.screenshot._SelectObject", return_value=4004)
+@patch("src.utils.screenshot._CreateDIBSection", side_effect=_fake_dib_section)
+@patch("src.utils.screenshot._CreateCompatibleDC", return_value=2002)
+@patch("src.utils.screenshot.win32gui")
+class TestCaptureWithPrintwindow:
+    """Tests for _capture_with_printwindow flag tiers on a shared DIB section."""
 
-        mock_ctypes.windll.user32.PrintWindow.return_value = 1
+    @patch("src.utils.screenshot._dib_to_image")
+    @patch("src.utils.screenshot._PrintWindow")
+    def test_flag_parameter_passed_to_printwindow(
+        self, mock_print_window, mock_dib, mock_win32gui, *_gdi
+    ):
+        mock_win32gui.GetWindowDC.return_value = 1001
+        mock_print_window.return_value = 1
+        mock_dib.return_value = _make_image()
 
         from src.utils.screenshot import _capture_with_printwindow
 
         # Test with flag=2 (PW_RENDERFULLCONTENT)
-        _capture_with_printwindow(HWND, 100, 100, flag=2)
-        mock_ctypes.windll.user32.PrintWindow.assert_called_with(HWND, 2002, 2)
+        _capture_with_printwindow(HWND, 100, 100, flags=(2,))
+        mock_print_window.assert_called_with(HWND, 2002, 2)
 
-        mock_ctypes.windll.user32.PrintWindow.reset_mock()
+        mock_print_window.reset_mock()
 
         # Test with flag=0
-        _capture_with_printwindow(HWND, 100, 100, flag=0)
-        mock_ctypes.windll.user32.PrintWindow.assert_called_with(HWND, 2002, 0)
+        _capture_with_printwindow(HWND, 100, 100, flags=(0,))
+        mock_print_window.assert_called_with(HWND, 2002, 0)
 
-    @patch("src.utils.screenshot.win32gui")
-    @patch("src.utils.screenshot.win32ui")
-    @patch("src.utils.screenshot.ctypes")
-    def test_returns_none_when_printwindow_fails(self, mock_ctypes, mock_win32ui, mock_win32gui):
-        mock_win32gui.GetWindowDC.return_value = 1001
-        mock_hdc_mem = MagicMock()
-        mock_win32ui.CreateDCFromHandle.return_value = mock_hdc_mem
-        mock_hdc_compat = MagicMock()
-        mock_hdc_mem.CreateCompatibleDC.return_value = mock_hdc_compat
+    @patch("src.utils.screenshot._dib_to_image")
+    @patch("src.utils.screenshot._PrintWindow")
+    def test_dib_section_is_top_down(
+        self, mock_print_window, mock_dib, mock_win32gui, mock_create_dc, mock_create_dib, *_gdi
+    ):
+        mock_print_window.return_value = 1
+        mock_dib.return_value = _make_image(64, 48)
 
-        mock_bitmap = MagicMock()
-        mock_win32ui.CreateBitmap.return_value = mock_bitmap
+        from src.utils.screenshot import _capture_with_printwindow
+        _capture_with_printwindow(HWND, 64, 48, flags=(2,))
+
+        header = mock_create_dib.call_args[0][1]._obj
+        assert header.biWidth == 64
+        assert header.biHeight == -48
+        assert header.biBitCount == 32
+        mock_dib.assert_called_once_with(0x1000, 64, 48)
+
+    @patch("src.utils.screenshot._dib_to_image")
+    @patch("src.utils.screenshot._PrintWindow")
+    def test_black_flag2_falls_through_to_flag0_on_same_context(
+        self, mock_print_window, mock_dib, mock_win32gui, mock_create_dc, mock_create_dib, *_gdi
+    ):
+        mock_print_window.return_value = 1
+        good_img = _make_image(10, 10)
+        # flag=2 renders black, flag=0 renders content
+        mock_dib.side_effect = [_make_black_image(10, 10), good_img]
 
-        mock_ctypes.windll.user32.PrintWindow.return_value = 0
+        from src.utils.screenshot import _capture_with_printwindow
+        result = _capture_with_printwindow(HWND, 10, 10)
+
+        assert result is good_img
+        assert mock_print_window.call_args_list == [call(HWND, 2002, 2), call(HWND, 2002, 0)]
+        # DCs and DIB section are allocated and released once for both attempts
+        mock_win32gui.GetWindowDC.assert_called_once_with(HWND)
+        mock_create_dib.assert_called_once()
+        mock_win32gui.ReleaseDC.assert_called_once()
+
+    @patch("src.utils.screenshot._PrintWindow")
+    def test_returns_none_when_printwindow_fails(self, mock_print_window, mock_win32gui, *_gdi):
+        mock_win32gui.GetWindowDC.return_value = 1001
+        mock_print_window.return_value = 0
 
         from src.utils.screenshot import _capture_with_printwindow
-        result = _capture_with_printwindow(HWND, 100, 100, flag=2)
+        result = _capture_with_printwindow(HWND, 100, 100)
         assert result is None
-
-    @patch("src.utils.screenshot.win32gui")
-    @patch("src.utils.screenshot.win32ui")
-    @patch("src.utils.screenshot.ctypes")
-    def test_gdi_cleanup_on_success(self, mock_ctypes, mock_win32ui, mock_win32gui):
+        assert mock_print_window.call_count == 2
+
+    @patch("src.utils.screenshot._dib_to_image")
+    @patch("src.utils.screenshot._PrintWindow")
+    def test_gdi_cleanup_on_success(
+        self,
+        mock_print_window,
+        mock_dib,
+        mock_win32gui,
+        mock_create_dc,
+        mock_create_dib,
+        mock_select,
+        mock_delete_object,
+        mock_delete_dc,
+    ):
         mock_hdc_window = 1001
         mock_win32gui.GetWindowDC.return_value = mock_hdc_window
-        mock_hdc_mem = MagicMock()
-        mock_win32ui.CreateDCFromHandle.return_value = mock_hdc_mem
-        mock_hdc_compat = MagicMock()
-        mock_hdc_mem.CreateCompatibleDC.return_value = mock_hdc_compat
-        mock_hdc_compat.GetSafeHdc.return_value = 2002
-
-        mock_bitmap = MagicMock()
-        mock_bitmap.GetHandle.return_value = 3003
-        mock_win32ui.CreateBitmap.return_value = mock_bitmap
-        mock_bitmap.GetInfo.return_value = {"bmWidth": 50, "bmHeight": 50}
-        mock_bitmap.GetBitmapBits.return_value = b"\x00" * (50 * 50 * 4)
-
-        mock_ctypes.windll.user32.PrintWindow.return_value = 1
+        mock_print_window.return_value = 1
+        mock_dib.return_value = _make_image(50, 50)
 
         from src.utils.screenshot import _capture_with_printwindow
-        _capture_with_printwindow(HWND, 50, 50, flag=2)
+        _capture_with_printwindow(HWND, 50, 50, flags=(2,))
 
-        # Verify GDI cleanup
-        mock_win32gui.DeleteObject.assert_called_once_with(3003)
-        mock_hdc_compat.DeleteDC.assert_called_once()
-        mock_hdc_mem.DeleteDC.assert_called_once()
+        # Verify GDI cleanup: old bitmap reselected, DIB and DCs released
+        mock_select.assert_called_with(2002, 4004)
+        mock_delete_object.assert_called_once_with(3003)
+        mock_delete_dc.assert_called_once_with(2002)
         mock_win32gui.ReleaseDC.assert_called_once_with(HWND, mock_hdc_window)
 
+    @patch("src.utils.screenshot._PrintWindow")
+    def test_allocation_failure_returns_none(
+        self, mock_print_window, mock_win32gui, mock_create_dc, mock_create_dib, *_gdi
+    ):
+        mock_create_dib.side_effect = None
+        mock_create_dib.return_value = None
+
+        from src.utils.screenshot import _capture_with_printwindow
+        assert _capture_with_printwindow(HWND, 50, 50) is None
+        mock_print_window.assert_not_called()
+        mock_win32gui.ReleaseDC.assert_called_once()
+
 
 class TestCaptureWindowImpl:
-    """Tests for _capture_window_impl 3-tier fallback."""
+    """Tests for _capture_window_impl PrintWindow -> mss fallback."""
+
+    @pytest.fixture(autouse=True)
+    def _no_window_class(self):
+        """GetClassNameW leaves the buffer empty unless a test says otherwise."""
+        with patch("src.utils.screenshot._GetClassNameW", return_value=0):
+            yield
 
     @patch("src.utils.screenshot._capture_region_mss")
     @patch("src.utils.screenshot._capture_with_printwindow")
     @patch("src.utils.screenshot.win32gui")
-    @patch("src.utils.screenshot.ctypes")
-    def test_tier1_pw_renderfullcontent_success(self, mock_ctypes, mock_win32gui, mock_pw, mock_mss):
-        mock_ctypes.windll.user32.IsIconic.return_value = False
+    @patch("src.utils.screenshot._IsIconic")
+    def test_tier1_pw_renderfullcontent_success(self, mock_is_iconic, mock_win32gui, mock_pw, mock_mss):
+        mock_is_iconic.return_value = False
         mock_win32gui.GetWindowRect.return_value = (0, 0, 800, 600)
 
         good_img = _make_image(800, 600)
@@ -156,57 +290,79 @@ class TestCaptureWindowImpl:
         result = _capture_window_impl(HWND)
 
         assert result is good_img
-        mock_pw.assert_called_once_with(HWND, 800, 600, flag=2)
+        mock_pw.assert_called_once_with(HWND, 800, 600, (2, 0))
         mock_mss.assert_not_called()
 
+    @pytest.mark.parametrize(
+        ("class_name", "flags"),
+        [
+            ("Chrome_WidgetWin_1", (2,)),
+            ("Notepad", (2, 0)),
+            ("", (2, 0)),
+        ],
+    )
     @patch("src.utils.screenshot._capture_region_mss")
     @patch("src.utils.screenshot._capture_with_printwindow")
     @patch("src.utils.screenshot.win32gui")
-    @patch("src.utils.screenshot.ctypes")
-    def test_tier1_black_falls_through_to_tier2(self, mock_ctypes, mock_win32gui, mock_pw, mock_mss):
-        mock_ctypes.windll.user32.IsIconic.return_value = False
+    @patch("src.utils.screenshot._IsIconic")
+    def test_chromium_windows_skip_flag0_retry(
+        self, mock_is_iconic, mock_win32gui, mock_pw, mock_mss, class_name, flags
+    ):
+        mock_is_iconic.return_value = False
         mock_win32gui.GetWindowRect.return_value = (0, 0, 100, 100)
+        mock_pw.return_value = None
 
-        black_img = _make_black_image()
-        good_img = _make_image()
-        # flag=2 returns black, flag=0 returns good
-        mock_pw.side_effect = [black_img, good_img]
+        def _get_class_name(hwnd, buf, size):
+            buf.value = class_name
+            return len(class_name)
 
         from src.utils.screenshot import _capture_window_impl
-        result = _capture_window_impl(HWND)
+        with patch("src.utils.screenshot._GetClassNameW", side_effect=_get_class_name):
+            _capture_window_impl(HWND)
 
-        assert result is good_img
-        assert mock_pw.call_count == 2
-        mock_pw.assert_any_call(HWND, 100, 100, flag=2)
-        mock_pw.assert_any_call(HWND, 100, 100, flag=0)
-        mock_mss.assert_not_called()
+        mock_pw.assert_called_once_with(HWND, 100, 100, flags)
+        mock_mss.assert_called_once_with(0, 0, 100, 100)
 
     @patch("src.utils.screenshot._capture_region_mss")
     @patch("src.utils.screenshot._capture_with_printwindow")
     @patch("src.utils.screenshot.win32gui")
-    @patch("src.utils.screenshot.ctypes")
-    def test_tier2_black_falls_through_to_tier3_mss(self, mock_ctypes, mock_win32gui, mock_pw, mock_mss):
-        mock_ctypes.windll.user32.IsIconic.return_value = False
+    @patch("src.utils.screenshot._IsIconic")
+    def test_with_rect_returns_rect_from_single_query(self, mock_is_iconic, mock_win32gui, mock_pw, mock_mss):
+        mock_is_iconic.return_value = False
+        mock_win32gui.GetWindowRect.return_value = (10, 20, 810, 620)
+        mock_pw.return_value = _make_image(800, 600)
+
+        from src.utils.screenshot import _capture_window_with_rect
+        _img, rect = _capture_window_with_rect(HWND)
+
+        assert rect == (10, 20, 810, 620)
+        mock_win32gui.GetWindowRect.assert_called_once_with(HWND)
+
+    @patch("src.utils.screenshot._capture_region_mss")
+    @patch("src.utils.screenshot._capture_with_printwindow")
+    @patch("src.utils.screenshot.win32gui")
+    @patch("src.utils.screenshot._IsIconic")
+    def test_printwindow_failure_falls_through_to_mss(self, mock_is_iconic, mock_win32gui, mock_pw, mock_mss):
+        mock_is_iconic.return_value = False
         mock_win32gui.GetWindowRect.return_value = (10, 20, 110, 120)
 
-        black_img = _make_black_image()
         mss_img = _make_image()
-        mock_pw.return_value = black_img
+        mock_pw.return_value = None
         mock_mss.return_value = mss_img
 
         from src.utils.screenshot import _capture_window_impl
         result = _capture_window_impl(HWND)
 
         assert result is mss_img
-        assert mock_pw.call_count == 2
+        mock_pw.assert_called_once_with(HWND, 100, 100, (2, 0))
         mock_mss.assert_called_once_with(10, 20, 100, 100)
 
     @patch("src.utils.screenshot._capture_region_mss")
     @patch("src.utils.screenshot._capture_with_printwindow")
     @patch("src.utils.screenshot.win32gui")
-    @patch("src.utils.screenshot.ctypes")
-    def test_all_tiers_fail_raises_error(self, mock_ctypes, mock_win32gui, mock_pw, mock_mss):
-        mock_ctypes.windll.user32.IsIconic.return_value = False
+    @patch("src.utils.screenshot._IsIconic")
+    def test_all_tiers_fail_raises_error(self, mock_is_iconic, mock_win32gui, mock_pw, mock_mss):
+        mock_is_iconic.return_value = False
         mock_win32gui.GetWindowRect.return_value = (0, 0, 100, 100)
 
         mock_pw.return_value = None
@@ -220,9 +376,9 @@ class TestCaptureWindowImpl:
     @patch("src.utils.screenshot._capture_region_mss")
     @patch("src.utils.screenshot._capture_with_printwindow")
     @patch("src.utils.screenshot.win32gui")
-    @patch("src.utils.screenshot.ctypes")
-    def test_minimized_window_shown_then_reminimized(self, mock_ctypes, mock_win32gui, mock_pw, mock_mss):
-        mock_ctypes.windll.user32.IsIconic.return_value = True
+    @patch("src.utils.screenshot._IsIconic")
+    def test_minimized_window_shown_then_reminimized(self, mock_is_iconic, mock_win32gui, mock_pw, mock_mss):
+        mock_is_iconic.return_value = True
         mock_win32gui.GetWindowRect.return_value = (0, 0, 800, 600)
 
         good_img = _make_image(800, 600)
@@ -242,9 +398,9 @@ class TestCaptureWindowImpl:
     @patch("src.utils.screenshot._capture_region_mss")
     @patch("src.utils.screenshot._capture_with_printwindow")
     @patch("src.utils.screenshot.win32gui")
-    @patch("src.utils.screenshot.ctypes")
-    def test_minimized_reminimized_even_on_error(self, mock_ctypes, mock_win32gui, mock_pw, mock_mss):
-        mock_ctypes.windll.user32.IsIconic.return_value = True
+    @patch("src.utils.screenshot._IsIconic")
+    def test_minimized_reminimized_even_on_error(self, mock_is_iconic, mock_win32gui, mock_pw, mock_mss):
+        mock_is_iconic.return_value = True
         mock_win32gui.GetWindowRect.return_value = (0, 0, 100, 100)
 
         mock_pw.return_value = None
@@ -261,9 +417,9 @@ class TestCaptureWindowImpl:
     @patch("src.utils.screenshot._capture_region_mss")
     @patch("src.utils.screenshot._capture_with_printwindow")
     @patch("src.utils.screenshot.win32gui")
-    @patch("src.utils.screenshot.ctypes")
-    def test_zero_size_window_raises(self, mock_ctypes, mock_win32gui, mock_pw, mock_mss):
-        mock_ctypes.windll.user32.IsIconic.return_value = False
+    @patch("src.utils.screenshot._IsIconic")
+    def test_zero_size_window_raises(self, mock_is_iconic, mock_win32gui, mock_pw, mock_mss):
+        mock_is_iconic.return_value = False
         mock_win32gui.GetWindowRect.return_value = (100, 100, 100, 100)  # zero size
 
         from src.utils.screenshot import _capture_window_impl
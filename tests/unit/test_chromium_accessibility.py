@@ -2,7 +2,6 @@
 
 from __future__ import annotations
 
-import ctypes
 from unittest.mock import MagicMock, call, patch
 
 import pytest
@@ -10,18 +9,27 @@ import pytest
 from src.utils.uia import (
     WM_GETOBJECT,
     OBJID_CLIENT,
-    SMTO_ABORTIFHUNG,
-    _activated_hwnds,
+    TREE_SCOPE_DESCENDANTS,
+    UIA_CONTROL_TYPE_PROPERTY_ID,
+    UIA_DOCUMENT_CONTROL_TYPE_ID,
+    _activated_pids,
     _ensure_chromium_accessibility,
+    _renderer_children,
+    _wait_for_renderer_tree,
+    _window_identity,
 )
 
 
 @pytest.fixture(autouse=True)
 def _clear_activation_cache():
-    """Clear the activation cache before and after each test."""
-    _activated_hwnds.clear()
+    """Clear the activation and window identity caches before and after each test."""
+    _activated_pids.clear()
+    _window_identity.clear()
+    _renderer_children.clear()
     yield
-    _activated_hwnds.clear()
+    _activated_pids.clear()
+    _window_identity.clear()
+    _renderer_children.clear()
 
 
 # ---------------------------------------------------------------------------
@@ -30,26 +38,37 @@ def _clear_activation_cache():
 
 @pytest.fixture(autouse=True)
 def _patch_win32():
-    """Patch win32gui, win32process, and ctypes.windll for all tests."""
+    """Patch win32gui, win32process, and the user32 prototypes for all tests."""
+    children: dict[int, str] = {}
+
+    def enum_child_windows(hwnd, callback, lparam):
+        for child_hwnd in list(children):
+            callback(child_hwnd, lparam)
+        return True
+
+    def get_class_name(hwnd, buffer, size):
+        buffer.value = children.get(hwnd, "")[: size - 1]
+        return len(buffer.value)
+
     with (
         patch("src.utils.uia.win32gui") as mock_win32gui,
         patch("src.utils.uia.win32process") as mock_win32process,
-        patch("src.utils.uia.ctypes") as mock_ctypes,
+        patch("src.utils.uia._EnumChildWindows", side_effect=enum_child_windows) as mock_enum,
+        patch("src.utils.uia._GetClassNameW", side_effect=get_class_name),
+        patch("src.utils.uia._PostMessageW", return_value=True) as mock_send,
+        patch("src.utils.uia._IsWindow", side_effect=lambda hwnd: hwnd in children),
         patch("src.utils.win32_window._get_process_name", return_value="chrome") as mock_get_proc,
     ):
-        # Default: chrome process, Chrome_WidgetWin_1 class, one renderer child
+        # Default: chrome process, Chrome_WidgetWin_1 class, no renderer children
         mock_win32process.GetWindowThreadProcessId.return_value = (1234, 5678)
         mock_win32gui.GetClassName.return_value = "Chrome_WidgetWin_1"
-        mock_win32gui.EnumChildWindows.side_effect = None
-
-        # Make ctypes.c_long and ctypes.byref work
-        mock_ctypes.c_long = ctypes.c_long
-        mock_ctypes.byref = ctypes.byref
 
         yield {
             "win32gui": mock_win32gui,
             "win32process": mock_win32process,
-            "ctypes": mock_ctypes,
+            "enum_child_windows": mock_enum,
+            "send_message": mock_send,
+            "children": children,
             "get_process_name": mock_get_proc,
         }
 
@@ -67,15 +86,10 @@ class TestChromiumDetection:
         mocks["get_process_name"].return_value = "chrome"
         mocks["win32gui"].GetClassName.return_value = "SomeOtherClass"
 
-        # No children found
-        def enum_no_children(hwnd, callback, results):
-            pass
-        mocks["win32gui"].EnumChildWindows.side_effect = enum_no_children
-
         _ensure_chromium_accessibility(12345)
 
         # Should have called EnumChildWindows (got past the detection check)
-        mocks["win32gui"].EnumChildWindows.assert_called_once()
+        mocks["enum_child_windows"].assert_called_once()
 
     def test_chrome_class_detected(self, _patch_win32):
         """Chrome_WidgetWin_1 class should trigger activation even with unknown process."""
@@ -83,13 +97,19 @@ class TestChromiumDetection:
         mocks["get_process_name"].return_value = "unknown_app"
         mocks["win32gui"].GetClassName.return_value = "Chrome_WidgetWin_1"
 
-        def enum_no_children(hwnd, callback, results):
-            pass
-        mocks["win32gui"].EnumChildWindows.side_effect = enum_no_children
+        _ensure_chromium_accessibility(12345)
+
+        mocks["enum_child_windows"].assert_called_once()
+
+    def test_webview2_host_detected(self, _patch_win32):
+        """Apps embedding Chromium through WebView2 should trigger activation."""
+        mocks = _patch_win32
+        mocks["get_process_name"].return_value = "msedgewebview2"
+        mocks["win32gui"].GetClassName.return_value = "SomeOtherClass"
 
         _ensure_chromium_accessibility(12345)
 
-        mocks["win32gui"].EnumChildWindows.assert_called_once()
+        mocks["enum_child_windows"].assert_called_once()
 
     def test_non_chromium_skipped(self, _patch_win32):
         """Non-Chromium process with non-Chrome class should skip activation."""
@@ -100,7 +120,7 @@ class TestChromiumDetection:
         _ensure_chromium_accessibility(12345)
 
         # Should NOT have called EnumChildWindows
-        mocks["win32gui"].EnumChildWindows.assert_not_called()
+        mocks["enum_child_windows"].assert_not_called()
 
 
 # ===========================================================================
@@ -114,87 +134,61 @@ class TestRendererActivation:
         """EnumChildWindows should find Chrome_RenderWidgetHostHWND children."""
         mocks = _patch_win32
         mocks["get_process_name"].return_value = "chrome"
-        renderer_hwnd = 99999
-
-        def enum_with_renderer(hwnd, callback, results):
-            # Simulate EnumChildWindows calling the callback with a renderer child
-            # We need to call the callback as win32gui would
-            mocks["win32gui"].GetClassName.side_effect = lambda h: (
-                "Chrome_RenderWidgetHostHWND" if h == renderer_hwnd else "Chrome_WidgetWin_1"
-            )
-            callback(renderer_hwnd, results)
-
-        mocks["win32gui"].EnumChildWindows.side_effect = enum_with_renderer
+        mocks["children"][99999] = "Chrome_RenderWidgetHostHWND"
+        mocks["children"][99998] = "Chrome_WidgetWin_1"
 
         _ensure_chromium_accessibility(12345)
 
-        # SendMessageTimeoutW should have been called
-        mocks["ctypes"].windll.user32.SendMessageTimeoutW.assert_called_once()
+        # WM_GETOBJECT should have been posted to the renderer only
+        mocks["send_message"].assert_called_once()
+        assert mocks["send_message"].call_args[0][0] == 99999
 
-    def test_send_message_correct_params(self, _patch_win32):
-        """SendMessageTimeoutW should be called with correct WM_GETOBJECT params."""
+    def test_post_message_correct_params(self, _patch_win32):
+        """PostMessageW should be called with correct WM_GETOBJECT params."""
         mocks = _patch_win32
         mocks["get_process_name"].return_value = "chrome"
         renderer_hwnd = 88888
-
-        def enum_with_renderer(hwnd, callback, results):
-            mocks["win32gui"].GetClassName.side_effect = lambda h: (
-                "Chrome_RenderWidgetHostHWND" if h == renderer_hwnd else "Chrome_WidgetWin_1"
-            )
-            callback(renderer_hwnd, results)
-
-        mocks["win32gui"].EnumChildWindows.side_effect = enum_with_renderer
+        mocks["children"][renderer_hwnd] = "Chrome_RenderWidgetHostHWND"
 
         _ensure_chromium_accessibility(12345)
 
-        send_call = mocks["ctypes"].windll.user32.SendMessageTimeoutW
-        send_call.assert_called_once()
-        args = send_call.call_args
+        send_call = mocks["send_message"]
+        send_call.assert_called_once_with(renderer_hwnd, WM_GETOBJECT, 0, OBJID_CLIENT)
 
-        assert args[0][0] == renderer_hwnd       # child_hwnd
-        assert args[0][1] == WM_GETOBJECT         # 0x003D
-        assert args[0][2] == 0                     # wParam
-        assert args[0][3] == OBJID_CLIENT          # 0xFFFFFFFC
-        assert args[0][4] == SMTO_ABORTIFHUNG      # 0x0002
-        assert args[0][5] == 2000                  # timeout ms
+    def test_failed_post_not_counted_as_activation(self, _patch_win32):
+        """A renderer that could not be posted to should leave the process uncached."""
+        mocks = _patch_win32
+        mocks["children"][88888] = "Chrome_RenderWidgetHostHWND"
+        mocks["send_message"].return_value = False
+
+        assert _ensure_chromium_accessibility(12345) is False
+        assert not _activated_pids
 
     def test_exact_class_name_match(self, _patch_win32):
         """Only exact 'Chrome_RenderWidgetHostHWND' match, not substrings."""
         mocks = _patch_win32
         mocks["get_process_name"].return_value = "chrome"
 
-        def enum_with_wrong_class(hwnd, callback, results):
-            # Child with similar but not exact class name
-            mocks["win32gui"].GetClassName.side_effect = lambda h: (
-                "Chrome_RenderWidgetHostHWND_Extra" if h == 77777 else "Chrome_WidgetWin_1"
-            )
-            callback(77777, results)
-
-        mocks["win32gui"].EnumChildWindows.side_effect = enum_with_wrong_class
+        # Children with similar but not exact class names
+        mocks["children"][77777] = "Chrome_RenderWidgetHostHWND_Extra"
+        mocks["children"][77778] = "Chrome_RenderWidgetHost"
 
         _ensure_chromium_accessibility(12345)
 
         # Should NOT have sent WM_GETOBJECT since class doesn't match exactly
-        mocks["ctypes"].windll.user32.SendMessageTimeoutW.assert_not_called()
+        mocks["send_message"].assert_not_called()
 
     def test_multiple_renderer_children(self, _patch_win32):
         """Multiple Chrome_RenderWidgetHostHWND children should all get WM_GETOBJECT."""
         mocks = _patch_win32
         mocks["get_process_name"].return_value = "chrome"
         renderer_hwnds = [11111, 22222, 33333]
-
-        def enum_with_multiple(hwnd, callback, results):
-            mocks["win32gui"].GetClassName.side_effect = lambda h: (
-                "Chrome_RenderWidgetHostHWND" if h in renderer_hwnds else "Chrome_WidgetWin_1"
-            )
-            for rh in renderer_hwnds:
-                callback(rh, results)
-
-        mocks["win32gui"].EnumChildWindows.side_effect = enum_with_multiple
+        for rh in renderer_hwnds:
+            mocks["children"][rh] = "Chrome_RenderWidgetHostHWND"
 
         _ensure_chromium_accessibility(12345)
 
-        send_call = mocks["ctypes"].windll.user32.SendMessageTimeoutW
+        send_call = mocks["send_message"]
         assert send_call.call_count == len(renderer_hwnds)
 
 
@@ -209,43 +203,177 @@ class TestCaching:
         """Second call with same hwnd should skip activation (cached)."""
         mocks = _patch_win32
         mocks["get_process_name"].return_value = "chrome"
-
-        def enum_no_children(hwnd, callback, results):
-            pass
-        mocks["win32gui"].EnumChildWindows.side_effect = enum_no_children
+        mocks["children"][55555] = "Chrome_RenderWidgetHostHWND"
 
         _ensure_chromium_accessibility(12345)
         _ensure_chromium_accessibility(12345)
 
         # EnumChildWindows should only be called once (second call is cached)
-        assert mocks["win32gui"].EnumChildWindows.call_count == 1
+        assert mocks["enum_child_windows"].call_count == 1
+
+    def test_other_window_of_same_process_skips_activation(self, _patch_win32):
+        """A new top-level window of an activated process should not re-activate."""
+        mocks = _patch_win32
+        mocks["children"][55555] = "Chrome_RenderWidgetHostHWND"
+
+        assert _ensure_chromium_accessibility(12345) is True
+        assert _ensure_chromium_accessibility(67890) is False
+
+        assert mocks["enum_child_windows"].call_count == 1
+
+    def test_reused_pid_with_new_process_reactivates(self, _patch_win32):
+        """A recycled pid belonging to a different executable should activate again."""
+        mocks = _patch_win32
+        mocks["children"][55555] = "Chrome_RenderWidgetHostHWND"
+
+        _ensure_chromium_accessibility(12345)
+        mocks["get_process_name"].return_value = "msedge"
+        _ensure_chromium_accessibility(67890)
+
+        assert mocks["enum_child_windows"].call_count == 2
+
+    def test_window_without_renderers_not_cached(self, _patch_win32):
+        """A Chromium window with no renderer children yet should be retried."""
+        mocks = _patch_win32
+
+        _ensure_chromium_accessibility(12345)
+        mocks["children"][55555] = "Chrome_RenderWidgetHostHWND"
+        _ensure_chromium_accessibility(12345)
+
+        assert mocks["enum_child_windows"].call_count == 2
+        mocks["send_message"].assert_called_once()
+
+    def test_window_identity_resolved_once(self, _patch_win32):
+        """Repeat calls for a window should not re-read its process or class name."""
+        mocks = _patch_win32
+
+        _ensure_chromium_accessibility(12345)
+        _ensure_chromium_accessibility(12345)
+
+        mocks["get_process_name"].assert_called_once_with(5678)
+        mocks["win32gui"].GetClassName.assert_called_once_with(12345)
+
+    def test_recycled_hwnd_resolved_again(self, _patch_win32):
+        """A window handle now owned by another pid should be looked up again."""
+        mocks = _patch_win32
+
+        _ensure_chromium_accessibility(12345)
+        mocks["win32process"].GetWindowThreadProcessId.return_value = (1234, 9999)
+        _ensure_chromium_accessibility(12345)
+
+        assert mocks["get_process_name"].call_count == 2
+        mocks["get_process_name"].assert_called_with(9999)
+
+    def test_expired_activation_reactivates(self, _patch_win32):
+        """An activation older than the TTL should be sent again."""
+        mocks = _patch_win32
+        mocks["children"][55555] = "Chrome_RenderWidgetHostHWND"
+
+        with patch("src.utils.uia.time.monotonic", side_effect=[1000.0, 1000.0 + 301.0]):
+            assert _ensure_chromium_accessibility(12345) is True
+            assert _ensure_chromium_accessibility(12345) is True
+
+        assert mocks["send_message"].call_count == 2
+
+    def test_cache_bounded_evicts_least_recent(self, _patch_win32):
+        """The activation cache keeps at most its configured number of processes."""
+        mocks = _patch_win32
+        mocks["children"][55555] = "Chrome_RenderWidgetHostHWND"
+
+        with patch("src.utils.uia._ACTIVATED_PIDS_MAX_ENTRIES", 2):
+            for pid in (1, 2, 3):
+                mocks["win32process"].GetWindowThreadProcessId.return_value = (1234, pid)
+                _ensure_chromium_accessibility(12345)
+
+        assert list(_activated_pids) == [(2, "chrome"), (3, "chrome")]
+
+    def test_reactivation_reuses_known_renderers(self, _patch_win32):
+        """After the TTL, live renderers are messaged again without re-enumerating."""
+        mocks = _patch_win32
+        mocks["children"][55555] = "Chrome_RenderWidgetHostHWND"
+
+        _ensure_chromium_accessibility(12345)
+        _activated_pids.clear()
+        _ensure_chromium_accessibility(12345)
+
+        assert mocks["enum_child_windows"].call_count == 1
+        assert [c.args[0] for c in mocks["send_message"].call_args_list] == [55555, 55555]
+
+    def test_destroyed_renderers_trigger_re_enumeration(self, _patch_win32):
+        """If every known renderer is gone, the children are enumerated again."""
+        mocks = _patch_win32
+        mocks["children"][55555] = "Chrome_RenderWidgetHostHWND"
+
+        _ensure_chromium_accessibility(12345)
+        del mocks["children"][55555]
+        mocks["children"][66666] = "Chrome_RenderWidgetHostHWND"
+        _activated_pids.clear()
+        _ensure_chromium_accessibility(12345)
+
+        assert mocks["enum_child_windows"].call_count == 2
+        assert mocks["send_message"].call_args[0][0] == 66666
+
+    def test_recycled_hwnd_drops_known_renderers(self, _patch_win32):
+        """A handle now owned by another process must not reuse the old renderers."""
+        mocks = _patch_win32
+        mocks["children"][55555] = "Chrome_RenderWidgetHostHWND"
+
+        _ensure_chromium_accessibility(12345)
+        mocks["win32process"].GetWindowThreadProcessId.return_value = (1234, 9999)
+        _ensure_chromium_accessibility(12345)
+
+        assert mocks["enum_child_windows"].call_count == 2
 
 
 # ===========================================================================
-# Test: Sleep after activation
+# Test: Waiting for the renderer tree after activation
 # ===========================================================================
 
-class TestSleepAfterActivation:
-    """Tests for the sleep delay after activation."""
+class TestSettleAfterActivation:
+    """Tests for waiting on the renderer tree instead of a fixed sleep."""
 
     @patch("src.utils.uia.time.sleep")
-    def test_sleep_called_after_activation(self, mock_sleep, _patch_win32):
-        """time.sleep(0.2) should be called when renderer children are found."""
+    def test_activation_requests_settle_without_sleeping(self, mock_sleep, _patch_win32):
+        """Activation should report that the walk must settle, not sleep itself."""
         mocks = _patch_win32
         mocks["get_process_name"].return_value = "chrome"
-        renderer_hwnd = 55555
+        mocks["children"][55555] = "Chrome_RenderWidgetHostHWND"
 
-        def enum_with_renderer(hwnd, callback, results):
-            mocks["win32gui"].GetClassName.side_effect = lambda h: (
-                "Chrome_RenderWidgetHostHWND" if h == renderer_hwnd else "Chrome_WidgetWin_1"
-            )
-            callback(renderer_hwnd, results)
+        assert _ensure_chromium_accessibility(12345) is True
+        assert _ensure_chromium_accessibility(12345) is False
 
-        mocks["win32gui"].EnumChildWindows.side_effect = enum_with_renderer
+        mock_sleep.assert_not_called()
 
-        _ensure_chromium_accessibility(12345)
+    def test_no_renderers_no_settle(self, _patch_win32):
+        """Nothing activated means nothing to wait for."""
+        assert _ensure_chromium_accessibility(12345) is False
+
+    @patch("src.utils.uia.time.sleep")
+    def test_wait_stops_once_document_appears(self, mock_sleep):
+        """Polling should end as soon as a Document element is found."""
+        uia = MagicMock()
+        root = uia.ElementFromHandle.return_value
+        root.FindFirst.side_effect = [None, None, MagicMock()]
+
+        _wait_for_renderer_tree(uia, 12345)
+
+        assert root.FindFirst.call_count == 3
+        assert mock_sleep.call_count == 2
+        uia.CreatePropertyCondition.assert_called_once_with(
+            UIA_CONTROL_TYPE_PROPERTY_ID, UIA_DOCUMENT_CONTROL_TYPE_ID
+        )
+        root.FindFirst.assert_called_with(TREE_SCOPE_DESCENDANTS, uia.CreatePropertyCondition.return_value)
+
+    @patch("src.utils.uia.time.sleep")
+    def test_wait_bounded_by_settle_timeout(self, mock_sleep):
+        """A tree that never appears should stop polling at the settle timeout."""
+        uia = MagicMock()
+        uia.ElementFromHandle.return_value.FindFirst.return_value = None
+
+        with patch("src.utils.uia.time.monotonic", side_effect=[0.0, 0.1, 0.25]):
+            _wait_for_renderer_tree(uia, 12345)
 
-        mock_sleep.assert_called_once_with(0.2)
+        assert mock_sleep.call_count == 1
 
 
 # ===========================================================================
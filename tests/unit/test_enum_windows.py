@@ -0,0 +1,248 @@
+"""Unit tests for enum_windows() in src/utils/win32_window.py."""
+
+from __future__ import annotations
+
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+# hwnd -> (title, pid, monitor handle)
+WINDOWS = {
+    101: ("Editor", 10, 0x1000),
+    102: ("Browser", 20, 0x2000),
+    103: ("Editor 2", 10, 0x2000),
+    104: ("", 30, 0x1000),
+}
+
+
+def _fill(text_for):
+    """Fake a Get*W call that copies text_for(hwnd) into the caller's buffer."""
+    def _call(hwnd, buf, size):
+        text = text_for(hwnd)[: size - 1]
+        buf.value = text
+        return len(text)
+    return _call
+
+
+@pytest.fixture
+def mock_win32():
+    """Patch pywin32 and the bound user32 prototypes with a fake desktop."""
+    user32 = MagicMock()
+    user32.EnumWindows.side_effect = lambda cb, lparam: [cb(h, lparam) for h in WINDOWS]
+    user32.EnumChildWindows.side_effect = lambda parent, cb, lparam: True
+    user32.IsWindowVisible.return_value = True
+    user32.GetWindowTextLengthW.side_effect = lambda h: len(WINDOWS[h][0])
+    user32.MonitorFromWindow.side_effect = lambda h, _flags: WINDOWS[h][2]
+    user32.GetWindowTextW.side_effect = _fill(lambda h: WINDOWS[h][0])
+    user32.GetClassNameW.side_effect = _fill(lambda h: "Cls")
+    win32gui = MagicMock()
+    win32gui.GetWindowRect.return_value = (0, 0, 100, 100)
+    win32gui.GetWindowPlacement.return_value = (0, 1, 0, (0, 0), (0, 0, 0, 0))
+    win32gui.GetForegroundWindow.return_value = 101
+
+    win32process = MagicMock()
+    win32process.GetWindowThreadProcessId.side_effect = lambda h: (1, WINDOWS[h][1])
+
+    win32api = MagicMock()
+    win32api.EnumDisplayMonitors.return_value = [(0x1000, None, None), (0x2000, None, None)]
+
+    with (
+        patch("src.utils.win32_window.win32gui", win32gui),
+        patch("src.utils.win32_window.win32process", win32process),
+        patch("src.utils.win32_window.win32api", win32api),
+        patch.multiple(
+            "src.utils.win32_window",
+            **{
+                f"_{name}": getattr(user32, name)
+                for name in (
+                    "EnumWindows",
+                    "EnumChildWindows",
+                    "IsWindowVisible",
+                    "GetWindowTextLengthW",
+                    "MonitorFromWindow",
+                    "GetWindowTextW",
+                    "GetClassNameW",
+                )
+            },
+        ),
+        patch(
+            "src.utils.win32_window._get_process_name",
+            side_effect=lambda pid: f"proc{pid}",
+        ) as mock_pname,
+    ):
+        yield MagicMock(user32=user32, win32gui=win32gui, win32api=win32api, get_process_name=mock_pname)
+
+
+class TestEnumWindows:
+    """Tests for enum_windows."""
+
+    def test_returns_titled_windows(self, mock_win32):
+        from src.utils.win32_window import enum_windows
+        windows = enum_windows()
+        assert [w.hwnd for w in windows] == [101, 102, 103]
+        assert [w.process_name for w in windows] == ["proc10", "proc20", "proc10"]
+        assert [w.monitor_index for w in windows] == [0, 1, 1]
+
+    def test_enumerates_monitors_once_per_pass(self, mock_win32):
+        from src.utils.win32_window import enum_windows
+        enum_windows()
+        mock_win32.win32api.EnumDisplayMonitors.assert_called_once()
+
+    def test_process_name_looked_up_once_per_pid(self, mock_win32):
+        from src.utils.win32_window import enum_windows
+        enum_windows()
+        assert sorted(c.args[0] for c in mock_win32.get_process_name.call_args_list) == [10, 20]
+
+    def test_process_names_not_cached_across_passes(self, mock_win32):
+        from src.utils.win32_window import enum_windows
+        enum_windows()
+        enum_windows()
+        assert mock_win32.get_process_name.call_count == 4
+
+    def test_repeated_passes_start_from_empty_scratch(self, mock_win32):
+        from src.utils.win32_window import enum_windows
+        first = enum_windows(include_children=True)
+        second = enum_windows(include_children=True)
+        assert [w.hwnd for w in second] == [w.hwnd for w in first] == [101, 102, 103]
+
+    def test_unknown_monitor_defaults_to_zero(self, mock_win32):
+        mock_win32.win32api.EnumDisplayMonitors.return_value = []
+        from src.utils.win32_window import enum_windows
+        assert all(w.monitor_index == 0 for w in enum_windows())
+
+    def test_foreground_window_read_once_per_pass(self, mock_win32):
+        from src.utils.win32_window import enum_windows
+        windows = enum_windows()
+        mock_win32.win32gui.GetForegroundWindow.assert_called_once()
+        assert [w.is_foreground for w in windows] == [True, False, False]
+
+    def test_enum_callback_only_collects_handles(self, mock_win32):
+        from src.utils.win32_window import enum_windows
+        mock_win32.user32.EnumWindows.side_effect = None
+        enum_windows()
+        callback = mock_win32.user32.EnumWindows.call_args[0][0]
+
+        assert callback(101, 0)
+        mock_win32.win32gui.GetWindowRect.assert_not_called()
+        mock_win32.get_process_name.assert_not_called()
+
+    def test_children_follow_their_parent(self, mock_win32):
+        mock_win32.user32.EnumChildWindows.side_effect = (
+            lambda parent, cb, lparam: cb(104, lparam) if parent == 102 else True
+        )
+        from src.utils.win32_window import enum_windows
+        windows = enum_windows(include_children=True)
+        assert [w.hwnd for w in windows] == [101, 102, 104, 103]
+
+
+class TestGetProcessName:
+    """Tests for _get_process_name."""
+
+    @staticmethod
+    def _query_returning(exe):
+        def _query(handle, flags, buf, size):
+            buf.value = exe
+            return True
+        return _query
+
+    @pytest.mark.parametrize(
+        ("exe", "expected"),
+        [
+            ("C:\\Program Files\\Google\\Chrome\\Application\\chrome.exe", "chrome"),
+            ("C:\\Windows\\System32\\NOTEPAD.EXE", "notepad"),
+            ("C:\\tools\\my.app.exe", "my.app"),
+            ("C:\\tools\\noext", "noext"),
+        ],
+    )
+    @patch("src.utils.win32_window._CloseHandle")
+    @patch("src.utils.win32_window._QueryFullProcessImageNameW")
+    @patch("src.utils.win32_window._OpenProcess", return_value=0x44)
+    def test_returns_lowercase_stem(self, mock_open, mock_query, mock_close, exe, expected):
+        mock_query.side_effect = self._query_returning(exe)
+        from src.utils.win32_window import PROCESS_QUERY_LIMITED_INFORMATION, _get_process_name
+
+        assert _get_process_name(1234) == expected
+        mock_open.assert_called_once_with(PROCESS_QUERY_LIMITED_INFORMATION, False, 1234)
+        mock_close.assert_called_once_with(0x44)
+
+    @patch("src.utils.win32_window._CloseHandle")
+    @patch("src.utils.win32_window._OpenProcess", return_value=None)
+    def test_returns_empty_when_process_cannot_be_opened(self, _mock_open, mock_close):
+        from src.utils.win32_window import _get_process_name
+        assert _get_process_name(4) == ""
+        mock_close.assert_not_called()
+
+    @patch("src.utils.win32_window._CloseHandle")
+    @patch("src.utils.win32_window._QueryFullProcessImageNameW", return_value=False)
+    @patch("src.utils.win32_window._OpenProcess", return_value=0x44)
+    def test_returns_empty_and_closes_handle_when_query_fails(self, _mock_open, _mock_query, mock_close):
+        from src.utils.win32_window import _get_process_name
+        assert _get_process_name(4) == ""
+        mock_close.assert_called_once_with(0x44)
+
+
+class TestGetWindowText:
+    """Tests for _get_window_text."""
+
+    def test_untitled_window_skips_copy(self):
+        with (
+            patch("src.utils.win32_window._GetWindowTextLengthW", return_value=0),
+            patch("src.utils.win32_window._GetWindowTextW") as mock_get_text,
+        ):
+            from src.utils.win32_window import _get_window_text
+            assert _get_window_text(101) == ""
+        mock_get_text.assert_not_called()
+
+    @pytest.mark.parametrize("title", ["Editor", "x" * 2000])
+    def test_reads_short_and_long_titles(self, title):
+        with (
+            patch("src.utils.win32_window._GetWindowTextLengthW", return_value=len(title)),
+            patch("src.utils.win32_window._GetWindowTextW", side_effect=_fill(lambda h: title)),
+        ):
+            from src.utils.win32_window import _get_window_text
+            assert _get_window_text(101) == title
+
+
+class TestMoveWindow:
+    """Tests for move_window."""
+
+    @pytest.fixture
+    def mock_set_window_pos(self):
+        with (
+            patch("src.utils.win32_window._IsWindow", return_value=True),
+            patch("src.utils.win32_window._SetWindowPos", return_value=True) as mock_swp,
+        ):
+            yield mock_swp
+
+    @patch("src.utils.win32_window.win32gui")
+    def test_returns_requested_rect_without_read_back(self, mock_win32gui, mock_set_window_pos):
+        from src.utils.win32_window import SWP_NOACTIVATE, SWP_NOZORDER, move_window
+
+        rect = move_window(101, 10, 20, 300, 200)
+
+        assert (rect.x, rect.y, rect.width, rect.height) == (10, 20, 300, 200)
+        mock_set_window_pos.assert_called_once_with(101, None, 10, 20, 300, 200, SWP_NOZORDER | SWP_NOACTIVATE)
+        mock_win32gui.GetWindowRect.assert_not_called()
+
+    @patch("src.utils.win32_window.win32gui")
+    def test_verify_reads_actual_rect(self, mock_win32gui, mock_set_window_pos):
+        mock_win32gui.GetWindowRect.return_value = (10, 20, 410, 320)
+        from src.utils.win32_window import move_window
+
+        rect = move_window(101, 10, 20, 300, 200, verify=True)
+
+        assert (rect.width, rect.height) == (400, 300)
+
+    def test_failure_raises(self, mock_set_window_pos):
+        mock_set_window_pos.return_value = False
+        from src.utils.win32_window import move_window
+
+        with pytest.raises(OSError):
+            move_window(101, 0, 0, 1, 1)
+
+    def test_invalid_window_raises(self):
+        from src.errors import WindowNotFoundError
+        from src.utils.win32_window import move_window
+
+        with patch("src.utils.win32_window._IsWindow", return_value=False), pytest.raises(WindowNotFoundError):
+            move_window(101, 0, 0, 1, 1)
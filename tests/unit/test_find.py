@@ -2,17 +2,22 @@
 
 from __future__ import annotations
 
-from unittest.mock import MagicMock, patch
+from unittest.mock import DEFAULT, MagicMock, patch
 
 import pytest
 
 from src.models import FindMatch, OcrRegion, Rect, UiaElement
+from src.tools.find import cv_find
+from src.utils.uia import UiaTree
 
 
 # ---------------------------------------------------------------------------
 # Helpers to build mock UIA elements
 # ---------------------------------------------------------------------------
 
+_DEFAULT_RECT = Rect(x=100, y=100, width=80, height=30)
+
+
 def _make_uia_element(
     name: str = "",
     control_type: str = "Button",
@@ -25,14 +30,17 @@ def _make_uia_element(
         ref_id=ref_id,
         name=name,
         control_type=control_type,
-        rect=rect or Rect(x=100, y=100, width=80, height=30),
+        rect=rect if rect is not None else _DEFAULT_RECT,
         value=value,
         children=children or [],
     )
 
 
-# Window rect that wraps all test elements: (0, 0, 1920, 1080)
-MOCK_WINDOW_RECT = (0, 0, 1920, 1080)
+# Built once at import; cv_find only reads the elements, so tests share them.
+_CACHED_30_BUTTONS = tuple(
+    _make_uia_element(name=f"Button {i}", control_type="Button", ref_id=f"ref_{i}")
+    for i in range(30)
+)
 
 
 # ---------------------------------------------------------------------------
@@ -40,17 +48,22 @@ MOCK_WINDOW_RECT = (0, 0, 1920, 1080)
 # ---------------------------------------------------------------------------
 
 @pytest.fixture(autouse=True)
-def _patch_security_and_win32():
+def _patch_security_and_win32(mock_window_rect):
     """Patch security gates and win32 calls so tests run without a real desktop."""
     with (
-        patch("src.tools.find.validate_hwnd_range"),
-        patch("src.tools.find.validate_hwnd_fresh", return_value=True),
-        patch("src.tools.find.check_restricted"),
-        patch("src.tools.find._get_process_name_from_hwnd", return_value="notepad"),
-        patch("src.tools.find.log_action"),
-        patch("src.tools.find.win32gui.GetWindowRect", return_value=MOCK_WINDOW_RECT),
+        patch.multiple(
+            "src.tools.find",
+            validate_hwnd_range=DEFAULT,
+            validate_hwnd_fresh=DEFAULT,
+            check_restricted=DEFAULT,
+            _get_process_name_from_hwnd=DEFAULT,
+            log_action=DEFAULT,
+        ) as mocks,
+        patch("src.tools.find.win32gui.GetWindowRect", return_value=mock_window_rect),
     ):
-        yield
+        mocks["validate_hwnd_fresh"].return_value = True
+        mocks["_get_process_name_from_hwnd"].return_value = "notepad"
+        yield mocks
 
 
 # ===========================================================================
@@ -62,8 +75,6 @@ class TestCvFindUia:
 
     @patch("src.tools.find.get_ui_tree")
     def test_uia_finds_exact_name(self, mock_tree):
-        from src.tools.find import cv_find
-
         mock_tree.return_value = [
             _make_uia_element(name="Submit", control_type="Button", ref_id="ref_1"),
         ]
@@ -77,8 +88,6 @@ class TestCvFindUia:
 
     @patch("src.tools.find.get_ui_tree")
     def test_uia_fuzzy_match(self, mock_tree):
-        from src.tools.find import cv_find
-
         mock_tree.return_value = [
             _make_uia_element(name="Submit Order", control_type="Button", ref_id="ref_1"),
         ]
@@ -90,8 +99,6 @@ class TestCvFindUia:
 
     @patch("src.tools.find.get_ui_tree")
     def test_uia_no_match(self, mock_tree):
-        from src.tools.find import cv_find
-
         mock_tree.return_value = [
             _make_uia_element(name="Cancel", control_type="Button", ref_id="ref_1"),
         ]
@@ -100,11 +107,21 @@ class TestCvFindUia:
 
         assert result["success"] is False
         assert result["error"]["code"] == "FIND_NO_MATCH"
+        assert "truncated" not in result
 
+    @pytest.mark.parametrize("query", ["Cancel", "xyznonexistent"], ids=["match", "no_match"])
     @patch("src.tools.find.get_ui_tree")
-    def test_uia_matches_control_type(self, mock_tree):
-        from src.tools.find import cv_find
+    def test_uia_truncated_tree_is_reported(self, mock_tree, query):
+        tree = UiaTree([_make_uia_element(name="Cancel", control_type="Button", ref_id="ref_1")])
+        tree.truncated = True
+        mock_tree.return_value = tree
+
+        result = cv_find(query=query, hwnd=12345, method="uia")
+
+        assert result["truncated"] is True
 
+    @patch("src.tools.find.get_ui_tree")
+    def test_uia_matches_control_type(self, mock_tree):
         mock_tree.return_value = [
             _make_uia_element(name="", control_type="Button", ref_id="ref_1"),
             _make_uia_element(name="", control_type="Edit", ref_id="ref_2"),
@@ -119,8 +136,6 @@ class TestCvFindUia:
 
     @patch("src.tools.find.get_ui_tree")
     def test_uia_matches_value(self, mock_tree):
-        from src.tools.find import cv_find
-
         mock_tree.return_value = [
             _make_uia_element(
                 name="Search",
@@ -137,8 +152,6 @@ class TestCvFindUia:
 
     @patch("src.tools.find.get_ui_tree")
     def test_uia_flattens_nested_tree(self, mock_tree):
-        from src.tools.find import cv_find
-
         child = _make_uia_element(name="Deep Button", control_type="Button", ref_id="ref_2")
         parent = _make_uia_element(
             name="Toolbar",
@@ -158,27 +171,39 @@ class TestCvFindUia:
 # Test: OCR matching
 # ===========================================================================
 
+def _ocr_result(text: str, width: int, confidence: float) -> dict:
+    return {
+        "text": text,
+        "regions": [
+            OcrRegion(
+                text=text,
+                bbox=Rect(x=200, y=300, width=width, height=20),
+                confidence=confidence,
+            ),
+        ],
+        "engine": "winocr",
+        "confidence": confidence,
+        "language": "en-US",
+        "origin": None,
+    }
+
+
+# Built once at import; _match_ocr only reads the recognize() result.
+_OCR_SUBMIT_RESULT = _ocr_result("Submit Order", 100, 0.95)
+_OCR_CANCEL_RESULT = _ocr_result("Cancel", 60, 0.9)
+
+
+def _make_ocr_mock(result: dict) -> MagicMock:
+    engine = MagicMock()
+    engine.recognize.return_value = result
+    return engine
+
+
 class TestCvFindOcr:
     """Tests for cv_find using OCR matching."""
 
     def test_ocr_finds_text(self):
-        from src.tools.find import cv_find
-
-        mock_engine = MagicMock()
-        mock_engine.recognize.return_value = {
-            "text": "Submit Order",
-            "regions": [
-                OcrRegion(
-                    text="Submit Order",
-                    bbox=Rect(x=200, y=300, width=100, height=20),
-                    confidence=0.95,
-                ),
-            ],
-            "engine": "winocr",
-            "confidence": 0.95,
-            "language": "en-US",
-            "origin": None,
-        }
+        mock_engine = _make_ocr_mock(_OCR_SUBMIT_RESULT)
 
         # Patch the OcrEngine singleton and screenshot capture inside _match_ocr
         with (
@@ -192,23 +217,7 @@ class TestCvFindOcr:
         assert result["matches"][0]["source"] == "ocr"
 
     def test_ocr_no_match(self):
-        from src.tools.find import cv_find
-
-        mock_engine = MagicMock()
-        mock_engine.recognize.return_value = {
-            "text": "Cancel",
-            "regions": [
-                OcrRegion(
-                    text="Cancel",
-                    bbox=Rect(x=200, y=300, width=60, height=20),
-                    confidence=0.9,
-                ),
-            ],
-            "engine": "winocr",
-            "confidence": 0.9,
-            "language": "en-US",
-            "origin": None,
-        }
+        mock_engine = _make_ocr_mock(_OCR_CANCEL_RESULT)
 
         with (
             patch("src.utils.ocr_engine._engine", mock_engine),
@@ -230,8 +239,6 @@ class TestCvFindAuto:
     @patch("src.tools.find.get_ui_tree")
     def test_auto_uses_uia_when_found(self, mock_tree):
         """When UIA finds results, OCR should NOT be called."""
-        from src.tools.find import cv_find
-
         mock_tree.return_value = [
             _make_uia_element(name="Submit", control_type="Button", ref_id="ref_1"),
         ]
@@ -250,8 +257,6 @@ class TestCvFindAuto:
     @patch("src.tools.find.get_ui_tree")
     def test_auto_falls_back_to_ocr(self, mock_tree, mock_ocr):
         """When UIA returns nothing, OCR should be tried."""
-        from src.tools.find import cv_find
-
         mock_tree.return_value = []  # Empty UIA tree
         mock_ocr.return_value = [
             FindMatch(
@@ -278,45 +283,28 @@ class TestCvFindAuto:
 class TestCvFindBboxValidation:
     """Tests for bbox validation filtering."""
 
+    @pytest.mark.parametrize(
+        ("rect", "expected_success"),
+        [
+            # Window is at (0, 0, 1920, 1080) per mock_window_rect
+            pytest.param(Rect(x=3000, y=3000, width=80, height=30), False, id="outside_window_rejected"),
+            pytest.param(Rect(x=100, y=100, width=80, height=30), True, id="inside_window_kept"),
+        ],
+    )
     @patch("src.tools.find.get_ui_tree")
-    def test_bbox_outside_window_rejected(self, mock_tree):
-        """Matches with bbox outside the window bounds should be filtered out."""
-        from src.tools.find import cv_find
-
-        # Window is at (0, 0, 1920, 1080) per MOCK_WINDOW_RECT
-        # Element is at (3000, 3000) -- outside
-        mock_tree.return_value = [
-            _make_uia_element(
-                name="Submit",
-                control_type="Button",
-                ref_id="ref_1",
-                rect=Rect(x=3000, y=3000, width=80, height=30),
-            ),
-        ]
-
-        result = cv_find(query="Submit", hwnd=12345, method="uia")
-
-        assert result["success"] is False
-        assert result["error"]["code"] == "FIND_NO_MATCH"
-
-    @patch("src.tools.find.get_ui_tree")
-    def test_bbox_inside_window_kept(self, mock_tree):
-        """Matches with bbox inside the window bounds should be kept."""
-        from src.tools.find import cv_find
-
+    def test_bbox_window_filtering(self, mock_tree, rect, expected_success):
+        """Only matches whose bbox lies inside the window bounds are kept."""
         mock_tree.return_value = [
-            _make_uia_element(
-                name="Submit",
-                control_type="Button",
-                ref_id="ref_1",
-                rect=Rect(x=100, y=100, width=80, height=30),
-            ),
+            _make_uia_element(name="Submit", control_type="Button", ref_id="ref_1", rect=rect),
         ]
 
         result = cv_find(query="Submit", hwnd=12345, method="uia")
 
-        assert result["success"] is True
-        assert result["match_count"] >= 1
+        assert result["success"] is expected_success
+        if expected_success:
+            assert result["match_count"] >= 1
+        else:
+            assert result["error"]["code"] == "FIND_NO_MATCH"
 
 
 # ===========================================================================
@@ -327,33 +315,20 @@ class TestCvFindInputValidation:
     """Tests for input validation."""
 
     def test_invalid_method(self):
-        from src.tools.find import cv_find
-
         result = cv_find(query="test", hwnd=12345, method="invalid")
 
         assert result["success"] is False
         assert result["error"]["code"] == "INVALID_INPUT"
 
-    def test_empty_query(self):
-        from src.tools.find import cv_find
-
-        result = cv_find(query="", hwnd=12345)
-
-        assert result["success"] is False
-        assert result["error"]["code"] == "INVALID_INPUT"
-
-    def test_whitespace_only_query(self):
-        from src.tools.find import cv_find
-
-        result = cv_find(query="   ", hwnd=12345)
+    @pytest.mark.parametrize("query", ["", "   "], ids=["empty", "whitespace_only"])
+    def test_blank_query(self, query):
+        result = cv_find(query=query, hwnd=12345)
 
         assert result["success"] is False
         assert result["error"]["code"] == "INVALID_INPUT"
 
     @patch("src.tools.find.get_ui_tree")
     def test_query_capped_at_500(self, mock_tree):
-        from src.tools.find import cv_find
-
         mock_tree.return_value = []
         long_query = "a" * 600
 
@@ -365,14 +340,8 @@ class TestCvFindInputValidation:
 
     @patch("src.tools.find.get_ui_tree")
     def test_max_results_capped(self, mock_tree):
-        from src.tools.find import cv_find
-
         # Return many elements
-        elements = [
-            _make_uia_element(name=f"Button {i}", control_type="Button", ref_id=f"ref_{i}")
-            for i in range(30)
-        ]
-        mock_tree.return_value = elements
+        mock_tree.return_value = list(_CACHED_30_BUTTONS)
 
         result = cv_find(query="Button", hwnd=12345, method="uia", max_results=5)
 
@@ -381,8 +350,6 @@ class TestCvFindInputValidation:
 
     @patch("src.tools.find.get_ui_tree")
     def test_max_results_floor_at_1(self, mock_tree):
-        from src.tools.find import cv_find
-
         mock_tree.return_value = [
             _make_uia_element(name="Submit", control_type="Button", ref_id="ref_1"),
         ]
@@ -400,44 +367,34 @@ class TestCvFindInputValidation:
 class TestCvFindSecurity:
     """Tests verifying security gates are invoked."""
 
-    def test_invalid_hwnd_range(self):
+    def test_invalid_hwnd_range(self, _patch_security_and_win32):
         """Invalid HWND should be rejected before any search."""
-        from src.tools.find import cv_find
-
-        with patch("src.tools.find.validate_hwnd_range", side_effect=ValueError("Invalid HWND: 0")):
-            result = cv_find(query="test", hwnd=0)
+        _patch_security_and_win32["validate_hwnd_range"].side_effect = ValueError("Invalid HWND: 0")
+        result = cv_find(query="test", hwnd=0)
 
         assert result["success"] is False
         assert result["error"]["code"] == "INVALID_INPUT"
 
-    def test_stale_hwnd_rejected(self):
-        from src.tools.find import cv_find
-
-        with patch("src.tools.find.validate_hwnd_fresh", return_value=False):
-            result = cv_find(query="test", hwnd=99999)
+    def test_stale_hwnd_rejected(self, _patch_security_and_win32):
+        _patch_security_and_win32["validate_hwnd_fresh"].return_value = False
+        result = cv_find(query="test", hwnd=99999)
 
         assert result["success"] is False
         assert "no longer valid" in result["error"]["message"]
 
-    def test_restricted_process_rejected(self):
-        from src.tools.find import cv_find
-
-        with patch(
-            "src.tools.find.check_restricted",
-            side_effect=Exception("Access denied: process 'keepass' is restricted"),
-        ):
-            result = cv_find(query="test", hwnd=12345)
+    def test_restricted_process_rejected(self, _patch_security_and_win32):
+        _patch_security_and_win32["check_restricted"].side_effect = Exception(
+            "Access denied: process 'keepass' is restricted"
+        )
+        result = cv_find(query="test", hwnd=12345)
 
         assert result["success"] is False
 
     @patch("src.tools.find.get_ui_tree")
-    def test_log_action_called(self, mock_tree):
-        from src.tools.find import cv_find
-
+    def test_log_action_called(self, mock_tree, _patch_security_and_win32):
         mock_tree.return_value = [
             _make_uia_element(name="OK", control_type="Button", ref_id="ref_1"),
         ]
 
-        with patch("src.tools.find.log_action") as mock_log:
-            cv_find(query="OK", hwnd=12345, method="uia")
-            mock_log.assert_called_once()
+        cv_find(query="OK", hwnd=12345, method="uia")
+        _patch_security_and_win32["log_action"].assert_called_once()
@@ -3,60 +3,45 @@
 from __future__ import annotations
 
 import time as _time
-from unittest.mock import MagicMock, patch
+from types import SimpleNamespace
+from unittest.mock import DEFAULT, patch
 
 import pytest
 
-from src.models import FindMatch, Rect, UiaElement
+from src.models import FindMatch, Rect
 
-
-# ---------------------------------------------------------------------------
-# Helpers
-# ---------------------------------------------------------------------------
-
-def _make_uia_element(
-    name: str = "",
-    control_type: str = "Button",
-    ref_id: str = "ref_1",
-    value: str | None = None,
-    rect: Rect | None = None,
-    children: list | None = None,
-) -> UiaElement:
-    return UiaElement(
-        ref_id=ref_id,
-        name=name,
-        control_type=control_type,
-        rect=rect or Rect(x=100, y=100, width=80, height=30),
-        value=value,
-        children=children or [],
-    )
-
-
-MOCK_WINDOW_RECT = (0, 0, 1920, 1080)
+from src.tools.find import _screenshot_cooldowns, cv_find
 
 
 # ---------------------------------------------------------------------------
 # Patches applied to every test
 # ---------------------------------------------------------------------------
 
-@pytest.fixture(autouse=True)
-def _patch_security_and_win32():
-    """Patch security gates and win32 calls so tests run without a real desktop."""
+@pytest.fixture(autouse=True, scope="module")
+def _patch_security_and_win32(mock_window_rect):
+    """Patch security gates and win32 calls so tests run without a real desktop.
+
+    Installed once per module: no test here reconfigures or asserts on these mocks.
+    """
     with (
-        patch("src.tools.find.validate_hwnd_range"),
-        patch("src.tools.find.validate_hwnd_fresh", return_value=True),
-        patch("src.tools.find.check_restricted"),
-        patch("src.tools.find._get_process_name_from_hwnd", return_value="notepad"),
-        patch("src.tools.find.log_action"),
-        patch("src.tools.find.win32gui.GetWindowRect", return_value=MOCK_WINDOW_RECT),
+        patch.multiple(
+            "src.tools.find",
+            validate_hwnd_range=DEFAULT,
+            validate_hwnd_fresh=DEFAULT,
+            check_restricted=DEFAULT,
+            _get_process_name_from_hwnd=DEFAULT,
+            log_action=DEFAULT,
+        ) as mocks,
+        patch("src.tools.find.win32gui.GetWindowRect", return_value=mock_window_rect),
     ):
-        yield
+        mocks["validate_hwnd_fresh"].return_value = True
+        mocks["_get_process_name_from_hwnd"].return_value = "notepad"
+        yield mocks
 
 
 @pytest.fixture(autouse=True)
 def _clear_screenshot_cooldowns():
     """Clear the per-HWND screenshot cooldown cache between tests."""
-    from src.tools.find import _screenshot_cooldowns
     _screenshot_cooldowns.clear()
     yield
     _screenshot_cooldowns.clear()
@@ -68,12 +53,10 @@ def _clear_screenshot_cooldowns():
 
 
 @patch("src.tools.find.get_ui_tree")
-def test_find_success_includes_image_path(mock_tree):
+def test_find_success_includes_image_path(mock_tree, make_uia_element):
     """When matches found, result should include image_path if capture_window succeeds."""
-    from src.tools.find import cv_find
-
     mock_tree.return_value = [
-        _make_uia_element(name="Submit", control_type="Button", ref_id="ref_1"),
+        make_uia_element(name="Submit", control_type="Button", ref_id="ref_1"),
     ]
 
     # The current implementation only attaches screenshot on no-match (vision fallback).
@@ -88,12 +71,10 @@ def test_find_success_includes_image_path(mock_tree):
 
 
 @patch("src.tools.find.get_ui_tree")
-def test_find_success_includes_image_scale(mock_tree):
+def test_find_success_includes_image_scale(mock_tree, make_uia_element):
     """Verify result structure on success — matches should contain valid data."""
-    from src.tools.find import cv_find
-
     mock_tree.return_value = [
-        _make_uia_element(name="Submit", control_type="Button", ref_id="ref_1"),
+        make_uia_element(name="Submit", control_type="Button", ref_id="ref_1"),
     ]
 
     result = cv_find(query="Submit", hwnd=12345, method="uia")
@@ -104,12 +85,10 @@ def test_find_success_includes_image_scale(mock_tree):
 
 
 @patch("src.tools.find.get_ui_tree")
-def test_find_success_includes_window_origin(mock_tree):
+def test_find_success_includes_window_origin(mock_tree, make_uia_element):
     """On success, matches have bbox with absolute coordinates (window origin embedded)."""
-    from src.tools.find import cv_find
-
     mock_tree.return_value = [
-        _make_uia_element(
+        make_uia_element(
             name="Submit", control_type="Button", ref_id="ref_1",
             rect=Rect(x=200, y=150, width=80, height=30),
         ),
@@ -126,12 +105,10 @@ def test_find_success_includes_window_origin(mock_tree):
 
 
 @patch("src.tools.find.get_ui_tree")
-def test_find_success_includes_window_state(mock_tree):
+def test_find_success_includes_window_state(mock_tree, make_uia_element):
     """Success result should contain method_used and match metadata."""
-    from src.tools.find import cv_find
-
     mock_tree.return_value = [
-        _make_uia_element(name="Submit", control_type="Button", ref_id="ref_1"),
+        make_uia_element(name="Submit", control_type="Button", ref_id="ref_1"),
     ]
 
     result = cv_find(query="Submit", hwnd=12345, method="uia")
@@ -141,12 +118,10 @@ def test_find_success_includes_window_state(mock_tree):
 
 
 @patch("src.tools.find.get_ui_tree")
-def test_find_success_no_cooldown(mock_tree):
+def test_find_success_no_cooldown(mock_tree, make_uia_element):
     """Call cv_find twice in succession with matches. Both should succeed."""
-    from src.tools.find import cv_find
-
     mock_tree.return_value = [
-        _make_uia_element(name="Submit", control_type="Button", ref_id="ref_1"),
+        make_uia_element(name="Submit", control_type="Button", ref_id="ref_1"),
     ]
 
     result1 = cv_find(query="Submit", hwnd=12345, method="uia")
@@ -163,16 +138,12 @@ def test_find_success_no_cooldown(mock_tree):
 
 def test_find_no_match_still_has_cooldown():
     """Verify existing no-match cooldown behavior is preserved."""
-    from src.tools.find import cv_find, _screenshot_cooldowns
-
     with (
         patch("src.tools.find.get_ui_tree", return_value=[]),
         patch("src.tools.find._match_ocr", return_value=[]),
         patch("src.utils.screenshot.capture_window") as mock_capture,
     ):
-        mock_cap_result = MagicMock()
-        mock_cap_result.image_path = "/tmp/nomatch.png"
-        mock_capture.return_value = mock_cap_result
+        mock_capture.return_value = SimpleNamespace(image_path="/tmp/nomatch.png")
 
         # First call — screenshot captured
         result1 = cv_find(query="nonexistent", hwnd=12345, method="auto")
@@ -194,8 +165,6 @@ def test_find_no_match_still_has_cooldown():
 
 def test_find_success_screenshot_failure_no_crash():
     """If capture_window raises on no-match, no crash — normal error returned."""
-    from src.tools.find import cv_find
-
     with (
         patch("src.tools.find.get_ui_tree", return_value=[]),
         patch("src.tools.find._match_ocr", return_value=[]),
@@ -232,16 +201,12 @@ def test_find_image_scale_calculation():
 
 def test_find_no_match_includes_scale_metadata():
     """When screenshot captured on no-match, error should contain image_path."""
-    from src.tools.find import cv_find
-
     with (
         patch("src.tools.find.get_ui_tree", return_value=[]),
         patch("src.tools.find._match_ocr", return_value=[]),
         patch("src.utils.screenshot.capture_window") as mock_capture,
     ):
-        mock_cap_result = MagicMock()
-        mock_cap_result.image_path = "/tmp/nomatch.png"
-        mock_capture.return_value = mock_cap_result
+        mock_capture.return_value = SimpleNamespace(image_path="/tmp/nomatch.png")
 
         result = cv_find(query="nonexistent", hwnd=12345, method="auto")
 
@@ -256,12 +221,10 @@ def test_find_no_match_includes_scale_metadata():
 
 
 @patch("src.tools.find.get_ui_tree")
-def test_find_backward_compat_match_fields(mock_tree):
+def test_find_backward_compat_match_fields(mock_tree, make_uia_element):
     """Verify matches still have text, bbox, confidence, source, ref_id fields."""
-    from src.tools.find import cv_find
-
     mock_tree.return_value = [
-        _make_uia_element(name="Submit", control_type="Button", ref_id="ref_1"),
+        make_uia_element(name="Submit", control_type="Button", ref_id="ref_1"),
     ]
 
     result = cv_find(query="Submit", hwnd=12345, method="uia")
@@ -15,19 +15,36 @@ OTHER_HWND = 99999
 FG_THREAD = 1000
 TARGET_THREAD = 2000
 
+# user32 prototypes bound at module level in win32_window
+_USER32_FUNCTIONS = (
+    "IsWindow",
+    "IsIconic",
+    "GetForegroundWindow",
+    "AttachThreadInput",
+    "SystemParametersInfoW",
+    "SendInput",
+)
+
+
+@pytest.fixture
+def mock_user32():
+    """Patch the bound user32 prototypes; each is an attribute of the yielded mock."""
+    user32 = MagicMock()
+    prototypes = {f"_{name}": getattr(user32, name) for name in _USER32_FUNCTIONS}
+    with patch.multiple("src.utils.win32_window", **prototypes):
+        yield user32
+
 
 class TestIsFocused:
     """Tests for _is_focused helper."""
 
-    @patch("src.utils.win32_window.ctypes")
-    def test_returns_true_when_foreground_matches(self, mock_ctypes):
-        mock_ctypes.windll.user32.GetForegroundWindow.return_value = HWND
+    def test_returns_true_when_foreground_matches(self, mock_user32):
+        mock_user32.GetForegroundWindow.return_value = HWND
         from src.utils.win32_window import _is_focused
         assert _is_focused(HWND) is True
 
-    @patch("src.utils.win32_window.ctypes")
-    def test_returns_false_when_foreground_differs(self, mock_ctypes):
-        mock_ctypes.windll.user32.GetForegroundWindow.return_value = OTHER_HWND
+    def test_returns_false_when_foreground_differs(self, mock_user32):
+        mock_user32.GetForegroundWindow.return_value = OTHER_HWND
         from src.utils.win32_window import _is_focused
         assert _is_focused(HWND) is False
 
@@ -35,24 +52,21 @@ class TestIsFocused:
 class TestStrategyDirect:
     """Tests for _strategy_direct."""
 
-    @patch("src.utils.win32_window.ctypes")
     @patch("src.utils.win32_window.win32gui")
-    def test_success_when_foreground_matches(self, mock_win32gui, mock_ctypes):
-        mock_ctypes.windll.user32.GetForegroundWindow.return_value = HWND
+    def test_success_when_foreground_matches(self, mock_win32gui, mock_user32):
+        mock_user32.GetForegroundWindow.return_value = HWND
         from src.utils.win32_window import _strategy_direct
         assert _strategy_direct(HWND) is True
         mock_win32gui.SetForegroundWindow.assert_called_once_with(HWND)
 
-    @patch("src.utils.win32_window.ctypes")
     @patch("src.utils.win32_window.win32gui")
-    def test_failure_when_foreground_differs(self, mock_win32gui, mock_ctypes):
-        mock_ctypes.windll.user32.GetForegroundWindow.return_value = OTHER_HWND
+    def test_failure_when_foreground_differs(self, mock_win32gui, mock_user32):
+        mock_user32.GetForegroundWindow.return_value = OTHER_HWND
         from src.utils.win32_window import _strategy_direct
         assert _strategy_direct(HWND) is False
 
-    @patch("src.utils.win32_window.ctypes")
     @patch("src.utils.win32_window.win32gui")
-    def test_exception_returns_false(self, mock_win32gui, mock_ctypes):
+    def test_exception_returns_false(self, mock_win32gui, mock_user32):
         mock_win32gui.SetForegroundWindow.side_effect = Exception("access denied")
         from src.utils.win32_window import _strategy_direct
         assert _strategy_direct(HWND) is False
@@ -61,30 +75,27 @@ class TestStrategyDirect:
 class TestStrategyAltTrick:
     """Tests for _strategy_alt_trick."""
 
-    @patch("src.utils.win32_window.ctypes")
     @patch("src.utils.win32_window.win32gui")
-    def test_sends_paired_alt_keydown_keyup(self, mock_win32gui, mock_ctypes):
-        mock_ctypes.windll.user32.GetForegroundWindow.return_value = HWND
-        mock_ctypes.windll.user32.SendInput.return_value = 2
-        # Need to make ctypes.wintypes, Structure, etc. work
-        # Reset ctypes side effects to let the real ctypes work for struct creation
-        # We selectively mock only windll
+    def test_sends_paired_alt_keydown_keyup(self, mock_win32gui, mock_user32):
+        mock_user32.GetForegroundWindow.return_value = HWND
+        mock_user32.SendInput.return_value = 2
+        import ctypes
+
+        from src.utils.win32_input import INPUT
         from src.utils.win32_window import _strategy_alt_trick
 
-        # The function internally defines ctypes structures; we just verify SendInput was called
-        # and SetForegroundWindow was called.
-        # Since we're fully mocking ctypes, the struct creation will use mock objects.
-        # Just verify the function doesn't crash and calls the right things.
-        result = _strategy_alt_trick(HWND)
-        # Depending on mock behavior, just check it called SendInput
-        mock_ctypes.windll.user32.SendInput.assert_called_once()
+        assert _strategy_alt_trick(HWND) is True
+        mock_user32.SendInput.assert_called_once()
+        count, inputs, size = mock_user32.SendInput.call_args[0]
+        assert count == 2
+        assert size == ctypes.sizeof(INPUT)  # full INPUT incl. the MOUSEINPUT arm
+        assert [inputs[0].union.ki.wVk, inputs[1].union.ki.wVk] == [0x12, 0x12]  # VK_MENU
+        assert [inputs[0].union.ki.dwFlags, inputs[1].union.ki.dwFlags] == [0, 0x0002]  # KEYEVENTF_KEYUP
+        mock_win32gui.SetForegroundWindow.assert_called_once_with(HWND)
 
-    @patch("src.utils.win32_window.ctypes")
     @patch("src.utils.win32_window.win32gui")
-    def test_exception_returns_false(self, mock_win32gui, mock_ctypes):
-        mock_ctypes.windll.user32.SendInput.side_effect = Exception("send failed")
-        # Make the struct creation fail by breaking ctypes.Structure
-        mock_ctypes.Structure = type("MockStructure", (), {})
+    def test_exception_returns_false(self, mock_win32gui, mock_user32):
+        mock_user32.SendInput.side_effect = Exception("send failed")
         from src.utils.win32_window import _strategy_alt_trick
         assert _strategy_alt_trick(HWND) is False
 
@@ -93,17 +104,16 @@ class TestStrategyAttachThread:
     """Tests for _strategy_attach_thread."""
 
     @patch("src.utils.win32_window.win32process")
-    @patch("src.utils.win32_window.ctypes")
     @patch("src.utils.win32_window.win32gui")
-    def test_attaches_and_detaches_threads(self, mock_win32gui, mock_ctypes, mock_win32process):
-        mock_ctypes.windll.user32.GetForegroundWindow.return_value = OTHER_HWND
+    def test_attaches_and_detaches_threads(self, mock_win32gui, mock_win32process, mock_user32):
+        mock_user32.GetForegroundWindow.return_value = OTHER_HWND
         mock_win32process.GetWindowThreadProcessId.side_effect = [
             (FG_THREAD, 100),  # foreground window
             (TARGET_THREAD, 200),  # target window
         ]
         # After SetForegroundWindow, simulate success
         # GetForegroundWindow will be called again by _is_focused
-        mock_ctypes.windll.user32.GetForegroundWindow.side_effect = [
+        mock_user32.GetForegroundWindow.side_effect = [
             OTHER_HWND,  # first call in _strategy_attach_thread
             HWND,  # called by _is_focused
         ]
@@ -112,16 +122,15 @@ class TestStrategyAttachThread:
         assert result is True
 
         # Verify attach was called
-        mock_ctypes.windll.user32.AttachThreadInput.assert_any_call(TARGET_THREAD, FG_THREAD, True)
+        mock_user32.AttachThreadInput.assert_any_call(TARGET_THREAD, FG_THREAD, True)
         # Verify detach in finally
-        mock_ctypes.windll.user32.AttachThreadInput.assert_any_call(TARGET_THREAD, FG_THREAD, False)
+        mock_user32.AttachThreadInput.assert_any_call(TARGET_THREAD, FG_THREAD, False)
         mock_win32gui.BringWindowToTop.assert_called_once_with(HWND)
 
     @patch("src.utils.win32_window.win32process")
-    @patch("src.utils.win32_window.ctypes")
     @patch("src.utils.win32_window.win32gui")
-    def test_detach_called_even_on_exception(self, mock_win32gui, mock_ctypes, mock_win32process):
-        mock_ctypes.windll.user32.GetForegroundWindow.return_value = OTHER_HWND
+    def test_detach_called_even_on_exception(self, mock_win32gui, mock_win32process, mock_user32):
+        mock_user32.GetForegroundWindow.return_value = OTHER_HWND
         mock_win32process.GetWindowThreadProcessId.side_effect = [
             (FG_THREAD, 100),
             (TARGET_THREAD, 200),
@@ -132,36 +141,26 @@ class TestStrategyAttachThread:
         result = _strategy_attach_thread(HWND)
         assert result is False
         # Detach should still be called
-        mock_ctypes.windll.user32.AttachThreadInput.assert_any_call(TARGET_THREAD, FG_THREAD, False)
+        mock_user32.AttachThreadInput.assert_any_call(TARGET_THREAD, FG_THREAD, False)
 
 
 class TestStrategySpiBypass:
     """Tests for _strategy_spi_bypass."""
 
-    @patch("src.utils.win32_window.ctypes")
     @patch("src.utils.win32_window.win32gui")
-    def test_saves_and_restores_timeout(self, mock_win32gui, mock_ctypes):
-        # Mock the DWORD and byref
-        mock_dword_instance = MagicMock()
-        mock_dword_instance.value = 42
-        mock_ctypes.wintypes.DWORD.return_value = mock_dword_instance
-        mock_ctypes.windll.user32.GetForegroundWindow.return_value = HWND
-        mock_ctypes.windll.user32.SystemParametersInfoW.return_value = True
+    def test_saves_and_restores_timeout(self, mock_win32gui, mock_user32):
+        mock_user32.GetForegroundWindow.return_value = HWND
+        mock_user32.SystemParametersInfoW.return_value = True
 
         from src.utils.win32_window import _strategy_spi_bypass
         result = _strategy_spi_bypass(HWND)
 
         # Verify SystemParametersInfoW was called at least 3 times:
         # 1) GET timeout, 2) SET to 0, 3) restore in finally
-        assert mock_ctypes.windll.user32.SystemParametersInfoW.call_count >= 3
+        assert mock_user32.SystemParametersInfoW.call_count >= 3
 
-    @patch("src.utils.win32_window.ctypes")
     @patch("src.utils.win32_window.win32gui")
-    def test_restore_called_even_on_exception(self, mock_win32gui, mock_ctypes):
-        mock_dword_instance = MagicMock()
-        mock_dword_instance.value = 0
-        mock_ctypes.wintypes.DWORD.return_value = mock_dword_instance
-
+    def test_restore_called_even_on_exception(self, mock_win32gui, mock_user32):
         # Make SetForegroundWindow raise
         mock_win32gui.SetForegroundWindow.side_effect = Exception("denied")
 
@@ -170,11 +169,31 @@ class TestStrategySpiBypass:
         assert result is False
 
         # The finally block should still try to restore (call #3)
-        spi_calls = mock_ctypes.windll.user32.SystemParametersInfoW.call_args_list
+        spi_calls = mock_user32.SystemParametersInfoW.call_args_list
         # At minimum: GET (may fail but attempted), SET (may fail but attempted)
         # Finally: restore SET
         assert len(spi_calls) >= 1  # At least the GET or restore was called
 
+    @patch("src.utils.win32_window.win32gui")
+    def test_restore_passes_saved_timeout_as_value(self, mock_win32gui, mock_user32):
+        from src.utils.win32_window import (
+            SPI_GETFOREGROUNDLOCKTIMEOUT,
+            SPI_SETFOREGROUNDLOCKTIMEOUT,
+            SPIF_SENDCHANGE,
+            _strategy_spi_bypass,
+        )
+
+        def _spi(action, ui_param, pv_param, flags):
+            if action == SPI_GETFOREGROUNDLOCKTIMEOUT:
+                pv_param._obj.value = 200000
+            return True
+
+        mock_user32.SystemParametersInfoW.side_effect = _spi
+        _strategy_spi_bypass(HWND)
+
+        restore = mock_user32.SystemParametersInfoW.call_args_list[-1]
+        assert restore == call(SPI_SETFOREGROUNDLOCKTIMEOUT, 0, 200000, SPIF_SENDCHANGE)
+
 
 class TestFocusWindow:
     """Tests for the main focus_window function."""
@@ -182,10 +201,9 @@ class TestFocusWindow:
     @patch("src.utils.win32_window.time")
     @patch("src.utils.win32_window._FOCUS_STRATEGIES")
     @patch("src.utils.win32_window.win32gui")
-    @patch("src.utils.win32_window.ctypes")
-    def test_returns_true_on_first_strategy_success(self, mock_ctypes, mock_win32gui, mock_strategies, mock_time):
-        mock_ctypes.windll.user32.IsWindow.return_value = True
-        mock_ctypes.windll.user32.IsIconic.return_value = False
+    def test_returns_true_on_first_strategy_success(self, mock_win32gui, mock_strategies, mock_time, mock_user32):
+        mock_user32.IsWindow.return_value = True
+        mock_user32.IsIconic.return_value = False
 
         strategy1 = MagicMock(return_value=True, __name__="strategy1")
         strategy2 = MagicMock(return_value=False, __name__="strategy2")
@@ -199,10 +217,9 @@ class TestFocusWindow:
 
     @patch("src.utils.win32_window.time")
     @patch("src.utils.win32_window.win32gui")
-    @patch("src.utils.win32_window.ctypes")
-    def test_returns_false_when_all_strategies_fail(self, mock_ctypes, mock_win32gui, mock_time):
-        mock_ctypes.windll.user32.IsWindow.return_value = True
-        mock_ctypes.windll.user32.IsIconic.return_value = False
+    def test_returns_false_when_all_strategies_fail(self, mock_win32gui, mock_time, mock_user32):
+        mock_user32.IsWindow.return_value = True
+        mock_user32.IsIconic.return_value = False
 
         # Patch all individual strategies to return False
         with patch("src.utils.win32_window._strategy_direct", return_value=False), \
@@ -214,18 +231,16 @@ class TestFocusWindow:
 
     @patch("src.utils.win32_window.time")
     @patch("src.utils.win32_window.win32gui")
-    @patch("src.utils.win32_window.ctypes")
-    def test_returns_false_for_invalid_window(self, mock_ctypes, mock_win32gui, mock_time):
-        mock_ctypes.windll.user32.IsWindow.return_value = False
+    def test_returns_false_for_invalid_window(self, mock_win32gui, mock_time, mock_user32):
+        mock_user32.IsWindow.return_value = False
         from src.utils.win32_window import focus_window
         assert focus_window(HWND) is False
 
     @patch("src.utils.win32_window.time")
     @patch("src.utils.win32_window.win32gui")
-    @patch("src.utils.win32_window.ctypes")
-    def test_restores_minimized_window(self, mock_ctypes, mock_win32gui, mock_time):
-        mock_ctypes.windll.user32.IsWindow.return_value = True
-        mock_ctypes.windll.user32.IsIconic.return_value = True
+    def test_restores_minimized_window(self, mock_win32gui, mock_time, mock_user32):
+        mock_user32.IsWindow.return_value = True
+        mock_user32.IsIconic.return_value = True
 
         # Make all strategies succeed on first try
         with patch("src.utils.win32_window._strategy_direct", return_value=True):
@@ -236,10 +251,9 @@ class TestFocusWindow:
 
     @patch("src.utils.win32_window.time")
     @patch("src.utils.win32_window.win32gui")
-    @patch("src.utils.win32_window.ctypes")
-    def test_retry_sleeps_between_attempts(self, mock_ctypes, mock_win32gui, mock_time):
-        mock_ctypes.windll.user32.IsWindow.return_value = True
-        mock_ctypes.windll.user32.IsIconic.return_value = False
+    def test_retry_sleeps_between_attempts(self, mock_win32gui, mock_time, mock_user32):
+        mock_user32.IsWindow.return_value = True
+        mock_user32.IsIconic.return_value = False
 
         with patch("src.utils.win32_window._strategy_direct", return_value=False), \
              patch("src.utils.win32_window._strategy_alt_trick", return_value=False), \
@@ -248,16 +262,85 @@ class TestFocusWindow:
             from src.utils.win32_window import focus_window
             focus_window(HWND)
 
-        # Should sleep between attempts (5 sleeps for 6 attempts)
-        assert mock_time.sleep.call_count == 5
+        # One pause between the full first pass and the retry pass (6 attempts)
+        assert mock_time.sleep.call_count == 1
         mock_time.sleep.assert_called_with(0.05)
 
     @patch("src.utils.win32_window.time")
     @patch("src.utils.win32_window.win32gui")
-    @patch("src.utils.win32_window.ctypes")
-    def test_cycles_through_strategies(self, mock_ctypes, mock_win32gui, mock_time):
-        mock_ctypes.windll.user32.IsWindow.return_value = True
-        mock_ctypes.windll.user32.IsIconic.return_value = False
+    def test_stops_when_window_destroyed_mid_escalation(self, mock_win32gui, mock_time, mock_user32):
+        # Valid for the entry check, gone after the first failed strategy
+        mock_user32.IsWindow.side_effect = [True, False]
+        mock_user32.IsIconic.return_value = False
+        strategies = [MagicMock(return_value=False, __name__=f"s{i}") for i in range(2)]
+
+        with patch("src.utils.win32_window._FOCUS_STRATEGIES", strategies):
+            from src.utils.win32_window import focus_window
+            assert focus_window(HWND) is False
+
+        strategies[0].assert_called_once_with(HWND)
+        strategies[1].assert_not_called()
+        mock_time.sleep.assert_not_called()
+
+    @patch("src.utils.win32_window.time")
+    @patch("src.utils.win32_window.win32gui")
+    def test_succeeds_when_focused_by_other_means_between_strategies(self, mock_win32gui, mock_time, mock_user32):
+        mock_user32.IsWindow.return_value = True
+        mock_user32.IsIconic.return_value = False
+        # Not focused on entry; focused after the first (failed) strategy
+        mock_user32.GetForegroundWindow.side_effect = [OTHER_HWND, HWND]
+        strategies = [MagicMock(return_value=False, __name__=f"s{i}") for i in range(2)]
+
+        with patch("src.utils.win32_window._FOCUS_STRATEGIES", strategies):
+            from src.utils.win32_window import focus_window
+            assert focus_window(HWND) is True
+
+        strategies[1].assert_not_called()
+
+    @patch("src.utils.win32_window.time")
+    @patch("src.utils.win32_window.win32gui")
+    def test_already_focused_skips_strategies(self, mock_win32gui, mock_time, mock_user32):
+        mock_user32.IsWindow.return_value = True
+        mock_user32.IsIconic.return_value = False
+        mock_user32.GetForegroundWindow.return_value = HWND
+        strategy = MagicMock(return_value=True, __name__="strategy")
+
+        with patch("src.utils.win32_window._FOCUS_STRATEGIES", [strategy]):
+            from src.utils.win32_window import focus_window
+            assert focus_window(HWND) is True
+
+        strategy.assert_not_called()
+        mock_time.sleep.assert_not_called()
+
+    @patch("src.utils.win32_window.time")
+    @patch("src.utils.win32_window.win32gui")
+    def test_retry_pass_skips_direct_strategy(self, mock_win32gui, mock_time, mock_user32):
+        mock_user32.IsWindow.return_value = True
+        mock_user32.IsIconic.return_value = False
+
+        call_order = []
+
+        def make_strategy(name):
+            def strategy(hwnd):
+                call_order.append(name)
+                return False
+            strategy.__name__ = name
+            return strategy
+
+        strategies = [make_strategy(name) for name in ("direct", "alt_trick", "attach_thread", "spi_bypass")]
+        with patch("src.utils.win32_window._FOCUS_STRATEGIES", strategies):
+            from src.utils.win32_window import focus_window
+            assert focus_window(HWND) is False
+
+        assert call_order == [
+            "direct", "alt_trick", "attach_thread", "spi_bypass", "alt_trick", "attach_thread",
+        ]
+
+    @patch("src.utils.win32_window.time")
+    @patch("src.utils.win32_window.win32gui")
+    def test_cycles_through_strategies(self, mock_win32gui, mock_time, mock_user32):
+        mock_user32.IsWindow.return_value = True
+        mock_user32.IsIconic.return_value = False
 
         call_order = []
 
@@ -287,10 +370,9 @@ class TestFocusWindow:
 
     @patch("src.utils.win32_window.time")
     @patch("src.utils.win32_window.win32gui")
-    @patch("src.utils.win32_window.ctypes")
-    def test_strategy_exception_does_not_stop_retry(self, mock_ctypes, mock_win32gui, mock_time):
-        mock_ctypes.windll.user32.IsWindow.return_value = True
-        mock_ctypes.windll.user32.IsIconic.return_value = False
+    def test_strategy_exception_does_not_stop_retry(self, mock_win32gui, mock_time, mock_user32):
+        mock_user32.IsWindow.return_value = True
+        mock_user32.IsIconic.return_value = False
 
         calls = []
 
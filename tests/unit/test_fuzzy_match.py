@@ -143,7 +143,7 @@ class TestControlTypeMatching:
             ),
         ]
 
-        matches = _match_uia("Button", 12345)
+        matches, _ = _match_uia("Button", 12345)
         assert len(matches) >= 1
         assert matches[0].control_type == "Button"
 
@@ -160,7 +160,7 @@ class TestControlTypeMatching:
             ),
         ]
 
-        matches = _match_uia("button", 12345)
+        matches, _ = _match_uia("button", 12345)
         assert len(matches) >= 1
 
     @patch("src.tools.find.get_ui_tree")
@@ -177,7 +177,7 @@ class TestControlTypeMatching:
             ),
         ]
 
-        matches = _match_uia("Menu", 12345)
+        matches, _ = _match_uia("Menu", 12345)
         assert len(matches) >= 1
 
     @patch("src.tools.find.get_ui_tree")
@@ -194,7 +194,7 @@ class TestControlTypeMatching:
             ),
         ]
 
-        matches = _match_uia("Submit", 12345)
+        matches, _ = _match_uia("Submit", 12345)
         assert len(matches) == 0
 
 
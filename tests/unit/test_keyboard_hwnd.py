@@ -283,6 +283,19 @@ def test_send_keys_hwnd_none_preserves_v150():
     assert "window_state" not in result
 
 
+def test_send_keys_invalidates_cached_ui_tree():
+    """Keys sent to a window drop its cached UIA tree; without hwnd every tree is dropped."""
+    from src.tools.input_keyboard import cv_send_keys
+
+    with patch("src.tools.input_keyboard.invalidate_ui_tree_cache") as mock_invalidate:
+        cv_send_keys("ctrl+c", hwnd=HWND)
+        mock_invalidate.assert_called_once_with(HWND)
+
+        mock_invalidate.reset_mock()
+        cv_send_keys("ctrl+c")
+        mock_invalidate.assert_called_once_with()
+
+
 def test_type_text_hwnd_dry_run():
     """guard_dry_run returns a dict — that dict is returned directly."""
     from src.tools.input_keyboard import cv_type_text
@@ -261,3 +261,12 @@ def test_scroll_sendinput_failure():
 
     assert result["success"] is False
     assert result["error"]["code"] == "INPUT_FAILED"
+
+
+def test_scroll_invalidates_cached_ui_tree():
+    from src.tools.scroll import cv_scroll
+
+    with patch("src.tools.scroll.invalidate_ui_tree_cache") as mock_invalidate:
+        cv_scroll(hwnd=HWND, direction="down")
+
+    mock_invalidate.assert_called_once_with(HWND)
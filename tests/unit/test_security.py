@@ -2,7 +2,9 @@
 
 from __future__ import annotations
 
+import json
 import time
+from pathlib import Path
 from unittest.mock import patch, MagicMock
 
 import pytest
@@ -21,32 +23,38 @@ class TestCheckRestricted:
 
     @patch("src.utils.security.config")
     def test_restricted_process_raises(self, mock_config):
-        mock_config.RESTRICTED_PROCESSES = ["keepass", "1password"]
+        mock_config.RESTRICTED_PROCESS_SET = frozenset({"keepass", "1password"})
         with pytest.raises(AccessDeniedError):
             check_restricted("keepass")
 
     @patch("src.utils.security.config")
     def test_restricted_case_insensitive(self, mock_config):
-        mock_config.RESTRICTED_PROCESSES = ["keepass"]
+        mock_config.RESTRICTED_PROCESS_SET = frozenset({"keepass"})
         # check_restricted lowercases the input before comparison
         with pytest.raises(AccessDeniedError):
             check_restricted("keepass")
 
+    @patch("src.utils.security.config")
+    def test_mixed_case_name_matches(self, mock_config):
+        mock_config.RESTRICTED_PROCESS_SET = frozenset({"keepass"})
+        with pytest.raises(AccessDeniedError):
+            check_restricted("KeePass")
+
     @patch("src.utils.security.config")
     def test_allowed_process_passes(self, mock_config):
-        mock_config.RESTRICTED_PROCESSES = ["keepass", "1password"]
+        mock_config.RESTRICTED_PROCESS_SET = frozenset({"keepass", "1password"})
         # Should not raise
         check_restricted("notepad")
 
     @patch("src.utils.security.config")
     def test_empty_process_name(self, mock_config):
-        mock_config.RESTRICTED_PROCESSES = ["keepass"]
+        mock_config.RESTRICTED_PROCESS_SET = frozenset({"keepass"})
         # Empty string should not match
         check_restricted("")
 
     @patch("src.utils.security.config")
     def test_empty_restricted_list(self, mock_config):
-        mock_config.RESTRICTED_PROCESSES = []
+        mock_config.RESTRICTED_PROCESS_SET = frozenset()
         # Nothing is restricted
         check_restricted("keepass")
 
@@ -143,6 +151,115 @@ class TestRedactOcrOutput:
         assert "secret" not in out_regions[0]["text"]
         assert out_regions[1]["text"] == "safe text"
 
+    def test_patterns_compiled_once(self):
+        from src.utils.security import _compile_redaction_patterns
+
+        _compile_redaction_patterns.cache_clear()
+        patterns = [r"\d{3}-\d{2}-\d{4}", r"secret"]
+        with patch("src.utils.security.config") as mock_config:
+            mock_config.OCR_REDACTION_PATTERNS = patterns
+            redact_ocr_output("secret 123-45-6789", [{"text": "secret"}, {"text": "ok"}])
+            redact_ocr_output("another secret", [])
+        info = _compile_redaction_patterns.cache_info()
+        assert info.misses == 1
+        # Group-free patterns are folded into a single alternation
+        assert len(_compile_redaction_patterns(tuple(patterns))) == 1
+
+
+class TestGetProcessNameByPid:
+    """Tests for the get_process_name_by_pid TTL cache."""
+
+    def setup_method(self):
+        from src.utils.security import _pid_name_cache
+        _pid_name_cache.clear()
+
+    @patch("src.utils.security._lookup_process_name", return_value="notepad")
+    def test_cached_within_ttl(self, mock_lookup):
+        from src.utils.security import get_process_name_by_pid
+
+        with patch("src.utils.security.time.monotonic", return_value=100.0):
+            assert get_process_name_by_pid(42) == "notepad"
+        with patch("src.utils.security.time.monotonic", return_value=100.5):
+            assert get_process_name_by_pid(42) == "notepad"
+        mock_lookup.assert_called_once_with(42)
+
+    @patch("src.utils.security._lookup_process_name", side_effect=["notepad", "keepass"])
+    def test_recycled_pid_seen_after_ttl(self, mock_lookup):
+        from src.utils.security import get_process_name_by_pid
+
+        with patch("src.utils.security.time.monotonic", return_value=100.0):
+            assert get_process_name_by_pid(42) == "notepad"
+        with patch("src.utils.security.time.monotonic", return_value=101.5):
+            assert get_process_name_by_pid(42) == "keepass"
+        assert mock_lookup.call_count == 2
+
+    @patch("src.utils.security._lookup_process_name", return_value="")
+    def test_failure_cached_briefly(self, mock_lookup):
+        from src.utils.security import get_process_name_by_pid
+
+        with patch("src.utils.security.time.monotonic", return_value=100.0):
+            assert get_process_name_by_pid(7) == ""
+        with patch("src.utils.security.time.monotonic", return_value=100.1):
+            assert get_process_name_by_pid(7) == ""
+        assert mock_lookup.call_count == 1
+        with patch("src.utils.security.time.monotonic", return_value=100.5):
+            get_process_name_by_pid(7)
+        assert mock_lookup.call_count == 2
+
+    @patch("src.utils.security._lookup_process_name", return_value="notepad")
+    def test_expired_entries_dropped_and_size_bounded(self, _mock_lookup):
+        from src.utils import security
+
+        with (
+            patch("src.utils.security.time.monotonic", return_value=100.0),
+            patch("src.utils.security._PID_NAME_CACHE_MAX_ENTRIES", 3),
+        ):
+            for pid in range(1, 6):
+                security.get_process_name_by_pid(pid)
+            assert list(security._pid_name_cache) == [3, 4, 5]
+
+        with patch("src.utils.security.time.monotonic", return_value=200.0):
+            security.get_process_name_by_pid(3)
+        assert security._pid_name_cache[3][1] == 200.0 + security._PID_NAME_TTL
+
+
+class TestLogAction:
+    """Tests for the queued audit log writer."""
+
+    @patch("src.utils.security.config")
+    def test_entries_written_after_flush(self, mock_config, tmp_path):
+        from src.utils.security import flush_audit_log, log_action
+
+        mock_config.AUDIT_LOG_PATH = tmp_path / "logs" / "audit.jsonl"
+        log_action("test_audit_tool", {"text": "secret", "hwnd": 1}, "start")
+        log_action("test_audit_tool", {"text": "secret", "hwnd": 1}, "ok")
+        flush_audit_log()
+
+        lines = mock_config.AUDIT_LOG_PATH.read_text(encoding="utf-8").splitlines()
+        entries = [json.loads(line) for line in lines]
+        assert [e["result"] for e in entries] == ["start", "ok"]
+        assert all(e["params"]["text"] == "[TEXT len=6]" for e in entries)
+
+    @patch("src.utils.security.config")
+    @patch("src.utils.security._write_audit_lines")
+    @patch("src.utils.security._ensure_audit_writer")
+    def test_full_queue_writes_synchronously(self, _mock_ensure, mock_write, mock_config, tmp_path):
+        import queue
+
+        from src.utils.security import log_action
+
+        mock_config.AUDIT_LOG_PATH = tmp_path / "audit.jsonl"
+        full_queue: queue.Queue[tuple[Path, str]] = queue.Queue(maxsize=1)
+        full_queue.put_nowait((tmp_path / "other.jsonl", "pending\n"))
+        with patch("src.utils.security._audit_queue", full_queue):
+            log_action("test_audit_tool", {"hwnd": 1}, "ok")
+
+        mock_write.assert_called_once()
+        path, lines = mock_write.call_args.args
+        assert path == tmp_path / "audit.jsonl"
+        assert json.loads(lines[0])["tool"] == "test_audit_tool"
+        assert full_queue.qsize() == 1
+
 
 class TestSanitizeParams:
     """Tests for _sanitize_params."""
@@ -166,6 +283,10 @@ class TestSanitizeParams:
         result = _sanitize_params({})
         assert result == {}
 
+    def test_no_text_returns_same_dict(self):
+        params = {"hwnd": 12345, "text": None}
+        assert _sanitize_params(params) is params
+
     def test_does_not_modify_original(self):
         original = {"text": "secret", "x": 50}
         result = _sanitize_params(original)
@@ -49,11 +49,24 @@ class TestExtractUiaText:
             _make_element(name="Hello", control_type="Text", y=0, x=0),
             _make_element(name="World", control_type="Text", y=0, x=100),
         ]
-        text, confidence = _extract_uia_text(12345)
+        text, confidence, _ = _extract_uia_text(12345)
         assert "Hello" in text
         assert "World" in text
         assert confidence == 1.0
 
+    @patch("src.tools.text_extract.get_ui_tree")
+    def test_truncated_tree_is_reported(self, mock_tree):
+        from src.tools.text_extract import _extract_uia_text
+        from src.utils.uia import UiaTree
+
+        tree = UiaTree([_make_element(name="Hello", control_type="Text")])
+        tree.truncated = True
+        mock_tree.return_value = tree
+
+        text, _, truncated = _extract_uia_text(12345)
+        assert text == "Hello"
+        assert truncated is True
+
     @patch("src.tools.text_extract.get_ui_tree")
     def test_edit_prefers_value_over_name(self, mock_tree):
         from src.tools.text_extract import _extract_uia_text
@@ -66,7 +79,7 @@ class TestExtractUiaText:
                 y=0, x=0,
             ),
         ]
-        text, _ = _extract_uia_text(12345)
+        text, _, _ = _extract_uia_text(12345)
         assert "Actual typed content" in text
         assert "Placeholder text" not in text
 
@@ -82,7 +95,7 @@ class TestExtractUiaText:
                 y=0, x=0,
             ),
         ]
-        text, _ = _extract_uia_text(12345)
+        text, _, _ = _extract_uia_text(12345)
         assert "Search box" in text
 
     @patch("src.tools.text_extract.get_ui_tree")
@@ -93,7 +106,7 @@ class TestExtractUiaText:
             _make_element(name="OK", control_type="Button", y=0, x=0),
             _make_element(name="Visible text", control_type="Text", y=0, x=100),
         ]
-        text, _ = _extract_uia_text(12345)
+        text, _, _ = _extract_uia_text(12345)
         assert "Visible text" in text
         assert "OK" not in text
 
@@ -105,7 +118,7 @@ class TestExtractUiaText:
             _make_element(name="", control_type="Text", y=0, x=0),
             _make_element(name="Content", control_type="Text", y=0, x=100),
         ]
-        text, _ = _extract_uia_text(12345)
+        text, _, _ = _extract_uia_text(12345)
         assert text.strip() == "Content"
 
     @patch("src.tools.text_extract.get_ui_tree")
@@ -113,7 +126,7 @@ class TestExtractUiaText:
         from src.tools.text_extract import _extract_uia_text
 
         mock_tree.return_value = []
-        text, confidence = _extract_uia_text(12345)
+        text, confidence, _ = _extract_uia_text(12345)
         assert text == ""
         assert confidence == 1.0
 
@@ -133,7 +146,7 @@ class TestSpatialSorting:
             _make_element(name="Top-Right", control_type="Text", y=0, x=200),
             _make_element(name="Bottom-Left", control_type="Text", y=100, x=0),
         ]
-        text, _ = _extract_uia_text(12345)
+        text, _, _ = _extract_uia_text(12345)
         lines = [line for line in text.split("\n") if line.strip()]
         # Top row should come before bottom row
         top_left_idx = text.index("Top-Left")
@@ -154,7 +167,7 @@ class TestSpatialSorting:
             _make_element(name="B", control_type="Text", y=10, x=200),
             _make_element(name="A", control_type="Text", y=5, x=0),
         ]
-        text, _ = _extract_uia_text(12345)
+        text, _, _ = _extract_uia_text(12345)
         a_idx = text.index("A")
         b_idx = text.index("B")
         assert a_idx < b_idx
@@ -173,7 +186,7 @@ class TestParagraphBreaks:
             _make_element(name="Section 1", control_type="Text", y=0, x=0),
             _make_element(name="Section 2", control_type="Text", y=100, x=0),
         ]
-        text, _ = _extract_uia_text(12345)
+        text, _, _ = _extract_uia_text(12345)
         # Should have a double newline (paragraph break) between sections
         assert "\n\n" in text
 
@@ -185,7 +198,7 @@ class TestParagraphBreaks:
             _make_element(name="Line 1", control_type="Text", y=0, x=0),
             _make_element(name="Line 2", control_type="Text", y=25, x=0),
         ]
-        text, _ = _extract_uia_text(12345)
+        text, _, _ = _extract_uia_text(12345)
         # Should NOT have a double newline — gap is only 25px
         assert "\n\n" not in text
         assert "Line 1\nLine 2" in text
@@ -209,7 +222,7 @@ class TestPasswordRedaction:
                 y=0, x=0,
             ),
         ]
-        text, _ = _extract_uia_text(12345)
+        text, _, _ = _extract_uia_text(12345)
         assert "[PASSWORD]" in text
         assert "secret" not in text
 
@@ -262,8 +275,8 @@ class TestOcrFallback:
         from src.tools.text_extract import cv_get_text
 
         mock_config.OCR_REDACTION_PATTERNS = []
-        mock_uia.return_value = ("Hi", 1.0)  # < 20 chars
-        mock_ocr.return_value = ("Full OCR text from the window content", 0.85)
+        mock_uia.return_value = ("Hi", 1.0, False)  # < 20 chars
+        mock_ocr.return_value = ("Full OCR text from all of the visible window content", 0.85)
 
         result = cv_get_text(12345, method="auto")
         assert result["success"] is True
@@ -287,13 +300,89 @@ class TestOcrFallback:
         from src.tools.text_extract import cv_get_text
 
         mock_config.OCR_REDACTION_PATTERNS = []
-        mock_uia.return_value = ("This is plenty of UIA text content here", 1.0)
+        mock_uia.return_value = ("This is plenty of UIA text content here", 1.0, False)
 
         result = cv_get_text(12345, method="auto")
         assert result["success"] is True
         assert result["source"] == "uia"
         mock_ocr.assert_not_called()
 
+    @patch("src.tools.text_extract.log_action")
+    @patch("src.tools.text_extract.get_process_name_by_pid", return_value="notepad")
+    @patch("src.tools.text_extract.check_restricted")
+    @patch("src.tools.text_extract.validate_hwnd_fresh", return_value=True)
+    @patch("src.tools.text_extract.validate_hwnd_range")
+    @patch("src.tools.text_extract.config")
+    @patch("src.tools.text_extract._extract_ocr_text")
+    @patch("src.tools.text_extract.get_ui_tree")
+    @patch("win32process.GetWindowThreadProcessId", return_value=(0, 1234))
+    def test_auto_falls_back_to_ocr_when_uia_truncated(
+        self, mock_gwtp, mock_tree, mock_ocr, mock_config,
+        mock_range, mock_fresh, mock_restricted, mock_procname, mock_log,
+    ):
+        from src.tools.text_extract import cv_get_text
+        from src.utils.uia import UiaTree
+
+        mock_config.OCR_REDACTION_PATTERNS = []
+        tree = UiaTree([_make_element(name="Plenty of UIA text, but only part of it")])
+        tree.truncated = True
+        mock_tree.return_value = tree
+        mock_ocr.return_value = ("Full OCR text from all of the visible window content", 0.85)
+
+        result = cv_get_text(12345, method="auto")
+        assert result["source"] == "ocr"
+        assert result["truncated"] is False
+        mock_ocr.assert_called_once()
+
+    @pytest.mark.parametrize("ocr_text", ["", "Short OCR"])
+    @patch("src.tools.text_extract.log_action")
+    @patch("src.tools.text_extract.get_process_name_by_pid", return_value="notepad")
+    @patch("src.tools.text_extract.check_restricted")
+    @patch("src.tools.text_extract.validate_hwnd_fresh", return_value=True)
+    @patch("src.tools.text_extract.validate_hwnd_range")
+    @patch("src.tools.text_extract.config")
+    @patch("src.tools.text_extract._extract_ocr_text")
+    @patch("src.tools.text_extract.get_ui_tree")
+    @patch("win32process.GetWindowThreadProcessId", return_value=(0, 1234))
+    def test_auto_keeps_truncated_uia_when_ocr_finds_less(
+        self, mock_gwtp, mock_tree, mock_ocr, mock_config,
+        mock_range, mock_fresh, mock_restricted, mock_procname, mock_log, ocr_text,
+    ):
+        from src.tools.text_extract import cv_get_text
+        from src.utils.uia import UiaTree
+
+        mock_config.OCR_REDACTION_PATTERNS = []
+        tree = UiaTree([_make_element(name="Plenty of UIA text, but only part of it")])
+        tree.truncated = True
+        mock_tree.return_value = tree
+        mock_ocr.return_value = (ocr_text, 0.85)
+
+        result = cv_get_text(12345, method="auto")
+        assert result["source"] == "uia"
+        assert result["text"] == "Plenty of UIA text, but only part of it"
+        assert result["truncated"] is True
+
+    @patch("src.tools.text_extract.log_action")
+    @patch("src.tools.text_extract.get_process_name_by_pid", return_value="notepad")
+    @patch("src.tools.text_extract.check_restricted")
+    @patch("src.tools.text_extract.validate_hwnd_fresh", return_value=True)
+    @patch("src.tools.text_extract.validate_hwnd_range")
+    @patch("src.tools.text_extract.config")
+    @patch("src.tools.text_extract._extract_uia_text")
+    @patch("win32process.GetWindowThreadProcessId", return_value=(0, 1234))
+    def test_uia_mode_reports_truncated(
+        self, mock_gwtp, mock_uia, mock_config,
+        mock_range, mock_fresh, mock_restricted, mock_procname, mock_log,
+    ):
+        from src.tools.text_extract import cv_get_text
+
+        mock_config.OCR_REDACTION_PATTERNS = []
+        mock_uia.return_value = ("Partial text", 1.0, True)
+
+        result = cv_get_text(12345, method="uia")
+        assert result["source"] == "uia"
+        assert result["truncated"] is True
+
 
 # --- PII redaction ---
 
@@ -315,7 +404,7 @@ class TestPiiRedaction:
         from src.tools.text_extract import cv_get_text
 
         mock_config.OCR_REDACTION_PATTERNS = [r"\b\d{3}-\d{2}-\d{4}\b"]
-        mock_uia.return_value = ("SSN: 123-45-6789 is private", 1.0)
+        mock_uia.return_value = ("SSN: 123-45-6789 is private", 1.0, False)
 
         result = cv_get_text(12345, method="uia")
         assert result["success"] is True
@@ -387,7 +476,7 @@ class TestSecurityGates:
         from src.tools.text_extract import cv_get_text
 
         mock_config.OCR_REDACTION_PATTERNS = []
-        mock_uia.return_value = ("Enough text for UIA to pass threshold", 1.0)
+        mock_uia.return_value = ("Enough text for UIA to pass threshold", 1.0, False)
 
         cv_get_text(12345)
         mock_range.assert_called_once_with(12345)
@@ -424,7 +513,7 @@ class TestMethodParameter:
         from src.tools.text_extract import cv_get_text
 
         mock_config.OCR_REDACTION_PATTERNS = []
-        mock_uia.return_value = ("Short", 1.0)  # < 20 chars but method is forced
+        mock_uia.return_value = ("Short", 1.0, False)  # < 20 chars but method is forced
 
         result = cv_get_text(12345, method="uia")
         assert result["success"] is True
@@ -475,7 +564,7 @@ class TestReturnStructure:
         from src.tools.text_extract import cv_get_text
 
         mock_config.OCR_REDACTION_PATTERNS = []
-        mock_uia.return_value = ("Line 1\nLine 2\nLine 3", 1.0)
+        mock_uia.return_value = ("Line 1\nLine 2\nLine 3", 1.0, False)
 
         result = cv_get_text(12345, method="uia")
         assert result["success"] is True
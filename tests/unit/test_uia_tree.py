@@ -0,0 +1,523 @@
+"""Unit tests for the UIA tree walk in src/utils/uia.py."""
+
+from __future__ import annotations
+
+from types import SimpleNamespace
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+HWND = 12345
+
+
+def _make_element_array(elements: list) -> MagicMock | None:
+    """Build a stand-in IUIAutomationElementArray (None when empty, like UIA)."""
+    if not elements:
+        return None
+    array = MagicMock()
+    array.Length = len(elements)
+    array.GetElement.side_effect = lambda i: elements[i]
+    return array
+
+
+def _make_cached_element(
+    name: str = "",
+    control_type: int = 50000,
+    rect: tuple[int, int, int, int] = (0, 0, 80, 30),
+    value: str | None = None,
+    is_password: bool = False,
+    is_offscreen: bool = False,
+    children: list | None = None,
+) -> MagicMock:
+    """Build a mock IUIAutomationElement exposing only Cached* reads."""
+    element = MagicMock()
+    element.CachedControlType = control_type
+    element.CachedName = name
+    element.CachedIsEnabled = True
+    element.CachedIsPassword = is_password
+    element.CachedIsOffscreen = is_offscreen
+    left, top, right, bottom = rect
+    element.CachedBoundingRectangle = SimpleNamespace(left=left, top=top, right=right, bottom=bottom)
+    element.GetCachedPropertyValue.return_value = value
+    element.GetCachedChildren.return_value = _make_element_array(children or [])
+    # Fetching the next level returns the same element with its children cached
+    element.BuildUpdatedCache.return_value = element
+    return element
+
+
+@pytest.fixture
+def mock_win32gui():
+    with patch("src.utils.uia.win32gui") as mock_gui:
+        mock_gui.GetWindowRect.return_value = (0, 0, 800, 600)
+        mock_gui.GetWindowText.return_value = "Window"
+        yield mock_gui
+
+
+@pytest.fixture
+def mock_uia(mock_win32gui):
+    """Patch UIA init and Chromium activation; root is built via the cache request."""
+    from src.utils.uia import invalidate_ui_tree_cache
+
+    invalidate_ui_tree_cache()
+    uia = MagicMock()
+    with (
+        patch("src.utils.uia._safe_init_uia", return_value=uia),
+        patch("src.utils.uia._ensure_chromium_accessibility", return_value=False),
+    ):
+        yield uia
+    invalidate_ui_tree_cache()
+
+
+class TestGetUiTree:
+    """Tests for get_ui_tree over a cached subtree."""
+
+    def test_builds_tree_from_cached_properties(self, mock_uia):
+        from src.utils.uia import get_ui_tree
+
+        button = _make_cached_element(name="OK", control_type=50000, rect=(10, 20, 90, 50))
+        pane = _make_cached_element(name="Main", control_type=50033, children=[button])
+        mock_uia.ElementFromHandleBuildCache.return_value = _make_cached_element(children=[pane])
+
+        tree = get_ui_tree(HWND)
+
+        assert len(tree) == 1
+        assert tree[0].control_type == "Pane"
+        child = tree[0].children[0]
+        assert child.name == "OK"
+        assert child.is_interactive is True
+        assert (child.rect.x, child.rect.y, child.rect.width, child.rect.height) == (10, 20, 80, 30)
+        # No live Current* reads or tree walker round-trips
+        mock_uia.ElementFromHandleBuildCache.assert_called_once()
+        mock_uia.CreateTreeWalker.assert_not_called()
+
+    def test_cache_request_prefetches_one_level(self, mock_uia):
+        from src.utils.uia import (
+            TREE_SCOPE_CHILDREN,
+            TREE_SCOPE_ELEMENT,
+            UIA_NAME_PROPERTY_ID,
+            get_ui_tree,
+        )
+
+        mock_uia.ElementFromHandleBuildCache.return_value = _make_cached_element()
+        get_ui_tree(HWND)
+
+        cache_request = mock_uia.CreateCacheRequest.return_value
+        cache_request.AddProperty.assert_any_call(UIA_NAME_PROPERTY_ID)
+        assert cache_request.TreeScope == TREE_SCOPE_ELEMENT | TREE_SCOPE_CHILDREN
+        assert cache_request.TreeFilter is mock_uia.ControlViewCondition
+        mock_uia.ElementFromHandleBuildCache.assert_called_once_with(HWND, cache_request)
+
+    def test_levels_fetched_only_down_to_depth(self, mock_uia):
+        from src.utils.uia import get_ui_tree
+
+        grandchild = _make_cached_element(name="Grandchild")
+        child = _make_cached_element(name="Child", control_type=50026, children=[grandchild])
+        pane = _make_cached_element(name="Pane", control_type=50033, children=[child])
+        mock_uia.ElementFromHandleBuildCache.return_value = _make_cached_element(children=[pane])
+
+        tree = get_ui_tree(HWND, depth=2)
+
+        assert [e.name for e in tree[0].children] == ["Child"]
+        assert tree[0].children[0].children == []
+        cache_request = mock_uia.CreateCacheRequest.return_value
+        pane.BuildUpdatedCache.assert_called_once_with(cache_request)
+        child.BuildUpdatedCache.assert_not_called()
+
+    def test_interactive_walk_uses_content_view(self, mock_uia):
+        from src.utils.uia import get_ui_tree
+
+        mock_uia.ElementFromHandleBuildCache.return_value = _make_cached_element()
+        get_ui_tree(HWND, filter="interactive")
+
+        cache_request = mock_uia.CreateCacheRequest.return_value
+        assert cache_request.TreeFilter is mock_uia.ContentViewCondition
+
+    def test_edit_value_and_password_masking(self, mock_uia):
+        from src.utils.uia import get_ui_tree
+
+        edit = _make_cached_element(name="User", control_type=50004, value="alice")
+        secret = _make_cached_element(name="Pass", control_type=50004, value="hunter2", is_password=True)
+        mock_uia.ElementFromHandleBuildCache.return_value = _make_cached_element(children=[edit, secret])
+
+        tree = get_ui_tree(HWND)
+
+        assert tree[0].value == "alice"
+        assert tree[1].value == "[PASSWORD]"
+        assert tree[1].is_password is True
+        secret.GetCachedPropertyValue.assert_not_called()
+
+    def test_depth_limits_descent(self, mock_uia):
+        from src.utils.uia import get_ui_tree
+
+        leaf = _make_cached_element(name="Leaf")
+        mid = _make_cached_element(name="Mid", control_type=50026, children=[leaf])
+        mock_uia.ElementFromHandleBuildCache.return_value = _make_cached_element(children=[mid])
+
+        tree = get_ui_tree(HWND, depth=1)
+
+        assert tree[0].name == "Mid"
+        assert tree[0].children == []
+
+    def test_interactive_filter_keeps_ancestors_of_interactive(self, mock_uia):
+        from src.utils.uia import get_ui_tree
+
+        button = _make_cached_element(name="Go", control_type=50000)
+        group = _make_cached_element(name="Group", control_type=50026, children=[button])
+        label = _make_cached_element(name="Label", control_type=50020)
+        mock_uia.ElementFromHandleBuildCache.return_value = _make_cached_element(children=[group, label])
+
+        tree = get_ui_tree(HWND, filter="interactive")
+
+        assert [e.name for e in tree] == ["Group"]
+        assert [e.name for e in tree[0].children] == ["Go"]
+
+    def test_interactive_filter_prunes_empty_layout_and_offscreen_subtrees(self, mock_uia):
+        from src.utils.uia import get_ui_tree
+
+        hidden = _make_cached_element(name="Hidden", control_type=50000)
+        separator = _make_cached_element(control_type=50038, rect=(0, 0, 0, 0), children=[hidden])
+        far = _make_cached_element(name="Far", control_type=50000)
+        offscreen = _make_cached_element(
+            control_type=50026, rect=(5000, 0, 5100, 50), is_offscreen=True, children=[far]
+        )
+        button = _make_cached_element(name="Go", control_type=50000)
+        mock_uia.ElementFromHandleBuildCache.return_value = _make_cached_element(
+            rect=(0, 0, 800, 600), children=[separator, offscreen, button]
+        )
+
+        tree = get_ui_tree(HWND, filter="interactive")
+
+        assert [e.name for e in tree] == ["Go"]
+        separator.BuildUpdatedCache.assert_not_called()
+        offscreen.BuildUpdatedCache.assert_not_called()
+
+        # "all" still returns the full tree
+        full = get_ui_tree(HWND, filter="all")
+        assert [e.children[0].name for e in full[:2]] == ["Hidden", "Far"]
+
+    def test_ref_ids_numbered_children_first(self, mock_uia):
+        from src.utils.uia import get_ui_tree
+
+        leaf = _make_cached_element(name="Leaf")
+        group = _make_cached_element(name="Group", control_type=50026, children=[leaf])
+        sibling = _make_cached_element(name="Sibling")
+        mock_uia.ElementFromHandleBuildCache.return_value = _make_cached_element(children=[group, sibling])
+
+        tree = get_ui_tree(HWND)
+
+        assert tree[0].children[0].ref_id == "ref_1"
+        assert tree[0].ref_id == "ref_2"
+        assert tree[1].ref_id == "ref_3"
+
+    def test_ref_ids_reused_across_walks(self, mock_uia):
+        from src.utils.uia import _REF_ID_POOL_SIZE, _ref_id, get_ui_tree, invalidate_ui_tree_cache
+
+        mock_uia.ElementFromHandleBuildCache.return_value = _make_cached_element(
+            children=[_make_cached_element(name="A")]
+        )
+        first = get_ui_tree(HWND)
+        invalidate_ui_tree_cache()
+        second = get_ui_tree(HWND)
+
+        assert second is not first
+        assert second[0].ref_id is first[0].ref_id
+        assert _ref_id(_REF_ID_POOL_SIZE + 1) == f"ref_{_REF_ID_POOL_SIZE + 1}"
+
+    def test_deep_tree_does_not_recurse(self, mock_uia):
+        import sys
+
+        from src.utils.uia import get_ui_tree
+
+        depth = sys.getrecursionlimit() + 100
+        node = _make_cached_element(name="Bottom")
+        for _ in range(depth - 1):
+            node = _make_cached_element(control_type=50026, children=[node])
+        mock_uia.ElementFromHandleBuildCache.return_value = _make_cached_element(children=[node])
+
+        tree = get_ui_tree(HWND, depth=depth)
+
+        levels = 0
+        while tree:
+            levels += 1
+            tree = tree[0].children
+        assert levels == depth
+
+    def test_unknown_control_type_named_once(self, mock_uia):
+        from src.utils.uia import CONTROL_TYPE_NAMES, get_ui_tree
+
+        mock_uia.ElementFromHandleBuildCache.return_value = _make_cached_element(
+            children=[_make_cached_element(control_type=59999), _make_cached_element(control_type=59999)]
+        )
+
+        tree = get_ui_tree(HWND)
+
+        assert tree[0].control_type == "Unknown(59999)"
+        assert tree[0].control_type is tree[1].control_type
+        assert CONTROL_TYPE_NAMES[50000] == "Button"
+
+    def test_broken_element_skipped(self, mock_uia):
+        from src.utils.uia import get_ui_tree
+
+        broken = MagicMock()
+        type(broken).CachedControlType = property(lambda self: (_ for _ in ()).throw(OSError("gone")))
+        ok = _make_cached_element(name="OK")
+        mock_uia.ElementFromHandleBuildCache.return_value = _make_cached_element(children=[broken, ok])
+
+        tree = get_ui_tree(HWND)
+
+        assert [e.name for e in tree] == ["OK"]
+
+    def test_node_budget_truncates_and_keeps_ancestors(self, mock_uia):
+        from src.utils.uia import get_ui_tree
+
+        first = _make_cached_element(name="First")
+        second = _make_cached_element(name="Second")
+        group = _make_cached_element(name="Group", control_type=50026, children=[first, second])
+        sibling = _make_cached_element(name="Sibling")
+        mock_uia.ElementFromHandleBuildCache.return_value = _make_cached_element(children=[group, sibling])
+
+        tree = get_ui_tree(HWND, max_nodes=2)
+
+        assert tree.truncated is True
+        assert [e.name for e in tree] == ["Group"]
+        assert [e.name for e in tree[0].children] == ["First"]
+        second.BuildUpdatedCache.assert_not_called()
+        sibling.BuildUpdatedCache.assert_not_called()
+
+    def test_walk_within_budget_not_truncated(self, mock_uia):
+        from src.utils.uia import get_ui_tree
+
+        mock_uia.ElementFromHandleBuildCache.return_value = _make_cached_element(
+            children=[_make_cached_element(name="A"), _make_cached_element(name="B")]
+        )
+
+        tree = get_ui_tree(HWND, max_nodes=3)
+
+        assert tree.truncated is False
+        assert [e.name for e in tree] == ["A", "B"]
+
+    def test_no_children_fetched_once_budget_spent(self, mock_uia):
+        from src.utils.uia import get_ui_tree
+
+        hidden = _make_cached_element(name="Hidden")
+        last = _make_cached_element(name="Last", control_type=50026, children=[hidden])
+        mock_uia.ElementFromHandleBuildCache.return_value = _make_cached_element(
+            children=[_make_cached_element(name="A"), last]
+        )
+
+        tree = get_ui_tree(HWND, max_nodes=2)
+
+        assert tree.truncated is True
+        assert [e.name for e in tree] == ["A", "Last"]
+        last.BuildUpdatedCache.assert_not_called()
+
+    def test_waits_for_renderer_tree_after_activation(self, mock_uia):
+        from src.utils.uia import get_ui_tree
+
+        mock_uia.ElementFromHandleBuildCache.return_value = _make_cached_element()
+        with (
+            patch("src.utils.uia._ensure_chromium_accessibility", return_value=True),
+            patch("src.utils.uia._wait_for_renderer_tree") as mock_wait,
+        ):
+            get_ui_tree(HWND)
+
+        mock_wait.assert_called_once_with(mock_uia, HWND)
+
+
+class TestUiTreeCache:
+    """Tests for reusing a walked tree within UIA_TREE_TTL."""
+
+    @patch("src.utils.uia.time.monotonic", return_value=100.0)
+    def test_repeat_call_reuses_walk(self, _mock_time, mock_uia):
+        from src.utils.uia import get_ui_tree
+
+        mock_uia.ElementFromHandleBuildCache.return_value = _make_cached_element(
+            children=[_make_cached_element(name="OK")]
+        )
+
+        first = get_ui_tree(HWND)
+        second = get_ui_tree(HWND)
+
+        assert second is first
+        mock_uia.ElementFromHandleBuildCache.assert_called_once()
+
+    def test_expired_entry_rewalked(self, mock_uia):
+        from src.utils.uia import get_ui_tree
+
+        mock_uia.ElementFromHandleBuildCache.return_value = _make_cached_element()
+        with patch("src.utils.uia.time.monotonic", return_value=100.0):
+            get_ui_tree(HWND)
+        with patch("src.utils.uia.time.monotonic", return_value=101.0):
+            get_ui_tree(HWND)
+
+        assert mock_uia.ElementFromHandleBuildCache.call_count == 2
+
+    @patch("src.utils.uia.time.monotonic", return_value=100.0)
+    def test_window_change_rewalked(self, _mock_time, mock_uia, mock_win32gui):
+        from src.utils.uia import get_ui_tree
+
+        mock_uia.ElementFromHandleBuildCache.return_value = _make_cached_element()
+        get_ui_tree(HWND)
+        mock_win32gui.GetWindowText.return_value = "Window - Saved"
+        get_ui_tree(HWND)
+
+        assert mock_uia.ElementFromHandleBuildCache.call_count == 2
+
+    @patch("src.utils.uia.time.monotonic", return_value=100.0)
+    def test_different_arguments_cached_separately(self, _mock_time, mock_uia):
+        from src.utils.uia import get_ui_tree
+
+        mock_uia.ElementFromHandleBuildCache.return_value = _make_cached_element()
+        get_ui_tree(HWND, depth=5)
+        get_ui_tree(HWND, depth=3)
+        get_ui_tree(HWND, depth=5, filter="interactive")
+
+        assert mock_uia.ElementFromHandleBuildCache.call_count == 3
+
+    def test_concurrent_callers_share_one_walk(self, mock_uia):
+        import threading
+        import time
+
+        from src.utils.uia import _pending_walks, get_ui_tree
+
+        started = threading.Event()
+        release = threading.Event()
+
+        def build(hwnd, cache_request):
+            started.set()
+            release.wait(5)
+            return _make_cached_element(children=[_make_cached_element(name="OK")])
+
+        mock_uia.ElementFromHandleBuildCache.side_effect = build
+        results: list = []
+        first = threading.Thread(target=lambda: results.append(get_ui_tree(HWND)))
+        first.start()
+        assert started.wait(5)
+        second = threading.Thread(target=lambda: results.append(get_ui_tree(HWND)))
+        second.start()
+        time.sleep(0.1)  # let the second caller find the walk in progress
+        release.set()
+        first.join(5)
+        second.join(5)
+
+        assert len(results) == 2
+        assert results[0] is results[1]
+        mock_uia.ElementFromHandleBuildCache.assert_called_once()
+        assert _pending_walks == {}
+
+    def test_failed_walk_not_left_pending(self, mock_uia):
+        from src.utils.uia import _pending_walks, get_ui_tree
+
+        mock_uia.ElementFromHandleBuildCache.side_effect = OSError("gone")
+
+        with pytest.raises(OSError):
+            get_ui_tree(HWND)
+
+        assert _pending_walks == {}
+
+
+class TestUiaWorker:
+    """Tests for running walks on the long-lived UIA worker thread."""
+
+    def test_walks_reuse_one_thread(self, mock_uia):
+        import threading
+
+        from src.utils.uia import get_ui_tree, invalidate_ui_tree_cache
+
+        threads: list[int] = []
+
+        def build(hwnd, cache_request):
+            threads.append(threading.get_ident())
+            return _make_cached_element()
+
+        mock_uia.ElementFromHandleBuildCache.side_effect = build
+        get_ui_tree(HWND)
+        invalidate_ui_tree_cache()
+        get_ui_tree(HWND)
+
+        assert len(threads) == 2
+        assert threads[0] == threads[1] != threading.get_ident()
+
+    @patch("src.utils.uia.config")
+    def test_timeout_replaces_stuck_worker(self, mock_config, mock_uia):
+        import threading
+
+        from src.utils import uia as uia_module
+
+        mock_config.UIA_TIMEOUT = 0.2
+        mock_config.UIA_TREE_TTL = 0.5
+        mock_config.UIA_MAX_NODES = 2000
+        release = threading.Event()
+
+        def hang(hwnd, cache_request):
+            release.wait(5)
+            return _make_cached_element()
+
+        mock_uia.ElementFromHandleBuildCache.side_effect = hang
+        stuck = uia_module._get_worker()
+        try:
+            with pytest.raises(TimeoutError):
+                uia_module.get_ui_tree(HWND)
+            assert uia_module._get_worker() is not stuck
+            assert stuck.retired is True
+
+            # The replacement worker serves new walks while the old one is blocked
+            mock_uia.ElementFromHandleBuildCache.side_effect = None
+            mock_uia.ElementFromHandleBuildCache.return_value = _make_cached_element(
+                children=[_make_cached_element(name="OK")]
+            )
+            assert [e.name for e in uia_module.get_ui_tree(HWND)] == ["OK"]
+        finally:
+            release.set()
+
+    def test_retire_fails_queued_and_later_jobs(self):
+        import threading
+
+        from src.utils.uia import _UiaWorker
+
+        worker = _UiaWorker()
+        started = threading.Event()
+        release = threading.Event()
+
+        def hang():
+            started.set()
+            release.wait(5)
+            return "late"
+
+        running = worker.submit(hang)
+        assert started.wait(5)
+        queued = worker.submit(lambda: "never")
+        try:
+            worker.retire()
+            with pytest.raises(TimeoutError, match="retired"):
+                queued.result(timeout=1)
+            with pytest.raises(TimeoutError, match="retired"):
+                worker.submit(lambda: "never").result(timeout=1)
+        finally:
+            release.set()
+        assert running.result(timeout=5) == "late"
+
+    def test_retire_stops_idle_worker_thread(self):
+        from src.utils.uia import _UiaWorker
+
+        worker = _UiaWorker()
+        assert worker.submit(lambda: "done").result(timeout=5) == "done"
+
+        worker.retire()
+        worker._thread.join(timeout=5)
+
+        assert not worker._thread.is_alive()
+
+    def test_each_worker_thread_creates_its_own_uia_instance(self):
+        from src.utils.uia import _UiaWorker, init_uia
+
+        with patch("src.utils.uia.comtypes.CoCreateInstance", side_effect=lambda *a, **k: object()):
+            first, second = _UiaWorker(), _UiaWorker()
+            a1 = first.submit(init_uia).result(timeout=5)
+            a2 = first.submit(init_uia).result(timeout=5)
+            b = second.submit(init_uia).result(timeout=5)
+
+        assert a1 is a2
+        assert b is not a1
+        first.retire()
+        second.retire()
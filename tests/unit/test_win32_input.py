@@ -0,0 +1,174 @@
+"""Unit tests for SendInput batching in src/utils/win32_input.py."""
+
+from __future__ import annotations
+
+from unittest.mock import patch
+
+import pytest
+
+
+@pytest.fixture
+def mock_send_input():
+    """Patch the bound SendInput prototype to report every event as sent."""
+    with patch("src.utils.win32_input._SendInput") as mock_send:
+        mock_send.side_effect = lambda count, inputs, size: count
+        yield mock_send
+
+
+class TestTypeUnicodeString:
+    """Tests for type_unicode_string."""
+
+    def test_sends_down_up_pair_per_char_in_one_call(self, mock_send_input):
+        from src.utils.win32_input import (
+            _INPUT_SIZE,
+            INPUT_KEYBOARD,
+            KEYEVENTF_KEYUP,
+            KEYEVENTF_UNICODE,
+            type_unicode_string,
+        )
+
+        assert type_unicode_string("hé") is True
+
+        mock_send_input.assert_called_once()
+        count, inputs, size = mock_send_input.call_args[0]
+        assert count == 4
+        assert size == _INPUT_SIZE
+        assert [inputs[i].type for i in range(count)] == [INPUT_KEYBOARD] * 4
+        assert [inputs[i].union.ki.wScan for i in range(count)] == [ord("h"), ord("h"), ord("é"), ord("é")]
+        assert [inputs[i].union.ki.dwFlags for i in range(count)] == [
+            KEYEVENTF_UNICODE,
+            KEYEVENTF_UNICODE | KEYEVENTF_KEYUP,
+        ] * 2
+
+    def test_astral_char_sent_as_surrogate_pair(self, mock_send_input):
+        from src.utils.win32_input import type_unicode_string
+
+        assert type_unicode_string("\U0001F600") is True
+
+        count, inputs, _size = mock_send_input.call_args[0]
+        assert count == 4
+        assert [inputs[i].union.ki.wScan for i in range(0, count, 2)] == [0xD83D, 0xDE00]
+
+    def test_empty_text_sends_nothing(self, mock_send_input):
+        from src.utils.win32_input import type_unicode_string
+
+        assert type_unicode_string("") is True
+        mock_send_input.assert_not_called()
+
+    def test_partial_send_reports_failure(self, mock_send_input):
+        from src.utils.win32_input import type_unicode_string
+
+        mock_send_input.side_effect = lambda count, inputs, size: count - 1
+
+        assert type_unicode_string("ab") is False
+
+
+class TestSendKeyCombo:
+    """Tests for send_key_combo."""
+
+    def test_modifiers_wrap_key(self, mock_send_input):
+        from src.utils.win32_input import KEYEVENTF_KEYUP, VK_CONTROL, VK_SHIFT, send_key_combo
+
+        assert send_key_combo("ctrl+shift+s") is True
+
+        count, inputs, _size = mock_send_input.call_args[0]
+        events = [(inputs[i].union.ki.wVk, inputs[i].union.ki.dwFlags) for i in range(count)]
+        assert events == [
+            (VK_CONTROL, 0),
+            (VK_SHIFT, 0),
+            (ord("S"), 0),
+            (ord("S"), KEYEVENTF_KEYUP),
+            (VK_SHIFT, KEYEVENTF_KEYUP),
+            (VK_CONTROL, KEYEVENTF_KEYUP),
+        ]
+
+    def test_unknown_key_sends_nothing(self, mock_send_input):
+        from src.utils.win32_input import send_key_combo
+
+        assert send_key_combo("ctrl+nosuchkey") is False
+        mock_send_input.assert_not_called()
+
+    def test_repeat_combo_parsed_once(self, mock_send_input):
+        from src.utils.win32_input import _pack_key_combo, send_key_combo
+
+        _pack_key_combo.cache_clear()
+        assert send_key_combo("ctrl+c") is True
+        assert send_key_combo("ctrl+c") is True
+
+        assert _pack_key_combo.cache_info().hits == 1
+        first, second = mock_send_input.call_args_list
+        assert bytes(first[0][1]) == bytes(second[0][1])
+
+    def test_unknown_key_warned_on_every_call(self, mock_send_input, caplog):
+        from src.utils.win32_input import send_key_combo
+
+        send_key_combo("ctrl+nosuchkey")
+        send_key_combo("ctrl+nosuchkey")
+
+        assert caplog.text.count("Unknown key name: nosuchkey") == 2
+
+
+class TestMouseInput:
+    """Tests for mouse click, drag and scroll batches."""
+
+    def test_double_click_sends_two_down_up_pairs(self, mock_send_input):
+        from src.utils.win32_input import (
+            INPUT_MOUSE,
+            MOUSEEVENTF_ABSOLUTE,
+            MOUSEEVENTF_LEFTDOWN,
+            MOUSEEVENTF_LEFTUP,
+            MOUSEEVENTF_MOVE,
+            MOUSEEVENTF_VIRTUALDESK,
+            send_mouse_click,
+        )
+
+        assert send_mouse_click(100, 200, click_type="double") is True
+
+        count, inputs, _size = mock_send_input.call_args[0]
+        base = MOUSEEVENTF_ABSOLUTE | MOUSEEVENTF_VIRTUALDESK | MOUSEEVENTF_MOVE
+        assert count == 4
+        assert [inputs[i].type for i in range(count)] == [INPUT_MOUSE] * 4
+        assert [(inputs[i].union.mi.dx, inputs[i].union.mi.dy) for i in range(count)] == [(100, 200)] * 4
+        assert [inputs[i].union.mi.dwFlags for i in range(count)] == [
+            base | MOUSEEVENTF_LEFTDOWN,
+            base | MOUSEEVENTF_LEFTUP,
+        ] * 2
+
+    def test_drag_moves_presses_moves_releases(self, mock_send_input):
+        from src.utils.win32_input import (
+            MOUSEEVENTF_RIGHTDOWN,
+            MOUSEEVENTF_RIGHTUP,
+            send_mouse_drag,
+        )
+
+        assert send_mouse_drag(1, 2, 3, 4, button="right") is True
+
+        count, inputs, _size = mock_send_input.call_args[0]
+        assert count == 4
+        assert [(inputs[i].union.mi.dx, inputs[i].union.mi.dy) for i in range(count)] == [
+            (1, 2), (1, 2), (3, 4), (3, 4),
+        ]
+        assert inputs[1].union.mi.dwFlags & MOUSEEVENTF_RIGHTDOWN
+        assert inputs[3].union.mi.dwFlags & MOUSEEVENTF_RIGHTUP
+
+    def test_scroll_down_sends_negative_wheel_delta(self, mock_send_input):
+        from src.utils.win32_input import MOUSEEVENTF_WHEEL, WHEEL_DELTA, send_mouse_scroll
+
+        assert send_mouse_scroll(10, 20, "down", amount=2) is True
+
+        count, inputs, _size = mock_send_input.call_args[0]
+        assert count == 1
+        assert inputs[0].union.mi.mouseData == -2 * WHEEL_DELTA
+        assert inputs[0].union.mi.dwFlags & MOUSEEVENTF_WHEEL
+
+    def test_button_names_are_case_insensitive_and_default_to_left(self, mock_send_input):
+        from src.utils.win32_input import (
+            MOUSEEVENTF_LEFTDOWN,
+            MOUSEEVENTF_MIDDLEDOWN,
+            send_mouse_click,
+        )
+
+        send_mouse_click(0, 0, button="MIDDLE")
+        assert mock_send_input.call_args[0][1][0].union.mi.dwFlags & MOUSEEVENTF_MIDDLEDOWN
+        send_mouse_click(0, 0, button="bogus")
+        assert mock_send_input.call_args[0][1][0].union.mi.dwFlags & MOUSEEVENTF_LEFTDOWN